@@ -0,0 +1,19 @@
+from typing import Dict, List, Tuple
+
+# A case regresses when its median time (or peak memory) grows past baseline * threshold
+DEFAULT_THRESHOLD = 1.25
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> Tuple[List[str], List[str]]:
+    # Regressions, and the cases the baseline has no reference for
+    regressions, missing = [], []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            missing.append(name)
+            continue
+        for metric in ("median_ms", "peak_mb"):
+            if reference[metric] > 0 and result[metric] > reference[metric] * threshold:
+                regressions.append(f"{name}: {metric} {reference[metric]:.2f} -> {result[metric]:.2f} "
+                                   f"({result[metric] / reference[metric]:.2f}x)")
+    return regressions, missing
@@ -0,0 +1,99 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from baselines import DEFAULT_THRESHOLD, compare
+from synthetic import make_drivers_page
+from webscrape import parse_f1_drivers
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline_driver_table.json")
+CASE = "parse_f1_drivers"
+
+
+def measure(html: str, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_f1_drivers(html)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # Peak memory from a separate run, as in bench_suite
+    tracemalloc.start()
+    parse_f1_drivers(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "peak_mb": round(peak / 1024 ** 2, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time parsing of a full-size Wikipedia drivers list page.")
+    parser.add_argument("page", nargs="?", help="Saved copy of the live page (defaults to a synthetic page of the same size)")
+    parser.add_argument("--drivers", type=int, default=870, help="Drivers on the synthetic page")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run's results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown/memory growth relative to the baseline")
+    args = parser.parse_args()
+
+    if args.page:
+        with open(args.page, encoding="utf-8") as f:
+            html = f.read()
+        page = os.path.basename(args.page)
+    else:
+        html = make_drivers_page(args.drivers)
+        page = f"synthetic:{args.drivers}"
+
+    results = {CASE: measure(html, args.repeat)}
+    r = results[CASE]
+    print(f"📄 {page}: {len(html) / 1024:.0f} KiB, {len(parse_f1_drivers(html))} drivers")
+    print(f"{CASE}  min {r['min_ms']:.2f} ms  median {r['median_ms']:.2f} ms  peak {r['peak_mb']:.1f} MB")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "page": page,
+                "results": results,
+            }, f, indent=2)
+        print(f"💾 Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("ℹ️ No baseline yet, run with --save-baseline to record one")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("page") != page:
+        print(f"⚠️ Baseline was recorded on {baseline.get('page')}, comparison skipped")
+        return
+
+    regressions, missing = compare(results, baseline["results"], args.threshold)
+    if missing:
+        print(f"⚠️ No baseline for {', '.join(missing)}, not compared (record with --save-baseline)")
+        return
+    if regressions:
+        print(f"❌ Regression beyond {args.threshold:.2f}x the baseline:")
+        for line in regressions:
+            print(f"   {line}")
+        sys.exit(1)
+    print(f"✅ No regression beyond {args.threshold:.2f}x the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the dashboard imports before drawing anything, and what opening each view adds on top
+SHELL_MODULES = ["streamlit", "streamlit.components.v1", "pandas", "schedule_cache", "instrumentation"]
+VIEW_MODULES = {
+    "Graphics": ["plotting", "data_importing", "prefetch", "pace_summary", "stints"],
+    "Schedule": [],
+    "Drivers": ["webscrape", "data_importing", "fastf1.plotting"],
+    "Records": ["records"],
+}
+# What every rerun paid for before the views were loaded lazily: all of the above at once
+EAGER_MODULES = sorted({m for modules in VIEW_MODULES.values() for m in modules})
+
+# Runs in a fresh interpreter, so every measurement starts with nothing imported
+IMPORT_SCRIPT = """
+import importlib, json, sys, time
+timings = {}
+for stage, modules in json.loads(sys.argv[1]):
+    start = time.perf_counter()
+    for module in modules:
+        importlib.import_module(module)
+    timings[stage] = (time.perf_counter() - start) * 1000
+print(json.dumps(timings))
+"""
+
+
+def _python(script: str, *args: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.environ.get("PYTHONPATH", "")]))
+    result = subprocess.run([sys.executable, "-c", script, *args], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_imports(repeat: int) -> Dict[str, List[float]]:
+    stages = {"shell": [], "eager (all views)": []}
+    stages.update({f"view.{view}": [] for view in VIEW_MODULES})
+    for _ in range(repeat):
+        stages["eager (all views)"].append(sum(_python(IMPORT_SCRIPT, json.dumps(
+            [("shell", SHELL_MODULES), ("views", EAGER_MODULES)])).values()))
+        for view, modules in VIEW_MODULES.items():
+            timings = _python(IMPORT_SCRIPT, json.dumps([("shell", SHELL_MODULES), ("view", modules)]))
+            stages["shell"].append(timings["shell"])
+            stages[f"view.{view}"].append(timings["shell"] + timings["view"])
+    return stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time dashboard startup: the module imports before the first "
+                                                 "paint and what opening each view adds.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'imports':<30}{'min ms':>10}{'median ms':>12}")
+    for stage, timings in measure_imports(args.repeat).items():
+        print(f"{stage:<30}{min(timings):>10.1f}{statistics.median(timings):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from typing import Callable, Dict, List, Optional, Tuple
+
+import matplotlib
+matplotlib.use("Agg")
+import pandas as pd
+
+# FastF1 deprecation notices and pandas copy warnings would otherwise be repeated for every run
+warnings.filterwarnings("ignore", category=FutureWarning)
+warnings.filterwarnings("ignore", category=pd.errors.SettingWithCopyWarning)
+
+# Telemetry indexes, circuit outlines and the FastF1 cache created during the run go to a scratch directory instead of Data/
+SCRATCH_DIR = tempfile.mkdtemp(prefix="f1_bench_")
+os.environ.setdefault("F1_TELEMETRY_INDEX_DIR", os.path.join(SCRATCH_DIR, "telemetry_index"))
+os.environ.setdefault("F1_TRACK_MAP_DIR", os.path.join(SCRATCH_DIR, "circuits"))
+os.environ.setdefault("F1_CACHE_DIR", os.path.join(SCRATCH_DIR, "fastf1_cache"))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_importing
+import pace_summary
+import race_matrix
+import schedule_cache
+import stints
+import plotting as fsp
+import telemetry_index
+from baselines import DEFAULT_THRESHOLD, compare
+from data_importing import get_team_order, get_team_color
+from pace_summary import summarise_pace
+from session_compaction import COMPACT_SESSIONS, compact_session
+from synthetic import make_session
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+
+def _reset_memos():
+    # Every run starts cold, the in-process memos would otherwise turn repeats into dictionary lookups
+    data_importing._lap_telemetry.clear()
+    pace_summary._session_summaries.clear()
+    telemetry_index._indexes.clear()
+    race_matrix._race_matrices.clear()
+    stints._session_models.clear()
+
+
+def _seed(session) -> None:
+    # Puts the synthetic session where load_session finds it: its schedule in the schedule cache
+    # and the loaded session in the session store, as after the dashboard's first load of it
+    year, event = session.event.year, session.event["EventName"]
+    schedule_cache._seasons[year] = schedule_cache.SeasonSchedule(year, pd.DataFrame([session.event]))
+    data_importing.session_store.get((year, event, session.name, "full"), lambda: session)
+
+
+def _load_session(session) -> pd.DataFrame:
+    # The dashboard's load_session on an in-memory session: store lookup plus the quick laps
+    _, _, quick_laps = data_importing.load_session(session.event.year, session.event["EventName"], session.name)
+    return quick_laps
+
+
+def _render(plot_fn: Callable, *args) -> Callable[[], bytes]:
+    # Same path as fsp.cached_plot on a cache miss, without touching the figure cache
+    return lambda: fsp.figure_to_bytes(fsp.add_watermark(plot_fn(*args)))
+
+
+def _fetch_telemetry(session, *selections: Tuple[str, int]) -> Callable[[], None]:
+    # Setup for the telemetry chart cases: laps already fetched (as on every chart after the first),
+    # so the case times rendering only and the pyplot and template paths are compared like for like
+    return lambda: [data_importing.get_lap_telemetry(session, driver, lap) for driver, lap in selections]
+
+
+def build_cases(session) -> List[tuple]:
+    # (name, fn) or (name, fn, setup); setup runs untimed after the memos are reset
+    _seed(session)
+    quick_laps = _load_session(session)
+    team_order = get_team_order(quick_laps)
+    team_colors = get_team_color(session, team_order)
+    df_pace = pace_summary.session_pace_summary(session).table
+
+    drivers = list(session.results["Abbreviation"])
+    fastest = {d: int(session.laps.pick_drivers(d).pick_fastest()["LapNumber"]) for d in drivers[:3]}
+    d1, d2 = drivers[:2]
+
+    return [
+        ("load_session", lambda: _load_session(session)),
+        ("get_team_order", lambda: get_team_order(quick_laps)),
+        ("summarise_pace", lambda: summarise_pace(session.laps)),
+        ("plot.general_lap_time_dist", _render(fsp.general_lap_time_dist, quick_laps, team_order, team_colors, session)),
+        ("plot.violin_dist_point_scorers", _render(fsp.violin_dist_point_scorers, session)),
+        ("plot.fastest_lap_team_pace_comparison", _render(fsp.fastest_lap_team_pace_comparison, df_pace)),
+        ("plot.avg_lap_team_pace_comparison", _render(fsp.avg_lap_team_pace_comparison, df_pace)),
+        ("plot.plot_race_lap_times", _render(fsp.plot_race_lap_times, session)),
+        ("plot.plot_gap_to_leader", _render(fsp.plot_gap_to_leader, session)),
+        ("plot.plot_position_changes", _render(fsp.plot_position_changes, session)),
+        ("plot.plot_rolling_pace", _render(fsp.plot_rolling_pace, session)),
+        ("stints.fit_stints", lambda: stints.fit_stints(session.laps)),
+        ("plot.plot_stint_degradation", _render(fsp.plot_stint_degradation, session)),
+        ("plot.plot_telemetry", _render(fsp.plot_telemetry, session, d1, fastest[d1]),
+         _fetch_telemetry(session, (d1, fastest[d1]))),
+        ("plot.plot_telemetry_comparison", _render(fsp.plot_telemetry_comparison, session, d1, d2, fastest[d1], fastest[d2]),
+         _fetch_telemetry(session, (d1, fastest[d1]), (d2, fastest[d2]))),
+        ("template.render_telemetry", lambda: fsp.render_telemetry(session, d1, fastest[d1]),
+         _fetch_telemetry(session, (d1, fastest[d1]))),
+        ("template.render_telemetry_comparison",
+         lambda: fsp.render_telemetry_comparison(session, d1, d2, fastest[d1], fastest[d2]),
+         _fetch_telemetry(session, (d1, fastest[d1]), (d2, fastest[d2]))),
+        ("plot.plot_track_map", _render(fsp.plot_track_map, session, d1, fastest[d1], "Speed")),
+        ("plot.plot_track_map[delta]", _render(fsp.plot_track_map, session, d1, fastest[d1], "Delta", (d2, fastest[d2]))),
+        ("plot.plot_telemetry_overlay", _render(fsp.plot_telemetry_overlay, session, list(fastest.items()))),
+    ]
+
+
+def measure(fn: Callable[[], object], repeat: int, setup: Optional[Callable[[], object]] = None) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        _reset_memos()
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # Peak memory comes from a separate run, tracemalloc slows allocation-heavy code down considerably
+    _reset_memos()
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "peak_mb": round(peak / 1024 ** 2, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time data processing and every plot on a synthetic race session.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--laps", type=int, default=70, help="Race distance of the synthetic session")
+    parser.add_argument("--samples-per-lap", type=int, default=600, help="Car data samples per lap")
+    parser.add_argument("--only", nargs="+", help="Run only the cases whose names contain one of these strings")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run's results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown/memory growth relative to the baseline")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    session = make_session(n_laps=args.laps, samples_per_lap=args.samples_per_lap)
+    print(f"🏁 Synthetic session: {len(session.drivers)} drivers, {len(session.laps)} laps "
+          f"(built in {time.perf_counter() - start:.1f}s)")
+    if COMPACT_SESSIONS:
+        # Benchmarks run on sessions in the shape the dashboard keeps them
+        report = compact_session(session)
+        print(f"🗜️ Compacted {report.before_bytes / 1024 ** 2:.0f} MB -> {report.after_bytes / 1024 ** 2:.0f} MB")
+
+    cases = build_cases(session)
+    if args.only:
+        cases = [case for case in cases if any(part in case[0] for part in args.only)]
+
+    results = {}
+    print(f"{'case':<40}{'min ms':>12}{'median ms':>12}{'peak MB':>12}")
+    for name, fn, *setup in cases:
+        results[name] = measure(fn, args.repeat, *setup)
+        r = results[name]
+        print(f"{name:<40}{r['min_ms']:>12.1f}{r['median_ms']:>12.1f}{r['peak_mb']:>12.1f}")
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if (baseline.get("laps"), baseline.get("samples_per_lap")) != (args.laps, args.samples_per_lap):
+            if not args.save_baseline:
+                print("⚠️ Baseline was recorded with a different session size, comparison skipped")
+                return
+            baseline = None
+
+    if args.save_baseline:
+        # A partial run (--only) updates its cases and keeps the others
+        results = {**(baseline["results"] if baseline else {}), **results}
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "laps": args.laps,
+                "samples_per_lap": args.samples_per_lap,
+                "results": results,
+            }, f, indent=2)
+        print(f"💾 Baseline written to {args.baseline}")
+        return
+
+    if baseline is None:
+        print("ℹ️ No baseline yet, run with --save-baseline to record one")
+        return
+
+    regressions, missing = compare(results, baseline["results"], args.threshold)
+    if missing:
+        print(f"⚠️ {len(missing)} case(s) without a baseline, not compared (record with --save-baseline):")
+        for name in missing:
+            print(f"   {name}")
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.2f}x the baseline:")
+        for line in regressions:
+            print(f"   {line}")
+        sys.exit(1)
+    print(f"✅ No regressions beyond {args.threshold:.2f}x the baseline in {len(results) - len(missing)} case(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import fastf1
+from fastf1.core import Laps, Session, SessionResults, Telemetry
+from fastf1.events import Event
+from fastf1.plotting._interface import _get_driver_team_mapping
+
+
+# Offline, FastF1-shaped race sessions for benchmarks: real Session/Laps/Telemetry objects
+# filled with generated data at realistic sizes (20 drivers, ~70 laps, ~600 car samples per lap)
+
+ROSTER = [
+    ("1", "VER", "Max", "Verstappen", "Red Bull Racing", "3671C6"),
+    ("11", "PER", "Sergio", "Perez", "Red Bull Racing", "3671C6"),
+    ("16", "LEC", "Charles", "Leclerc", "Ferrari", "E8002D"),
+    ("55", "SAI", "Carlos", "Sainz", "Ferrari", "E8002D"),
+    ("44", "HAM", "Lewis", "Hamilton", "Mercedes", "27F4D2"),
+    ("63", "RUS", "George", "Russell", "Mercedes", "27F4D2"),
+    ("4", "NOR", "Lando", "Norris", "McLaren", "FF8000"),
+    ("81", "PIA", "Oscar", "Piastri", "McLaren", "FF8000"),
+    ("14", "ALO", "Fernando", "Alonso", "Aston Martin", "229971"),
+    ("18", "STR", "Lance", "Stroll", "Aston Martin", "229971"),
+    ("10", "GAS", "Pierre", "Gasly", "Alpine", "0093CC"),
+    ("31", "OCO", "Esteban", "Ocon", "Alpine", "0093CC"),
+    ("23", "ALB", "Alexander", "Albon", "Williams", "64C4FF"),
+    ("2", "SAR", "Logan", "Sargeant", "Williams", "64C4FF"),
+    ("22", "TSU", "Yuki", "Tsunoda", "RB", "6692FF"),
+    ("3", "RIC", "Daniel", "Ricciardo", "RB", "6692FF"),
+    ("77", "BOT", "Valtteri", "Bottas", "Kick Sauber", "52E252"),
+    ("24", "ZHO", "Guanyu", "Zhou", "Kick Sauber", "52E252"),
+    ("27", "HUL", "Nico", "Hulkenberg", "Haas F1 Team", "B6BABD"),
+    ("20", "MAG", "Kevin", "Magnussen", "Haas F1 Team", "B6BABD"),
+]
+
+TRACK_LENGTH = 5400.0  # meters
+SESSION_START = 3600.0  # session time (s) at the start of lap 1
+BASE_LAP_TIME = 92.0  # seconds
+
+
+def _event(year: int) -> Event:
+    date = pd.Timestamp(f"{year}-03-02 15:00")
+    sessions = {}
+    for i, (name, offset) in enumerate([("Practice 1", -2), ("Practice 2", -2), ("Practice 3", -1),
+                                        ("Qualifying", -1), ("Race", 0)], start=1):
+        sessions[f"Session{i}"] = name
+        sessions[f"Session{i}Date"] = (date + pd.Timedelta(days=offset)).tz_localize("UTC")
+        sessions[f"Session{i}DateUtc"] = date + pd.Timedelta(days=offset)
+    return Event(pd.Series({
+        "RoundNumber": 1, "Country": "Bahrain", "Location": "Sakhir",
+        "OfficialEventName": "Synthetic Grand Prix", "EventDate": date, "EventName": "Synthetic Grand Prix",
+        "EventFormat": "conventional", "F1ApiSupport": True, **sessions,
+    }), year=year)
+
+
+def _lap_table(rng: np.random.Generator, n_laps: int) -> pd.DataFrame:
+    frames = []
+    for grid, (number, abbr, _, _, team, _) in enumerate(ROSTER):
+        laps = np.arange(1, n_laps + 1)
+        pit_laps = np.sort(rng.choice(np.arange(15, n_laps - 10), size=2, replace=False))
+        stint = 1 + np.searchsorted(pit_laps, laps, side="left")
+        compound = np.array(["SOFT", "MEDIUM", "HARD"])[(stint - 1 + grid) % 3]
+        tyre_life = laps - np.r_[0, pit_laps][stint - 1]
+
+        lap_time = BASE_LAP_TIME + grid * 0.08 + 0.05 * tyre_life - 0.06 * laps / 10 + rng.normal(0, 0.3, n_laps)
+        lap_time[0] += 6
+        lap_time[np.isin(laps, pit_laps)] += 20
+        lap_time[np.isin(laps, pit_laps + 1)] += 3
+        lap_start = SESSION_START + grid * 0.3 + np.r_[0, np.cumsum(lap_time)[:-1]]
+
+        frames.append(pd.DataFrame({
+            "Time": pd.to_timedelta(lap_start + lap_time, unit="s"),
+            "Driver": abbr,
+            "DriverNumber": number,
+            "LapTime": pd.to_timedelta(lap_time, unit="s"),
+            "LapNumber": laps.astype(float),
+            "Stint": stint.astype(float),
+            "PitInTime": pd.to_timedelta(np.where(np.isin(laps, pit_laps), lap_start + lap_time - 1, np.nan), unit="s"),
+            "PitOutTime": pd.to_timedelta(np.where(np.isin(laps, pit_laps + 1), lap_start + 1, np.nan), unit="s"),
+            "Compound": compound,
+            "TyreLife": tyre_life.astype(float),
+            "FreshTyre": True,
+            "Team": team,
+            "LapStartTime": pd.to_timedelta(lap_start, unit="s"),
+            "TrackStatus": np.where(rng.random(n_laps) < 0.05, "4", "1"),
+            "IsAccurate": True,
+        }))
+
+    laps = pd.concat(frames, ignore_index=True)
+    laps["Position"] = laps.groupby("LapNumber")["Time"].rank().astype(float)
+    best = laps.groupby("Driver")["LapTime"].transform("min")
+    laps["IsPersonalBest"] = laps["LapTime"] == best
+    return laps
+
+
+def _car_and_pos(rng: np.random.Generator, laps: pd.DataFrame, samples_per_lap: int):
+    starts = laps["LapStartTime"].dt.total_seconds().to_numpy()
+    durations = laps["LapTime"].dt.total_seconds().to_numpy()
+
+    # Like the live timing feed, every car is sampled on one shared session clock
+    interval = BASE_LAP_TIME / samples_per_lap
+    first = np.ceil((starts[0] - SESSION_START) / interval)
+    t = SESSION_START + interval * np.arange(first, np.floor((starts[-1] + durations[-1] - SESSION_START) / interval))
+    lap = np.searchsorted(starts, t, side="right") - 1
+    phase = (t - starts[lap]) / durations[lap]
+
+    wave = np.sin(phase * 2 * np.pi * 7)
+    speed = 210 + 100 * wave + rng.normal(0, 2, t.size)
+    throttle = np.clip(60 + 60 * wave, 0, 100)
+    brake = wave < -0.6
+    gear = np.clip(np.round(5 + 3 * wave), 1, 8).astype(int)
+    drs = np.where(wave > 0.8, 12, 8)
+    angle = phase * 2 * np.pi
+
+    session_time = pd.to_timedelta(t, unit="s")
+    common = {"Date": pd.Timestamp("2024-03-02 14:00") + session_time, "SessionTime": session_time,
+              "Time": session_time - pd.Timedelta(seconds=SESSION_START)}
+    car = pd.DataFrame({**common, "RPM": 9000 + 2500 * wave, "Speed": speed, "nGear": gear,
+                        "Throttle": throttle, "Brake": brake, "DRS": drs, "Source": "car"})
+    pos = pd.DataFrame({**common, "X": 4000 * np.cos(angle), "Y": 2500 * np.sin(angle), "Z": 0.0,
+                        "Status": "OnTrack", "Source": "pos"})
+    return car, pos
+
+
+def make_session(year: int = 2024, n_laps: int = 70, samples_per_lap: int = 600, seed: int = 0) -> Session:
+    rng = np.random.default_rng(seed)
+    session = Session(_event(year), "Race", f1_api_support=True)
+
+    laps = _lap_table(rng, n_laps)
+    final = laps[laps["LapNumber"] == n_laps].sort_values("Position")
+    order = {abbr: i for i, abbr in enumerate(final["Driver"])}
+    roster = sorted(ROSTER, key=lambda driver: order[driver[1]])
+    session._results = SessionResults(pd.DataFrame({
+        "DriverNumber": [d[0] for d in roster],
+        "Abbreviation": [d[1] for d in roster],
+        "FirstName": [d[2] for d in roster],
+        "LastName": [d[3] for d in roster],
+        "FullName": [f"{d[2]} {d[3]}" for d in roster],
+        "TeamName": [d[4] for d in roster],
+        "TeamColor": [d[5] for d in roster],
+        "Position": np.arange(1, len(roster) + 1, dtype=float),
+        "GridPosition": np.arange(1, len(roster) + 1, dtype=float),
+    }))
+    session._laps = Laps(laps, session=session)
+
+    session._car_data, session._pos_data = {}, {}
+    for number, *_ in ROSTER:
+        car, pos = _car_and_pos(rng, laps[laps["DriverNumber"] == number], samples_per_lap)
+        session._car_data[number] = Telemetry(car, session=session, driver=number)
+        session._pos_data[number] = Telemetry(pos, session=session, driver=number)
+    session._t0_date = pd.Timestamp("2024-03-02 14:00")
+    session._session_start_time = pd.Timedelta(seconds=SESSION_START)
+
+    # Team colours normally come from the live timing driver list; seed them from the roster instead
+    driver_info = {number: {"TeamName": team, "TeamColour": colour, "Tla": abbr, "FirstName": first, "LastName": last}
+                   for number, abbr, first, last, team, colour in ROSTER}
+    with mock.patch.object(fastf1._api, "driver_info", return_value=driver_info):
+        _get_driver_team_mapping(session)
+
+    return session
+
+
+# Stand-in for the live Wikipedia "List of Formula One drivers" page at its real size (~870 drivers,
+# ~1.5 MB), with the row markup that page uses: links, flag icons, sort keys and footnote references
+NATIONALITIES = ["United Kingdom", "United States", "Italy", "France", "Germany", "Brazil", "Argentina",
+                 "Switzerland", "Belgium", "South Africa", "Japan", "Australia", "Netherlands", "Spain"]
+DRIVER_MARKERS = ["", "", "", "", "^", "~", "*", "~*"]
+
+
+def _driver_row(rng: np.random.Generator, i: int) -> str:
+    name = f"Driver{i} Synthetic"
+    nationality = NATIONALITIES[rng.integers(len(NATIONALITIES))]
+    first = int(rng.integers(1950, 2025))
+    last = min(2025, first + int(rng.integers(0, 15)))
+    entries = int(rng.integers(1, 400))
+    starts = int(rng.integers(0, entries + 1))
+    titles = int(rng.integers(0, 8)) if rng.random() < 0.05 else 0
+    wins, poles, podiums, fastest = (int(rng.integers(0, max(1, starts // k))) for k in (8, 7, 3, 9))
+    ref = '<sup class="reference"><a href="#cite_note-{0}">[{0}]</a></sup>'.format(i % 97)
+    championships = f'{titles}<br/><a href="/wiki/{first}_Formula_One_World_Championship">{first}</a>' if titles else "0"
+
+    def number(value: int) -> str:
+        return f'<td style="text-align:right"><span data-sort-value="{value:07d}"></span>{value}</td>'
+
+    return (
+        f'<tr><td data-sort-value="Synthetic, Driver{i}"><span class="vcard"><span class="fn">'
+        f'<a href="/wiki/Driver{i}_Synthetic" title="{name}">{name}</a></span></span>{DRIVER_MARKERS[i % len(DRIVER_MARKERS)]}</td>'
+        f'<td><span class="flagicon"><span class="mw-image-border" typeof="mw:File">'
+        f'<img alt="" src="//upload.wikimedia.org/flag_{nationality.replace(" ", "_")}.svg" width="23" height="15"/>'
+        f'</span></span> <a href="/wiki/{nationality.replace(" ", "_")}">{nationality}</a></td>'
+        f'<td>{first}{f"–{last}" if last > first else ""}{ref}</td><td>{championships}</td>'
+        f'{number(entries)}{number(starts)}{number(poles)}{number(wins)}{number(podiums)}{number(fastest)}'
+        f'<td>{float(rng.integers(0, 3000)) / 2}</td></tr>\n'
+    )
+
+
+def make_drivers_page(n_drivers: int = 870, seed: int = 0) -> str:
+    rng = np.random.default_rng(seed)
+    header = ("<tr><th>Driver name</th><th>Nationality</th><th>Seasons competed</th><th>Drivers' Championships</th>"
+              "<th>Race entries</th><th>Race starts</th><th>Pole positions</th><th>Race wins</th><th>Podiums</th>"
+              "<th>Fastest laps</th><th>Points[a]</th></tr>\n")
+    key = ('<table class="wikitable"><tr><th>Key</th><th>Meaning</th></tr>'
+           "<tr><td>~</td><td>Driver competed in the current season</td></tr>"
+           "<tr><td>*</td><td>Driver has won the World Drivers' Championship</td></tr>"
+           "<tr><td>^</td><td>Driver has competed in the Indianapolis 500 as part of the championship</td></tr></table>\n")
+    # Navigation, references and the by-nationality summary that follow the drivers table on the live page
+    tail = "".join(f'<li id="cite_note-{i}"><a href="#cite_ref-{i}">^</a> <cite>Reference {i}, '
+                   f'<a href="https://www.formula1.com/en/results/{1950 + i % 75}">formula1.com</a></cite></li>\n'
+                   for i in range(2000))
+    by_nationality = "".join(f"<tr><td>{nationality}</td><td>{int(rng.integers(1, 170))}</td></tr>\n"
+                             for nationality in NATIONALITIES)
+    return (
+        "<!DOCTYPE html><html><head><title>List of Formula One drivers - Wikipedia (synthetic)</title></head><body>\n"
+        + "".join(f'<div class="mw-nav"><a href="/wiki/Page{i}">Page {i}</a></div>\n' for i in range(300))
+        + key
+        + '<table class="wikitable sortable"><tbody>\n' + header
+        + "".join(_driver_row(rng, i) for i in range(n_drivers))
+        + "</tbody></table>\n"
+        + f'<table class="wikitable sortable"><tr><th>Country</th><th>Drivers</th></tr>\n{by_nationality}</table>\n'
+        + f'<ol class="references">\n{tail}</ol></body></html>\n'
+    )
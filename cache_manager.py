@@ -0,0 +1,391 @@
+import argparse
+import os
+import pickle
+import shutil
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+import fastf1 as ff1
+from fastf1.req import Cache
+from requests_cache.backends.sqlite import SQLiteCache
+
+from session_store import budget_from_env
+
+# FastF1's disk cache: parsed API data pickled per session under <root>/<year>/<event>/<session>/*.ff1pkl,
+# raw HTTP responses in one SQLite file in the root
+CACHE_DIR = os.path.expanduser(os.environ.get("F1_CACHE_DIR", os.path.join("Data", "fastf1_cache")))
+# Budget of the per-session data; the HTTP response cache has a separate one
+CACHE_MAX_BYTES = budget_from_env("F1_CACHE_DISK_MB", 20480)
+HTTP_CACHE_MAX_BYTES = budget_from_env("F1_HTTP_CACHE_DISK_MB", 1024)
+HTTP_CACHE_FILE = "fastf1_http_cache.sqlite"
+PICKLE_SUFFIX = ".ff1pkl"
+# Eviction stops once the cache is back to this fraction of its budget
+EVICTION_TARGET = 0.9
+
+
+@dataclass(frozen=True)
+class CachedSession:
+    year: int
+    event: str  # FastF1's directory names, e.g. 2024-03-02_Bahrain_Grand_Prix
+    session: str  # e.g. 2024-03-02_Race
+    path: str
+    nbytes: int
+    last_used: float  # directory mtime, touched whenever the dashboard loads the session
+
+    @property
+    def event_name(self) -> str:
+        return self.event.split("_", 1)[-1].replace("_", " ")
+
+    @property
+    def session_name(self) -> str:
+        return self.session.split("_", 1)[-1].replace("_", " ")
+
+
+@dataclass(frozen=True)
+class CacheProblem:
+    path: str
+    reason: str
+
+
+def _dir_nbytes(path: str) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                pass
+    return total
+
+
+def _pickle_problem(path: str, deep: bool) -> Optional[str]:
+    # FastF1 pickles straight into the final file, an interrupted write leaves it truncated.
+    # Every complete pickle ends with the STOP opcode, so the cheap check only reads the last byte.
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return "empty"
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != pickle.STOP:
+                return "truncated"
+            if not deep:
+                return None
+            f.seek(0)
+            cached = pickle.load(f)
+    except Exception as e:
+        return f"unreadable ({type(e).__name__})"
+    if not isinstance(cached, dict) or "data" not in cached:
+        return "not a FastF1 cache entry"
+    if cached.get("version") != Cache._API_CORE_VERSION:
+        return f"stale (parser version {cached.get('version')})"
+    return None
+
+
+class CacheManager:
+    # Keeps FastF1's disk cache within a size budget. Whole sessions are evicted least recently used
+    # first, sessions of pinned seasons (the current one by default) are never evicted.
+    # The session directories are scanned once; after that loads only measure the session they wrote
+    # and eviction runs on a background thread, so the request path never walks the cache tree.
+    # The HTTP cache can't be split per session and has its own budget, enforced by dropping responses.
+
+    def __init__(self, root: str, max_bytes: int, pinned_years: Optional[Iterable[int]] = None,
+                 http_max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.http_max_bytes = http_max_bytes
+        self.pinned_years = set(pinned_years) if pinned_years is not None else {datetime.now().year}
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, CachedSession]] = None  # session path -> entry
+        self._session_bytes = 0
+        self._dirty: Set[str] = set()
+        self._pending = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="f1-cache")
+        self.evictions = 0
+
+    @property
+    def http_cache_path(self) -> str:
+        return os.path.join(self.root, HTTP_CACHE_FILE)
+
+    def enable(self, http_cache_file: str = HTTP_CACHE_FILE) -> None:
+        # Processes downloading in parallel pass their own http_cache_file, concurrent writers
+        # to one SQLite file fail with "database is locked"
+        os.makedirs(self.root, exist_ok=True)
+        ff1.Cache.enable_cache(self.root)
+        if http_cache_file != HTTP_CACHE_FILE:
+            Cache._requests_session_cached.cache = SQLiteCache(os.path.join(self.root, http_cache_file))
+
+    def session_path(self, session) -> Optional[str]:
+        # Session.api_path is "/static/<year>/<event>/<session>/", FastF1 drops the "/static/" prefix
+        api_path = getattr(session, "api_path", None)
+        return os.path.join(self.root, api_path[len("/static/"):]).rstrip(os.sep) if api_path else None
+
+    def record_use(self, session) -> None:
+        # Called on every lookup, in-memory hits included, so the LRU order follows what users open
+        path = self.session_path(session)
+        if path is None:
+            return
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            return
+        with self._lock:
+            if self._index is not None and path in self._index:
+                self._index[path] = replace(self._index[path], last_used=now)
+
+    def record_load(self, session) -> None:
+        # A load may have written new pickles: measure that session and check the budget in the background
+        self.record_path(self.session_path(session))
+
+    def record_path(self, path: Optional[str]) -> None:
+        # record_load for a session loaded by another process (e.g. an exporter worker)
+        if path is None:
+            return
+        with self._lock:
+            self._dirty.add(path)
+            if self._pending:
+                return  # The queued check picks this session up too
+            self._pending = True
+        self._executor.submit(self._maintain)
+
+    def wait(self) -> None:
+        # Blocks until the queued background maintenance has run
+        self._executor.submit(lambda: None).result()
+
+    def _maintain(self) -> None:
+        try:
+            with self._lock:
+                self._pending = False
+                dirty, self._dirty = self._dirty, set()
+            self._refresh(dirty)
+            self.evict()
+            self._enforce_http_budget()
+        except Exception as e:
+            print(f"⚠️ Cache maintenance failed: {e}")
+
+    def _refresh(self, paths: Iterable[str]) -> None:
+        if self._ensure_index():
+            return  # A fresh scan already measured everything
+        for path in paths:
+            parts = os.path.relpath(path, self.root).split(os.sep)
+            if len(parts) != 3 or not parts[0].isdigit() or not os.path.isdir(path):
+                continue
+            entry = CachedSession(int(parts[0]), parts[1], parts[2], path, _dir_nbytes(path), os.stat(path).st_mtime)
+            with self._lock:
+                old = self._index.get(path)
+                self._session_bytes += entry.nbytes - (old.nbytes if old else 0)
+                self._index[path] = entry
+
+    def _ensure_index(self) -> bool:
+        # Full scan the first time the index is needed, returns whether it scanned
+        with self._lock:
+            if self._index is not None:
+                return False
+        entries = {entry.path: entry for entry in self.sessions()}
+        with self._lock:
+            self._index = entries
+            self._session_bytes = sum(entry.nbytes for entry in entries.values())
+        return True
+
+    def sessions(self) -> List[CachedSession]:
+        found = []
+        for year_entry in os.scandir(self.root) if os.path.isdir(self.root) else ():
+            if not (year_entry.is_dir() and year_entry.name.isdigit()):
+                continue
+            for event_entry in os.scandir(year_entry.path):
+                if not event_entry.is_dir():
+                    continue
+                for session_entry in os.scandir(event_entry.path):
+                    if session_entry.is_dir():
+                        found.append(CachedSession(int(year_entry.name), event_entry.name, session_entry.name,
+                                                   session_entry.path, _dir_nbytes(session_entry.path),
+                                                   session_entry.stat().st_mtime))
+        return found
+
+    def is_pinned(self, entry: CachedSession) -> bool:
+        return entry.year in self.pinned_years
+
+    def session_bytes(self) -> int:
+        self._ensure_index()
+        with self._lock:
+            return self._session_bytes
+
+    def evict(self, max_bytes: Optional[int] = None) -> List[CachedSession]:
+        # Removes least recently used, unpinned sessions while the session data is over budget
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        self._ensure_index()
+        with self._lock:
+            if self._session_bytes <= max_bytes:
+                return []
+            victims = []
+            remaining = self._session_bytes
+            for entry in sorted(self._index.values(), key=lambda entry: entry.last_used):
+                if remaining <= max_bytes * EVICTION_TARGET:
+                    break
+                if not self.is_pinned(entry):
+                    victims.append(entry)
+                    remaining -= entry.nbytes
+            for entry in victims:
+                del self._index[entry.path]
+                self._session_bytes -= entry.nbytes
+            self.evictions += len(victims)
+        for entry in victims:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            try:
+                os.rmdir(os.path.dirname(entry.path))  # The event directory, once its last session is gone
+            except OSError:
+                pass
+        return victims
+
+    def http_cache_bytes(self) -> int:
+        try:
+            return os.path.getsize(self.http_cache_path)
+        except OSError:
+            return 0
+
+    def _enforce_http_budget(self) -> None:
+        # Expired responses go first; if the file is still too large everything is dropped, FastF1
+        # refetches what it needs (the parsed pickles usually make that unnecessary)
+        if self.http_cache_bytes() <= self.http_max_bytes:
+            return
+        cache = SQLiteCache(self.http_cache_path)
+        cache.delete(expired=True, vacuum=True)
+        if self.http_cache_bytes() > self.http_max_bytes:
+            cache.clear()
+            cache.responses.vacuum()
+
+    def verify(self, deep: bool = False) -> List[CacheProblem]:
+        # Truncated or empty pickles; with deep=True every pickle is loaded, which also finds entries
+        # written by another FastF1 parser version, and the HTTP cache gets a full integrity check
+        problems = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(PICKLE_SUFFIX):
+                    path = os.path.join(dirpath, filename)
+                    reason = _pickle_problem(path, deep)
+                    if reason is not None:
+                        problems.append(CacheProblem(path, reason))
+
+        if os.path.exists(self.http_cache_path):
+            try:
+                with closing(sqlite3.connect(self.http_cache_path)) as conn:
+                    result = conn.execute("PRAGMA integrity_check" if deep else "PRAGMA quick_check").fetchone()[0]
+            except sqlite3.DatabaseError as e:
+                result = str(e)
+            if result != "ok":
+                problems.append(CacheProblem(self.http_cache_path, f"corrupt HTTP cache ({result})"))
+        return problems
+
+    def repair(self, problems: List[CacheProblem], refetch: bool = False) -> int:
+        # Bad entries are deleted, FastF1 downloads them again on the next load (or right away with refetch)
+        refetch_sessions = set()
+        for problem in problems:
+            try:
+                os.remove(problem.path)
+            except OSError:
+                continue
+            relative = os.path.relpath(os.path.dirname(problem.path), self.root).split(os.sep)
+            if len(relative) == 3 and relative[0].isdigit():
+                refetch_sessions.add(tuple(relative))
+
+        if refetch:
+            for year, event, session in sorted(refetch_sessions):
+                entry = CachedSession(int(year), event, session, "", 0, 0)
+                try:
+                    ff1.get_session(entry.year, entry.event_name, entry.session_name).load()
+                    print(f"✅ Refetched {entry.year} {entry.event_name} {entry.session_name}")
+                except Exception as e:
+                    print(f"⚠️ Couldn't refetch {entry.year} {entry.event_name} {entry.session_name}: {e}")
+        return len(problems)
+
+    def compact(self) -> int:
+        # Drops expired HTTP responses (and vacuums the SQLite file), leftover empty directories
+        # and anything FastF1 can't use anymore. Returns the bytes freed.
+        before = _dir_nbytes(self.root)
+        if os.path.exists(self.http_cache_path):
+            SQLiteCache(self.http_cache_path).delete(expired=True, vacuum=True)
+            self._enforce_http_budget()
+        self.repair([p for p in self.verify(deep=True) if p.path != self.http_cache_path])
+        for dirpath, dirnames, filenames in os.walk(self.root, topdown=False):
+            if dirpath != self.root and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+        with self._lock:
+            self._index = None  # Rescanned on next use
+        return before - _dir_nbytes(self.root)
+
+    def stats(self) -> Dict[str, object]:
+        self._ensure_index()
+        with self._lock:
+            sessions = list(self._index.values())
+            session_bytes = self._session_bytes
+        by_year: Dict[int, int] = {}
+        for entry in sessions:
+            by_year[entry.year] = by_year.get(entry.year, 0) + entry.nbytes
+        return {
+            "root": self.root,
+            "session_bytes": session_bytes,
+            "max_bytes": self.max_bytes,
+            "http_cache_bytes": self.http_cache_bytes(),
+            "http_max_bytes": self.http_max_bytes,
+            "sessions": len(sessions),
+            "pinned_bytes": sum(entry.nbytes for entry in sessions if self.is_pinned(entry)),
+            "bytes_by_year": dict(sorted(by_year.items())),
+            "evictions": self.evictions,
+        }
+
+
+cache_manager = CacheManager(CACHE_DIR, CACHE_MAX_BYTES)
+
+
+def _mb(nbytes: int) -> str:
+    return f"{nbytes / 1024 ** 2:,.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and maintain the FastF1 disk cache.")
+    parser.add_argument("command", choices=["stats", "verify", "evict", "compact"])
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--max-mb", type=float, default=CACHE_MAX_BYTES / 1024 ** 2)
+    parser.add_argument("--http-max-mb", type=float, default=HTTP_CACHE_MAX_BYTES / 1024 ** 2)
+    parser.add_argument("--pin", type=int, nargs="*", help="Seasons never evicted, defaults to the current one")
+    parser.add_argument("--deep", action="store_true", help="verify: load every pickle instead of checking its end")
+    parser.add_argument("--repair", action="store_true", help="verify: delete the broken entries")
+    parser.add_argument("--refetch", action="store_true", help="verify --repair: download repaired sessions again")
+    args = parser.parse_args()
+
+    manager = CacheManager(args.cache_dir, int(args.max_mb * 1024 * 1024), args.pin,
+                           http_max_bytes=int(args.http_max_mb * 1024 * 1024))
+
+    if args.command == "stats":
+        stats = manager.stats()
+        print(f"📦 {stats['root']}: {stats['sessions']} sessions, {_mb(stats['session_bytes'])} of {_mb(stats['max_bytes'])}, "
+              f"HTTP cache {_mb(stats['http_cache_bytes'])} of {_mb(stats['http_max_bytes'])}")
+        for year, nbytes in stats["bytes_by_year"].items():
+            print(f"   {year}: {_mb(nbytes)}{' (pinned)' if year in manager.pinned_years else ''}")
+    elif args.command == "verify":
+        problems = manager.verify(deep=args.deep)
+        for problem in problems:
+            print(f"⚠️ {problem.path}: {problem.reason}")
+        if args.repair:
+            manager.enable()
+            print(f"🔧 Repaired {manager.repair(problems, refetch=args.refetch)} entries")
+        elif not problems:
+            print("✅ No problems found")
+    elif args.command == "evict":
+        evicted = manager.evict()
+        for entry in evicted:
+            print(f"🗑️ Evicted {entry.year} {entry.event_name} {entry.session_name} ({_mb(entry.nbytes)})")
+        print(f"✅ Evicted {len(evicted)} sessions")
+    elif args.command == "compact":
+        print(f"🗜️ Freed {_mb(manager.compact())}")
+
+
+if __name__ == "__main__":
+    main()
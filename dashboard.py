@@ -1,184 +1,340 @@
+import json
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
-import fastf1 as ff1
 from datetime import datetime
-from data_importing import load_session, get_team_order, get_team_color, drs_to_boolean
-import plotting as fsp
-import time
+from uuid import uuid4
+from schedule_cache import get_schedule
+from instrumentation import instrumentation, span
+
+# Only the schedule is needed to draw the sidebar. Everything else (FastF1 sessions, matplotlib/seaborn
+# through plotting, the drivers scraper, the records store) is imported by the view that uses it, the
+# first time that view is opened, and each view only computes its own data.
+
+VIEWS = ["Graphics", "Schedule", "Drivers", "Records"]
+
+# Data each Graphics page needs; only the Telemetry page pulls car/position data
+PAGE_LOAD_PROFILES = {
+    "Lap Time Distributions": "laps",
+    "Pace Comparisons": "laps",
+    "Whole Race": "laps",
+    "Telemetry": "full",
+}
+
+# Seconds between server-side checks whether an upcoming event's first session can be loaded
+COUNTDOWN_CHECK_INTERVAL = 30
+
+def show_countdown(event_time: datetime):
+    # The countdown ticks in the browser, so no server thread or rerun is needed per second
+    components.html(f"""
+        <div id="countdown" style="font-family: monospace; font-size: 1rem;"></div>
+        <script>
+            const target = Date.parse("{event_time.isoformat()}Z");
+            function tick() {{
+                const remaining = Math.max(0, Math.floor((target - Date.now()) / 1000));
+                const days = Math.floor(remaining / 86400);
+                const pad = (value) => String(value).padStart(2, "0");
+                document.getElementById("countdown").textContent =
+                    `Time left: ${{days}}d ${{pad(Math.floor(remaining % 86400 / 3600))}}h ` +
+                    `${{pad(Math.floor(remaining % 3600 / 60))}}m ${{pad(remaining % 60)}}s`;
+            }}
+            tick();
+            setInterval(tick, 1000);
+        </script>
+    """, height=40)
+
+def show_debug_panel():
+    from data_importing import compaction_reports
+
+    # Spans of this rerun plus the per-operation histograms since the server started
+    with st.sidebar.expander("⏱️ Debug: Timings"):
+        trace = sorted(instrumentation.current_trace(), key=lambda s: s.start)
+        if trace:
+            st.dataframe(pd.DataFrame({
+                "Operation": ["· " * s.depth + s.name for s in trace],
+                "ms": [round(s.duration * 1000, 1) for s in trace],
+                "Peak MB": [round(s.peak_bytes / 1024 ** 2, 1) for s in trace],
+            }), hide_index=True)
+        else:
+            st.caption("Nothing measured in this rerun (everything came from cache).")
+
+        summary = instrumentation.to_json()
+        st.dataframe(pd.DataFrame([
+            {"Operation": name, "Count": h["count"], "Avg ms": round(h["sum_seconds"] / h["count"] * 1000, 1),
+             "Max ms": round(h["max_seconds"] * 1000, 1), "Max Peak MB": round(h["max_peak_bytes"] / 1024 ** 2, 1)}
+            for name, h in summary.items()
+        ]), hide_index=True)
+        if compaction_reports:
+            st.dataframe(pd.DataFrame([
+                {"Session": " ".join(map(str, key)), "Loaded MB": round(r.before_bytes / 1024 ** 2, 1),
+                 "Compacted MB": round(r.after_bytes / 1024 ** 2, 1), "Saved MB": round(r.saved_bytes / 1024 ** 2, 1)}
+                for key, r in compaction_reports.items()
+            ]), hide_index=True)
+        st.download_button("Download JSON", json.dumps(summary, indent=2), "f1_dashboard_metrics.json", "application/json")
+        st.download_button("Download Prometheus", instrumentation.to_prometheus(), "f1_dashboard_metrics.prom", "text/plain")
+
+def show_graphics(year: int, event: str, session_type: str):
+    page = st.selectbox("Select Graphics", list(PAGE_LOAD_PROFILES))
+
+    with span("import.graphics"):
+        import plotting as fsp
+        from data_importing import load_session
+        from prefetch import prefetcher
+
+    # Load the session with only what the selected page needs
+    with st.spinner(f"Loading session data for {event} - {session_type}..."):
+        session, schedule, quick_laps = load_session(year, event, session_type, source="archive",
+                                                   profile=PAGE_LOAD_PROFILES[page])
 
-from webscrape import get_f1_drivers
+    # Warm the other sessions of this weekend and the neighbouring rounds while the user looks at this one
+    prefetcher.schedule(st.session_state.setdefault("prefetch_owner", uuid4().hex), year, event, session_type)
 
-# Default wide mode
-st.set_page_config(layout="wide")
+    if page == "Lap Time Distributions":
+        from data_importing import get_team_order, get_team_color
 
-st.header("🏎️ Formula Stats - Dashboard")
+        with span("prepare"):
+            # Get team order and team colors
+            team_order = get_team_order(quick_laps)
+            team_colors = get_team_color(session, team_order)
 
-# Create tabs
-tab1, tab2, tab3, tab4 = st.tabs(["Graphics", "Schedule", "Drivers", "Records"])
+        st.subheader("Team Lap Time Distribution")
+        st.text(
+            "Graphic represents a box plot of quick laps* grouped by teams. With the avg team lap listed.\n"
+            "\n"
+            "*quick lap - within 107% of the fastest lap in the session"
+        )
+        st.image(fsp.cached_plot(session, fsp.general_lap_time_dist, quick_laps, team_order, team_colors, session), use_container_width=True)
 
-# Get the current year
-today = datetime.today().year
+        st.subheader("Point Scorers Lap Time Distribution")
+        st.image(fsp.cached_plot(session, fsp.violin_dist_point_scorers, session), use_container_width=True)
 
-# Step 1: Choose year
-year = st.sidebar.selectbox("Select Year", list(range(2018, today + 1))[::-1])
+    elif page == "Pace Comparisons":
+        from pace_summary import session_pace_summary
 
-# Step 2: Get event schedule and choose event
-event_schedule = ff1.get_event_schedule(year, include_testing=False)
-race_names = event_schedule["EventName"].to_list()
+        with span("prepare"):
+            df_pace_comparison = session_pace_summary(session).table
 
-event = st.sidebar.selectbox("Select Event", race_names)
-event_time = event_schedule[event_schedule["EventName"] == event]["Session5DateUtc"].iloc[0]
+        st.subheader("Fastest Lap Team Pace Comparison")
+        st.image(fsp.cached_plot(session, fsp.fastest_lap_team_pace_comparison, df_pace_comparison), use_container_width=True)
 
-if event_time > datetime.utcnow():
-    st.header("Selected Event Didn't Happen Yet!")
+        st.subheader("Avg Lap Team Pace Comparison")
+        st.image(fsp.cached_plot(session, fsp.avg_lap_team_pace_comparison, df_pace_comparison), use_container_width=True)
 
-    countdown_placeholder = st.empty()
+    elif page == "Whole Race":
+        from stints import session_stint_model
 
-    # This will update the countdown every second until the event time is reached
-    while event_time > datetime.utcnow():
-        now = datetime.utcnow()
-        remaining = event_time - now
+        st.subheader("Lap Times Over Entire Race")
+        st.image(fsp.cached_plot(session, fsp.plot_race_lap_times, session, fontsize=110), use_container_width=True)
 
-        days = remaining.days
-        hours, rem = divmod(remaining.seconds, 3600)
-        minutes, seconds = divmod(rem, 60)
+        st.subheader("Gap to Leader")
+        st.image(fsp.cached_plot(session, fsp.plot_gap_to_leader, session, fontsize=110), use_container_width=True)
 
-        countdown_placeholder.text(f'Time left: {days}d {hours:02}h {minutes:02}m {seconds:02}s')
-        time.sleep(1)
+        st.subheader("Position Changes")
+        st.image(fsp.cached_plot(session, fsp.plot_position_changes, session, fontsize=110), use_container_width=True)
 
-    # Once the event starts
-    countdown_placeholder.text("Event Started!")
-else:
+        st.subheader("Rolling Pace")
+        st.image(fsp.cached_plot(session, fsp.plot_rolling_pace, session, fontsize=110), use_container_width=True)
 
-    # Step 3: Choose session (FP1, FP2, FP3, Q, R)
-    event_info = event_schedule[event_schedule["EventName"] == event].iloc[0]
-    session_columns = [f"Session{i}" for i in range(5, 0, -1)]
-    available_sessions = [
-        session for session in event_info[session_columns].values 
-        if isinstance(session, str)
-    ]
+        st.subheader("Tyre Degradation per Stint")
+        st.image(fsp.cached_plot(session, fsp.plot_stint_degradation, session), use_container_width=True)
+        st.dataframe(session_stint_model(session).stints.round(3), use_container_width=True, hide_index=True)
 
-    session_type = st.sidebar.selectbox("Select Session", available_sessions)
+    elif page == "Telemetry":
+        from data_importing import get_fastest_laps
 
-    # Step 4: Load and process session data
-    with st.spinner(f"Loading session data for {event} - {session_type}..."):
-        session, schedule, quick_laps = load_session(year, event, session_type)
-        
-        # Convert LapTime to seconds for easier plotting
-        quick_laps["LapTime"] = quick_laps["LapTime"].dt.total_seconds()
-        
-        # Get team order and team colors
-        team_order = get_team_order(quick_laps)
-        team_colors = get_team_color(session, team_order)
+        drivers = [driver for driver in session.results['Abbreviation']]
+        # Drivers without a timed lap (e.g. retired on lap 1) have no fastest lap to show
+        fastest_laps = get_fastest_laps(session)
+        timed_drivers = [d for d in drivers if d in fastest_laps]
+        lap_numbers = range(1, int(session.laps["LapNumber"].max()) + 1)
 
-        teams = list(session.laps['Team'].unique())
+        st.subheader("Lap Telemetry Over Selected Lap")
+        driver = st.selectbox("Select Driver:", drivers)
+        lap_choice  = st.radio("Choose Lap Option:", ["Fastest Lap", "Specific Lap"])
+
+        if lap_choice == "Specific Lap":
+            lap = st.selectbox("Select Lap:", lap_numbers)
+        else:
+            lap = fastest_laps.get(driver)
+        if lap is None:
+            st.warning(f"{driver} has no timed lap in this session, pick a specific lap instead.")
+        else:
+            st.image(fsp.cached_plot(session, fsp.plot_telemetry, session, driver, lap, params=(driver, lap)), use_container_width=True)
+            show_lap_summaries(session, [(driver, lap)])
+
+        st.subheader("Lap Telemetry Comparison")
+        col1, col2 = st.columns(2)
+        with col1:
+            driver1 = st.selectbox("Select Driver 1:", drivers)
+        with col2:
+            driver2 = st.selectbox("Select Driver 2:", [d for d in drivers if d != driver1])
+        lap_choice  = st.radio("Choose Lap:", ["Fastest Lap", "Specific Lap"])
+
+        if lap_choice == "Specific Lap":
+            col1, col2 = st.columns(2)
+            with col1:
+                lap_driver_1 = st.selectbox("Select Lap for Driver 1:", lap_numbers)
+            with col2:
+                lap_driver_2 = st.selectbox("Select Lap for Driver 2:", lap_numbers)
+        else:
+            lap_driver_1, lap_driver_2 = fastest_laps.get(driver1), fastest_laps.get(driver2)
+        missing = [d for d, l in ((driver1, lap_driver_1), (driver2, lap_driver_2)) if l is None]
+        if missing:
+            st.warning(f"{' and '.join(missing)} {'has' if len(missing) == 1 else 'have'} no timed lap in this session, "
+                       "pick specific laps instead.")
+        else:
+            st.image(fsp.cached_plot(session, fsp.plot_telemetry_comparison, session, driver1, driver2, lap_driver_1, lap_driver_2,
+                                      params=(driver1, driver2, lap_driver_1, lap_driver_2)), use_container_width=True)
+            show_lap_summaries(session, [(driver1, lap_driver_1), (driver2, lap_driver_2)])
+
+        if lap is not None:
+            st.subheader("Track Map")
+            col1, col2 = st.columns(2)
+            with col1:
+                color_by = st.selectbox("Colour By:", ["Speed", "Gear", "Delta"])
+            reference = None
+            if color_by == "Delta":
+                with col2:
+                    reference_driver = st.selectbox("Delta To (fastest lap):", [d for d in timed_drivers if d != driver])
+                if reference_driver is not None:
+                    reference = (reference_driver, fastest_laps[reference_driver])
+            channel = {"Speed": "Speed", "Gear": "nGear", "Delta": "Delta"}[color_by]
+            if channel != "Delta" or reference is not None:
+                st.image(fsp.cached_plot(session, fsp.plot_track_map, session, driver, lap, channel, reference,
+                                         params=(driver, lap, channel, reference)), use_container_width=True)
+
+        st.subheader("Multi-Driver Fastest Lap Comparison")
+        # Empty by default: the first overlay builds the session's telemetry index, only done once asked for
+        overlay_drivers = st.multiselect("Select Drivers:", timed_drivers)
+        if overlay_drivers:
+            selections = [(d, fastest_laps[d]) for d in overlay_drivers]
+            st.image(fsp.cached_plot(session, fsp.plot_telemetry_overlay, session, selections, params=tuple(selections)), use_container_width=True)
+            show_lap_summaries(session, selections)
+
+def show_lap_summaries(session, selections):
+    from data_importing import get_lap_summaries
+
+    summary = get_lap_summaries(session, selections)
+    summary["Full Throttle"] = (summary.pop("Full Throttle Fraction") * 100).round(1).astype(str) + " %"
+    summary["Top Speed"] = summary["Top Speed"].round(1)
+    st.dataframe(summary, hide_index=True, use_container_width=True)
+
+def show_schedule(year: int):
+    df_schedule = get_schedule(year).table()
+    st.subheader(f"Event Schedule for the {year} season")
+    st.dataframe(df_schedule, hide_index=True)
+
+def show_drivers(year: int, event: str, session_type: str):
+    from webscrape import get_f1_drivers
+
+    st.subheader("Formula 1 Driver Statistics")
+    df_f1_drivers = get_f1_drivers()
+    selected_drivers = st.radio("Select Drivers:", ["Current Drivers", "All Drivers"])
+    if selected_drivers == "All Drivers":
+        st.dataframe(df_f1_drivers, use_container_width=True, hide_index=True)
+    elif session_type is None:
+        st.info("Current drivers are listed once the selected event's first session is over.")
+    else:
+        import fastf1.plotting
+        from data_importing import get_cached_session
+
+        # Driver names come with the results, the laps-only load (or any heavier one already in memory) has them
+        with st.spinner(f"Loading session data for {event} - {session_type}..."):
+            session = get_cached_session(year, event, session_type, profile="laps")
+
+        all_drivers_data = []
+
+        for name in fastf1.plotting.list_driver_names(session):
+            df_temp = df_f1_drivers[df_f1_drivers["Driver name"] == name]
+            all_drivers_data.append(df_temp)
+
+        df_current_drivers = pd.concat(all_drivers_data, ignore_index=True)
+        st.dataframe(df_current_drivers, use_container_width=True, hide_index=True)
+
+def show_records(year: int):
+    import records
+
+    st.subheader("Formula 1 Records (2018 - current)")
+    record_circuits = records.circuits()
+    if not record_circuits:
+        st.info("The records store is empty. Run `python records.py` to ingest finished sessions.")
+    else:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("**Fastest Qualifying Lap per Circuit**")
+            st.dataframe(records.fastest_laps_by_circuit(), hide_index=True)
+        with col2:
+            st.markdown("**Pole Positions**")
+            st.dataframe(records.pole_positions(), hide_index=True)
+
+        circuit = st.selectbox("Select Circuit:", record_circuits)
+        st.markdown(f"**Fastest Qualifying Lap by Season | {circuit}**")
+        st.line_chart(records.lap_time_progression(circuit), x="Year", y="Lap Time (s)")
+
+        st.markdown(f"**Teammate Race Head-to-Head | {year}**")
+        st.dataframe(records.teammate_head_to_head(year), hide_index=True)
 
-        fastest_lap_times = {team: [] for team in session.laps['Team'].unique()}
-        avg_lap_times = {team: [] for team in session.laps['Team'].unique()}
+# Default wide mode
+st.set_page_config(layout="wide")
 
-        for team in teams:
-            fastest_lap_times[team] = session.laps.pick_teams(team)['LapTime'].min()
-            avg_lap_times[team] = session.laps.pick_teams(team)['LapTime'].mean()
+instrumentation.begin_trace()
 
-        df_fastest_lap_times = pd.DataFrame.from_dict(fastest_lap_times, orient='index', columns=['Fastest Lap']).reset_index()
-        df_avg_lap_times = pd.DataFrame.from_dict(avg_lap_times, orient='index', columns=['Avg Lap']).reset_index()
-        df_pace_comparison = pd.merge(df_fastest_lap_times, df_avg_lap_times, on="index")
+st.header("🏎️ Formula Stats - Dashboard")
 
-        df_pace_comparison.columns = ["Team", "Fastest Lap", "Avg Lap"]
-        df_pace_comparison["Percentage Diff Fast Lap"] = (((df_pace_comparison['Fastest Lap'] - df_pace_comparison['Fastest Lap'].min()) / df_pace_comparison['Fastest Lap'].min()) * 100).round(2)
-        df_pace_comparison["Percentage Diff Avg Lap"] = (((df_pace_comparison['Avg Lap'] - df_pace_comparison['Avg Lap'].min()) / df_pace_comparison['Avg Lap'].min()) * 100).round(2)
-        df_pace_comparison['Team Color'] = df_pace_comparison['Team'].apply(lambda team: ff1.plotting.get_team_color(team, session))
+# Views are switched with a radio instead of st.tabs: tabs run the code of every tab
+# on each rerun, here only the selected view is computed
+view = st.radio("View", VIEWS, key="view", horizontal=True, label_visibility="collapsed")
 
-        drivers = [driver for driver in session.results['Abbreviation']]
+# Get the current year
+today = datetime.today().year
 
+# Step 1: Choose year
+year = st.sidebar.selectbox("Select Year", list(range(2018, today + 1))[::-1])
 
+# Step 2: Get event schedule and choose event
+season = get_schedule(year)
+race_names = season.event_names
 
-    # Display content inside tabs
-    with tab1:
-        if event:  # Only show page chooser if event is selected
-            page = st.selectbox("Select Graphics",
-                                ["Lap Time Distributions",
-                                "Pace Comparisons",
-                                "Whole Race",
-                                "Telemetry"
-            ])
-            
-            if page == "Lap Time Distributions":
-                st.subheader("Team Lap Time Distribution")
-                st.text(
-                    "Graphic represents a box plot of quick laps* grouped by teams. With the avg team lap listed.\n"
-                    "\n"
-                    "*quick lap - within 107% of the fastest lap in the session" 
-                )
-                st.pyplot(fsp.add_watermark(fsp.general_lap_time_dist(quick_laps, team_order, team_colors, session)))
-
-                st.subheader("Point Scorers Lap Time Distribution")
-                st.pyplot(fsp.add_watermark(fsp.violin_dist_point_scorers(session)))
-
-            elif page == "Pace Comparisons":
-                st.subheader("Fastest Lap Team Pace Comparison")
-                st.pyplot(fsp.add_watermark(fsp.fastest_lap_team_pace_comparison(df_pace_comparison)))
-
-                st.subheader("Avg Lap Team Pace Comparison")
-                st.pyplot(fsp.add_watermark(fsp.avg_lap_team_pace_comparison(df_pace_comparison)))
-
-            elif page == "Whole Race":
-                st.subheader("Lap Times Over Entire Race")
-                st.pyplot(fsp.add_watermark(fsp.plot_race_lap_times(session), fontsize=110))
-
-            elif page == "Telemetry":
-                st.subheader("Lap Telemetry Over Selected Lap")
-                driver = st.selectbox("Select Driver:", drivers)
-                lap_choice  = st.radio("Choose Lap Option:", ["Fastest Lap", "Specific Lap"])
-
-                if lap_choice == "Specific Lap":
-                    lap = st.selectbox("Select Lap:", range(1, int(max(session.laps["LapNumber"])+1)))
-                else:
-                    lap = session.laps.pick_drivers(driver).pick_fastest()["LapNumber"]
-                st.pyplot(fsp.add_watermark(fsp.plot_telemetry(session, driver, lap)))
-
-                st.subheader("Lap Telemetry Comparison")
-                col1, col2 = st.columns(2)
-                with col1:
-                    driver1 = st.selectbox("Select Driver 1:", drivers)
-                with col2:
-                    driver2 = st.selectbox("Select Driver 2:", [d for d in drivers if d != driver1])
-                lap_choice  = st.radio("Choose Lap:", ["Fastest Lap", "Specific Lap"])
-
-                if lap_choice == "Specific Lap":
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        lap_driver_1 = st.selectbox("Select Lap for Driver 1:", range(1, int(max(session.laps["LapNumber"])+1)))
-                    with col2:
-                        lap_driver_2 = st.selectbox("Select Lap for Driver 2:", range(1, int(max(session.laps["LapNumber"])+1)))
-                else:
-                    lap_driver_1 = session.laps.pick_drivers(driver1).pick_fastest()["LapNumber"]
-                    lap_driver_2 = session.laps.pick_drivers(driver2).pick_fastest()["LapNumber"]
-                st.pyplot(fsp.add_watermark(fsp.plot_telemetry_comparison(session, driver1, driver2, lap_driver_1, lap_driver_2)))
-
-    with tab2:
-        df_schedule = event_schedule[["EventDate", "Location", "EventName", "EventFormat", "OfficialEventName"]].copy()
-        df_schedule = df_schedule.rename(columns={"EventDate":"Event Date", "EventName":"Name", "EventFormat":"Format", "OfficialEventName":"Official Name"})
-        df_schedule["Format"] = df_schedule["Format"].apply(lambda x: "Sprint" if x == "sprint_qualifying" else "Conventional")
-        st.subheader(f"Event Schedule for the {today} season")
-        st.dataframe(df_schedule, hide_index=True)
-    
-    
-    with tab3:
-        st.subheader("Formula 1 Driver Statistics")
-        df_f1_drivers = get_f1_drivers()
-        selected_drivers = st.radio("Select Drivers:", ["Current Drivers", "All Drivers"])
-        if selected_drivers == "All Drivers":
-            st.dataframe(df_f1_drivers, use_container_width=True, hide_index=True)
+event = st.sidebar.selectbox("Select Event", race_names)
+# Sessions are offered once they're over and their data is complete, before that the weekend's
+# first session is counted down to
+now = datetime.utcnow()
+available_sessions = season.available_sessions(event, now)
+
+session_type = None
+if not available_sessions:
+    first_session_time = season.event(event)["Session1DateUtc"]
+    first_data_time = season.first_available_at(event)
+    if first_data_time is None:
+        st.header("Selected Event Has No Scheduled Sessions")
+    else:
+        if pd.notna(first_session_time) and first_session_time > now:
+            st.header("Selected Event Didn't Happen Yet!")
+            show_countdown(first_session_time)
         else:
-            all_drivers_data = []
+            st.header("Waiting for the First Session's Data")
+            show_countdown(first_data_time)
 
-            for name in ff1.plotting.list_driver_names(session):
-                df_temp = df_f1_drivers[df_f1_drivers["Driver name"] == name]
-                all_drivers_data.append(df_temp)
+        # Checks in the background and switches to the session view once the first session's data is in
+        @st.fragment(run_every=COUNTDOWN_CHECK_INTERVAL)
+        def wait_for_event():
+            if first_data_time <= datetime.utcnow():
+                st.rerun()
 
-            df_current_drivers = pd.concat(all_drivers_data, ignore_index=True)
-            st.dataframe(df_current_drivers, use_container_width=True, hide_index=True)
+        wait_for_event()
+else:
+    session_type = st.sidebar.selectbox("Select Session", available_sessions)
 
-    with tab4:
-        pass
\ No newline at end of file
+with span(f"view.{view}"):
+    if view == "Graphics":
+        if session_type is not None:
+            show_graphics(year, event, session_type)
+    elif view == "Schedule":
+        show_schedule(year)
+    elif view == "Drivers":
+        show_drivers(year, event, session_type)
+    elif view == "Records":
+        show_records(year)
+
+if instrumentation.enabled:
+    show_debug_panel()
@@ -1,42 +1,185 @@
 import fastf1 as ff1
-from fastf1 import plotting
-from fastf1 import utils
 import pandas as pd
-from typing import Tuple, Dict, List
-from fastf1.core import Session
-# import os
+import threading
+from collections import OrderedDict
+from typing import Tuple, Dict, List, Optional, Union
+from fastf1.core import Session, Laps, Telemetry
+from fastf1.exceptions import DataNotLoadedError
+from session_store import SessionStore, SESSION_STORE_MAX_BYTES
+from session_archive import ArchivedSession, archive_exists
+from schedule_cache import get_schedule
+from telemetry_enrichment import enrich_telemetry, telemetry_summary, DRS_OPEN_VALUES
+from instrumentation import span, instrumented
+from session_compaction import COMPACT_SESSIONS, CompactionReport, compact_session
+from cache_manager import cache_manager
 
-# cache_dir = '/Users/bartosz/Data Projects/f1_analysis/Data/Detailed_Positional_Data_(2018-current)'
-# if not os.path.exists(cache_dir):
-#     os.makedirs('/Users/bartosz/Data Projects/f1_analysis/Data/Detailed_Positional_Data_(2018-current)')
+# FastF1's disk cache, location and size budget come from F1_CACHE_DIR / F1_CACHE_DISK_MB
+cache_manager.enable()
 
-# ff1.Cache.enable_cache(cache_dir)
+def session_nbytes(session: Session) -> int:
+    # Approximate heap size of a loaded session, used for the store's memory budget
+    frames = []
+    for attr in ("laps", "results", "weather_data"):
+        try:
+            frames.append(getattr(session, attr))
+        except Exception:
+            pass
+    for attr in ("car_data", "pos_data"):
+        try:
+            frames.extend(getattr(session, attr).values())
+        except Exception:
+            pass
+    return int(sum(frame.memory_usage(deep=True).sum() for frame in frames if isinstance(frame, pd.DataFrame)))
 
-def load_session(year: int, event: str, session_type:str) -> Tuple[Session, pd.DataFrame, pd.DataFrame]:
-    schedule = ff1.get_event_schedule(year, include_testing=False)
+# Shared by every rerun and browser tab of the process; sessions in it must be treated as read-only
+session_store = SessionStore(SESSION_STORE_MAX_BYTES, session_nbytes)
+
+# What each load profile pulls from the API, ordered from lightest to heaviest
+LOAD_PROFILES = {
+    "laps": dict(laps=True, telemetry=False, weather=False, messages=False),
+    "laps+weather": dict(laps=True, telemetry=False, weather=True, messages=False),
+    "full": dict(laps=True, telemetry=True, weather=True, messages=True),
+}
+
+# Bytes before/after compaction of every session loaded by this process
+compaction_reports: Dict[tuple, CompactionReport] = {}
+
+def _load_fastf1_session(year: int, event: str, session_type: str, profile: str = "full") -> Session:
     session = ff1.get_session(year, event, session_type)
-    session.load()
-    
-    quick_laps = session.laps.pick_quicklaps()
+    with span(f"session.load[{profile}]"):
+        session.load(**LOAD_PROFILES[profile])
+    # Measures what the load wrote and enforces the disk budget on the cache manager's own thread
+    cache_manager.record_load(session)
+    if COMPACT_SESSIONS:
+        # Compacted before the store measures it, so the budget counts the smaller size
+        with span("compact_session"):
+            compaction_reports[(year, event, session_type, profile)] = compact_session(session)
+    return session
+
+def get_cached_session(year: int, event: str, session_type: str, profile: str = "full") -> Session:
+    # A session loaded with a heavier profile also serves the lighter ones
+    profiles = list(LOAD_PROFILES)
+    for heavier in profiles[profiles.index(profile):]:
+        session = session_store.peek((year, event, session_type, heavier))
+        if session is not None:
+            cache_manager.record_use(session)
+            return session
+
+    session = session_store.get(
+        (year, event, session_type, profile),
+        lambda: _load_fastf1_session(year, event, session_type, profile)
+    )
+    if profile == "full":
+        for lighter in profiles[:-1]:
+            session_store.discard((year, event, session_type, lighter))
+    cache_manager.record_use(session)
+    return session
+
+# Lap columns of quick_laps, all the laps-only pages read (also what's read from the columnar archive)
+QUICK_LAP_COLUMNS = ["Driver", "Team", "LapNumber", "LapTime", "Stint", "Compound"]
+
+def _quick_laps(laps: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    # Same selection as Laps.pick_quicklaps, projected to the needed columns in a single copy
+    quick = laps["LapTime"] < laps["LapTime"].min() * Laps.QUICKLAP_THRESHOLD
+    quick_laps = pd.DataFrame(laps.loc[quick, columns])
     quick_laps["Lap Time (s)"] = quick_laps["LapTime"].dt.total_seconds()
+    return quick_laps
+
+def _load_archived_session(year: int, event: str, session_type: str) -> ArchivedSession:
+    # Laps and results are decoded here, once per process, so the store measures them
+    session = ArchivedSession(year, event, session_type)
+    with span("archive.read"):
+        session.laps, session.results
+    return session
+
+@instrumented("load_session")
+def load_session(year: int, event: str, session_type:str, source: str = "fastf1",
+                 columns: Optional[List[str]] = None, profile: str = "full") -> Tuple[Union[Session, ArchivedSession], pd.DataFrame, pd.DataFrame]:
+    # source="archive" serves the laps-only profiles from the Parquet archive written by
+    # export_data_from_fastf1.py (shared through the session store like FastF1 sessions),
+    # falling back to FastF1 if the session wasn't archived
+    schedule = get_schedule(year).schedule
+
+    if source == "archive" and profile != "full" and archive_exists(year, event, session_type):
+        session = session_store.get((year, event, session_type, "archive"),
+                                    lambda: _load_archived_session(year, event, session_type))
+        with span("quick_laps"):
+            quick_laps = _quick_laps(session.laps, columns or QUICK_LAP_COLUMNS)
+        return session, schedule, quick_laps
+
+    session = get_cached_session(year, event, session_type, profile)
+    
+    with span("quick_laps"):
+        quick_laps = _quick_laps(session.laps, columns or QUICK_LAP_COLUMNS)
     
     return session, schedule, quick_laps
 
+def with_telemetry(session: Session) -> Session:
+    # Session was loaded with a laps-only profile, fetch the full session now
+    try:
+        session.car_data
+        return session
+    except DataNotLoadedError:
+        return get_cached_session(session.event.year, session.event["EventName"], session.name, "full")
+
+# Per-lap enriched telemetry already fetched for the Telemetry page, keyed by session, driver and lap
+_lap_telemetry: "OrderedDict[tuple, Telemetry]" = OrderedDict()
+_lap_telemetry_lock = threading.Lock()
+LAP_TELEMETRY_MEMO_SIZE = 64
+
+def get_lap_telemetry(session: Session, driver: str, lap: int) -> Telemetry:
+    key = (session.event.year, session.event["EventName"], session.name, driver, int(lap))
+    with _lap_telemetry_lock:
+        if key in _lap_telemetry:
+            _lap_telemetry.move_to_end(key)
+            return _lap_telemetry[key]
+
+    session = with_telemetry(session)
+    with span("get_telemetry"):
+        telemetry = session.laps.pick_drivers(driver).pick_laps(int(lap)).get_telemetry().add_distance()
+    # Enriched once here so every plot shares the derived channels (DRS bool, braking zones, ...)
+    with span("enrich_telemetry"):
+        telemetry = enrich_telemetry(telemetry)
+
+    with _lap_telemetry_lock:
+        _lap_telemetry[key] = telemetry
+        while len(_lap_telemetry) > LAP_TELEMETRY_MEMO_SIZE:
+            _lap_telemetry.popitem(last=False)
+    return telemetry
+
+def get_fastest_laps(session: Session) -> Dict[str, int]:
+    # Lap number of each driver's fastest lap, picked like Laps.pick_fastest (personal bests only);
+    # drivers without a timed lap are left out
+    laps = session.laps
+    timed = laps[(laps["IsPersonalBest"] == True) & laps["LapTime"].notna()]  # noqa: E712
+    fastest = timed.loc[timed.groupby("Driver", sort=False)["LapTime"].idxmin()]
+    return {driver: int(lap) for driver, lap in zip(fastest["Driver"], fastest["LapNumber"])}
+
+def get_lap_summaries(session: Session, selections: List[Tuple[str, int]]) -> pd.DataFrame:
+    # Full throttle fraction, braking zones, gear shifts and top speed of each (driver, lap), one row each
+    frames = [pd.DataFrame(get_lap_telemetry(session, driver, lap)).assign(Lap=f"{driver} - Lap {int(lap)}")
+              for driver, lap in selections]
+    summary = telemetry_summary(pd.concat(frames, ignore_index=True), group="Lap")
+    summary.index.name = "Lap"
+    return summary.reset_index()
+
 def get_team_order(quick_laps: pd.DataFrame, fastest_first: bool = True) -> pd.Index:
     return (
     quick_laps[["LapTime", "Team"]]
-    .groupby("Team")
+    .groupby("Team", observed=True)
     .median()["LapTime"]
     .sort_values(ascending=fastest_first)
     .index
     )
 
 def get_team_color(session: Session, team_order: pd.Index) -> Dict[str, str]:
+    # fastf1.plotting pulls in matplotlib, only import it once colours are actually needed
+    from fastf1 import plotting
     return {team: plotting.get_team_color(team, session=session)
                 for team in team_order}
 
 def drs_to_boolean(drs_value): #Convert DRS value to boolean
-    if drs_value in [10, 12, 14]:
+    if drs_value in DRS_OPEN_VALUES:
         return True  # DRS is enabled
     else:
         return False  # Every other value is treated as though the DRS is disabled
\ No newline at end of file
@@ -1,44 +1,156 @@
-from fastf1 import get_session
-import fastf1
+import argparse
+import json
+import os
+import shutil
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Optional
+
+import fastf1
+from cache_manager import CACHE_DIR, CACHE_MAX_BYTES, CacheManager
+from session_archive import write_session_archive
+
+MANIFEST_PATH = 'prefetch_manifest.json'
+# Per-worker HTTP caches, inside the cache directory
+WORKER_HTTP_CACHE_DIR = 'http_workers'
+SESSIONS = ['FP1', 'FP2', 'FP3', 'Q', 'R', 'S', 'SQ', 'SS']
 
-fastf1.Cache.enable_cache('/Users/bartosz/Data Projects/f1_analysis/Data/Detailed_Positional_Data_(2018-current)')
+COMPLETE = 'complete'
+FAILED = 'failed'
+NOT_APPLICABLE = 'not_applicable'
 
-years = [2025]
-sessions = ['FP1', 'FP2', 'FP3', 'Q', 'R', 'S', 'SQ', 'SS']
 
-for year in years:
-    print(f"📅 Loading schedule for {year}...")
-    retries = 3
+def with_backoff(func, retries: int, backoff: float):
+    # Call func, retrying with exponential backoff (backoff, 2*backoff, 4*backoff, ...)
     for attempt in range(retries):
         try:
-            schedule = fastf1.get_event_schedule(year)
-            break
-        except ValueError as e:
-            print(f"⚠️ Attempt {attempt+1}/{retries} failed: {e}")
-            if attempt < retries - 1:
-                time.sleep(5)
-            else:
-                print(f"❌ Skipping year {year} due to repeated failures.")
-                continue
-
-    for _, event in schedule.iterrows():
-        event_name = event['EventName']
-        for session in sessions:
-            try:
-                sess = get_session(year, event_name, session)
+            return func()
+        except Exception:
+            if attempt == retries - 1:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+def load_manifest(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: dict, path: str) -> None:
+    # Write to a temporary file first so a crash never leaves a half-written manifest
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def manifest_key(year: int, event_name: str, session: str) -> str:
+    return f"{year}|{event_name}|{session}"
+
+
+def prefetch_session(year: int, event_name: str, session: str, cache_dir: str,
+                     retries: int, backoff: float, archive: bool) -> Optional[str]:
+    # Runs in a worker process, returns the session's cache directory for the parent to measure.
+    # Each worker writes its own HTTP cache file, the parsed pickles are shared.
+    cache = CacheManager(cache_dir, CACHE_MAX_BYTES)
+    cache.enable(http_cache_file=os.path.join(WORKER_HTTP_CACHE_DIR, f"{os.getpid()}.sqlite"))
+
+    def load():
+        sess = fastf1.get_session(year, event_name, session)
+        sess.load()  # Downloads and caches data if not cached
+        if archive:
+            write_session_archive(sess)  # Columnar copy read by load_session(source="archive")
+        return cache.session_path(sess)
+
+    return with_backoff(load, retries, backoff)
+
+
+def remove_worker_http_caches(cache_dir: str) -> None:
+    # The raw responses are only kept for the run, what the dashboard reads are the parsed pickles
+    shutil.rmtree(os.path.join(cache_dir, WORKER_HTTP_CACHE_DIR), ignore_errors=True)
+
+
+def plan_jobs(years, sessions, manifest: dict, retries: int, backoff: float):
+    # Yield the (year, event, session) combinations that still need work and
+    # record sessions that don't exist at an event as not applicable
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for year in years:
+        print(f"📅 Loading schedule for {year}...")
+        try:
+            schedule = with_backoff(lambda: fastf1.get_event_schedule(year, include_testing=False), retries, backoff)
+        except Exception as e:
+            print(f"❌ Skipping year {year} due to repeated failures: {e}")
+            continue
+
+        for _, event in schedule.iterrows():
+            event_name = event['EventName']
+            for session in sessions:
+                key = manifest_key(year, event_name, session)
+                if manifest.get(key, {}).get('status') in (COMPLETE, NOT_APPLICABLE):
+                    continue
 
-                # ✅ Check if session already cached by testing laps data
                 try:
-                    sess.laps  # Access laps to trigger minimal load from cache
-                    print(f"⏭️ Skipped {year} {event_name} {session} (already cached)")
+                    session_date = event.get_session_date(session, utc=True)
+                except ValueError:
+                    manifest[key] = {'status': NOT_APPLICABLE}
                     continue
-                except Exception:
-                    # If laps not available, we proceed to load the session
-                    pass
 
-                sess.load()  # Downloads and caches data if not cached
-                print(f"✅ Downloaded {year} {event_name} {session}")
+                if session_date > now:
+                    continue  # Not run yet, nothing to fetch
+
+                yield year, event_name, session
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Prefetch FastF1 sessions into the cache and the columnar archive.")
+    parser.add_argument('--years', type=int, nargs='+', default=[datetime.now().year])
+    parser.add_argument('--sessions', nargs='+', default=SESSIONS)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--backoff', type=float, default=5.0, help="Initial retry delay in seconds")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--manifest', default=MANIFEST_PATH)
+    parser.add_argument('--no-archive', action='store_true', help="Only warm the FastF1 cache")
+    args = parser.parse_args()
+
+    # Only this process measures and evicts, the workers report the sessions they wrote
+    cache = CacheManager(args.cache_dir, CACHE_MAX_BYTES)
+    cache.enable()
+    os.makedirs(os.path.join(args.cache_dir, WORKER_HTTP_CACHE_DIR), exist_ok=True)
+    manifest = load_manifest(args.manifest)
+    jobs = list(plan_jobs(args.years, args.sessions, manifest, args.retries, args.backoff))
+    save_manifest(manifest, args.manifest)
+    print(f"🔎 {len(jobs)} sessions to fetch")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(prefetch_session, year, event_name, session, args.cache_dir,
+                        args.retries, args.backoff, not args.no_archive): (year, event_name, session)
+            for year, event_name, session in jobs
+        }
+        for future in as_completed(futures):
+            year, event_name, session = futures[future]
+            key = manifest_key(year, event_name, session)
+            try:
+                cache.record_path(future.result())
+                manifest[key] = {'status': COMPLETE}
+                print(f"✅ Downloaded {year} {event_name} {session}")
             except Exception as e:
-                print(f"⚠️ Skipped {year} {event_name} {session}: {e}")
+                manifest[key] = {'status': FAILED, 'error': str(e)}
+                print(f"⚠️ Failed {year} {event_name} {session}: {e}")
+            # Saved after every session so a crashed run resumes where it stopped
+            save_manifest(manifest, args.manifest)
+
+    remove_worker_http_caches(args.cache_dir)
+    cache.wait()
+    stats = cache.stats()
+    print(f"📦 Cache at {stats['session_bytes'] / 1024 ** 2:,.0f} MB of {stats['max_bytes'] / 1024 ** 2:,.0f} MB")
+    if stats['evictions']:
+        print(f"⚠️ {stats['evictions']} older sessions evicted to stay within the budget (F1_CACHE_DISK_MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+from session_store import budget_from_env
+
+# Bump when plot output changes so stale images on disk are not served
+FIGURE_CACHE_VERSION = 2
+
+FIGURE_CACHE_DIR = os.environ.get("F1_FIGURE_CACHE_DIR", os.path.join("Data", "figures"))
+# Figures pre-rendered by render_batch.py, listed in the cache directory and never evicted
+PINNED_MANIFEST = "pinned.json"
+# Temporary files older than this are leftovers of an interrupted write
+STALE_TMP_SECONDS = 3600
+
+
+class FigureCache:
+    # Two-tier cache of rendered image bytes: an in-memory LRU and a size-limited directory on disk
+
+    def __init__(self, max_memory_bytes: int, cache_dir: Optional[str], max_disk_bytes: int):
+        self.max_memory_bytes = max_memory_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._pinned: Dict[str, str] = self._read_pinned()  # file name -> what it shows
+
+        if cache_dir and os.path.isdir(cache_dir):
+            for entry in os.scandir(cache_dir):
+                if not entry.is_file():
+                    continue
+                if entry.name.endswith(".tmp"):
+                    # Left behind by a process that died mid-write; recent ones may still be in flight
+                    if entry.stat().st_mtime < time.time() - STALE_TMP_SECONDS:
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            pass
+                    continue
+                self._disk_bytes += entry.stat().st_size
+
+    @staticmethod
+    def make_key(key: Hashable, fmt: str) -> str:
+        digest = hashlib.sha1(repr((FIGURE_CACHE_VERSION, key)).encode()).hexdigest()
+        return f"{digest}.{fmt}"
+
+    def get(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            if name in self._memory:
+                self._memory.move_to_end(name)
+                self.memory_hits += 1
+                return self._memory[name]
+
+        data = self._read_disk(name)
+        if data is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self._put_memory(name, data)
+        return data
+
+    def put(self, name: str, data: bytes) -> None:
+        with self._lock:
+            self._put_memory(name, data)
+        self._write_disk(name, data)
+
+    def get_or_render(self, key: Hashable, render: Callable[[], bytes], fmt: str = "png") -> bytes:
+        name = self.make_key(key, fmt)
+        data = self.get(name)
+        if data is None:
+            with self._lock:
+                self.misses += 1
+            data = render()
+            self.put(name, data)
+        return data
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+    def pin(self, names: Dict[str, str]) -> None:
+        # Keeps these files out of disk eviction; the manifest is rewritten whole, so only one
+        # process (render_batch's parent) should pin at a time
+        with self._lock:
+            self._pinned.update(names)
+            self._write_pinned()
+
+    def clear_pins(self) -> int:
+        with self._lock:
+            count = len(self._pinned)
+            self._pinned = {}
+            self._write_pinned()
+        return count
+
+    def pinned(self) -> Dict[str, int]:
+        # Pinned files still on disk and their sizes
+        sizes = {}
+        for name in list(self._pinned):
+            try:
+                sizes[name] = os.path.getsize(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+        return sizes
+
+    def _read_pinned(self) -> Dict[str, str]:
+        if not self.cache_dir:
+            return {}
+        try:
+            with open(os.path.join(self.cache_dir, PINNED_MANIFEST)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Figures of an older FIGURE_CACHE_VERSION are never read again, they go back to being evictable
+        return manifest["figures"] if manifest.get("version") == FIGURE_CACHE_VERSION else {}
+
+    def _write_pinned(self) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=self.cache_dir, suffix=".tmp", delete=False) as f:
+            json.dump({"version": FIGURE_CACHE_VERSION, "figures": self._pinned}, f, indent=1, sort_keys=True)
+        os.replace(f.name, os.path.join(self.cache_dir, PINNED_MANIFEST))
+
+    def _put_memory(self, name: str, data: bytes) -> None:
+        if name in self._memory:
+            self._memory_bytes -= len(self._memory[name])
+        self._memory[name] = data
+        self._memory.move_to_end(name)
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
+
+    def _read_disk(self, name: str) -> Optional[bytes]:
+        if not self.cache_dir:
+            return None
+        path = os.path.join(self.cache_dir, name)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # mtime doubles as last-access time for disk eviction
+            return data
+        except OSError:
+            return None
+
+    def _write_disk(self, name: str, data: bytes) -> None:
+        if not self.cache_dir or len(data) > self.max_disk_bytes:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, name)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        with self._lock:
+            if os.path.exists(path):
+                self._disk_bytes -= os.path.getsize(path)
+            os.replace(tmp_path, path)
+            self._disk_bytes += len(data)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        # Remove least recently used files until the directory is back to 90% of its budget.
+        # render_batch.py may have pinned more figures since this process read the manifest
+        self._pinned = self._read_pinned()
+        entries = sorted(
+            (entry for entry in os.scandir(self.cache_dir) if entry.is_file() and not entry.name.endswith(".tmp")
+             and entry.name != PINNED_MANIFEST and entry.name not in self._pinned),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in entries:
+            if self._disk_bytes <= self.max_disk_bytes * 0.9:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                continue
+            self._disk_bytes -= size
+
+
+figure_cache = FigureCache(
+    max_memory_bytes=budget_from_env("F1_FIGURE_CACHE_MB", 256),
+    cache_dir=FIGURE_CACHE_DIR,
+    max_disk_bytes=budget_from_env("F1_FIGURE_CACHE_DISK_MB", 2048),
+)
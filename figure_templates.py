@@ -0,0 +1,142 @@
+import os
+import threading
+from contextlib import contextmanager
+from io import BytesIO
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.ticker import FixedLocator
+
+# F1_FIGURE_TEMPLATES=0 renders telemetry with a fresh pyplot figure per chart instead of a reused template
+FIGURE_TEMPLATES_ENABLED = os.environ.get("F1_FIGURE_TEMPLATES", "1") != "0"
+# Idle templates kept per layout; more concurrent renders than this build throwaway templates
+TEMPLATE_POOL_SIZE = int(os.environ.get("F1_FIGURE_TEMPLATE_POOL", 4))
+
+# (channel, y label, height ratio) of the stacked telemetry panels
+TELEMETRY_PANELS = [
+    ("Speed", 'Speed (km/h)', 3),
+    ("Throttle", 'Throttle (%)', 2),
+    ("Brake", 'Brake', 1),
+    ("nGear", 'Gear', 1),
+    ("RPM", 'RPM', 2),
+    ("DRS bool", 'DRS', 1),
+]
+TRACE_LINESTYLES = ['-', '--']
+# Slack (inches) around the template's measured tight bbox, for tick labels that get wider with other data
+TEMPLATE_BBOX_SLACK = 0.15
+
+
+def new_figure(*args, figsize=None, constrained_layout: bool = False, **kwargs):
+    # plt.subplots without pyplot: the figure never enters pyplot's process-wide registry, so
+    # Streamlit script threads can't draw into or close each other's figures, and nothing leaks
+    # when a plot raises. Axes-level calls only (ax.set_title, sns.*(ax=ax)), never plt.title/gca.
+    fig = Figure(figsize=figsize, constrained_layout=constrained_layout)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots(*args, **kwargs)
+
+
+class TelemetryTemplate:
+    # The 6-panel telemetry layout built once outside pyplot (so it's never in the figure registry).
+    # A render only swaps line data, colours and texts, then rasterizes the same figure again.
+
+    def __init__(self, n_traces: int):
+        self.n_traces = n_traces
+        self.fig = Figure(figsize=[10, 10])
+        FigureCanvasAgg(self.fig)
+        self.axes = self.fig.subplots(len(TELEMETRY_PANELS), gridspec_kw={'height_ratios': [p[2] for p in TELEMETRY_PANELS]})
+        self.lines: List[list] = []
+
+        for ax, (_, label, _) in zip(self.axes, TELEMETRY_PANELS):
+            self.lines.append([ax.plot([], [], linestyle=TRACE_LINESTYLES[i % len(TRACE_LINESTYLES)])[0]
+                               for i in range(n_traces)])
+            ax.set_ylabel(label, color='white')
+
+        speed, _, brake, gear, _, drs = self.axes
+        speed.set_yticks([350, 300, 250, 200, 150, 100, 50, 0])
+        speed.yaxis.grid(color='#3E4041', linestyle='--', linewidth=1)
+        brake.set_yticks([0, 1])
+        brake.set_yticklabels(['OFF', 'ON'])
+        gear.set_yticks([2, 4, 6, 8])
+        gear.set_ylim([1, 9])
+        gear.yaxis.grid(color='#3E4041', linestyle='--', linewidth=1)
+        drs.set_xlabel('Lap distance (meters)', color='white')
+        drs.set_yticks([False, True])
+        drs.set_yticklabels(['OFF', 'ON'])
+
+        self.title = self.fig.suptitle("", fontsize=16, color='white', y=0.93)
+        self.subtitle = self.fig.text(0.5, 0.89, "", ha='center', fontsize=10)
+        self.watermark = self.fig.text(0.5, 0.5, "", color='gray', ha='center', va='center', weight='bold',
+                                       transform=self.fig.transFigure)
+        self._bbox = None
+
+    def render(self, traces: Sequence[Tuple[str, str, "object"]], title: str, subtitle: str, fmt: str = "png",
+               watermark_text: str = "Formula Stats", alpha=0.3, fontsize=90, rotation=30) -> bytes:
+        # traces: (label, colour, telemetry frame) per line, at most n_traces
+        for ax, (channel, _, _), lines in zip(self.axes, TELEMETRY_PANELS, self.lines):
+            for i, line in enumerate(lines):
+                if i < len(traces):
+                    label, color, telemetry = traces[i]
+                    line.set_data(telemetry["Distance"].to_numpy(), np.asarray(telemetry[channel], dtype=float))
+                    line.set_color(color)
+                    line.set_label(label)
+                    line.set_visible(True)
+                else:
+                    line.set_data([], [])
+                    line.set_visible(False)
+                    line.set_label('_hidden')
+            ax.relim(visible_only=True)
+            ax.autoscale_view()
+            if isinstance(ax.yaxis.get_major_locator(), FixedLocator):
+                # Like set_yticks on a drawn axes, keep every fixed tick in view
+                ticks = ax.get_yticks()
+                ax.yaxis.set_view_interval(min(ticks), max(ticks), ignore=False)
+
+        self.axes[3].set_ylim([1, 9])
+        self.axes[0].legend(loc="lower right")
+        self.title.set_text(title)
+        self.subtitle.set_text(subtitle)
+        self.watermark.set_text(watermark_text)
+        self.watermark.set(alpha=alpha, fontsize=fontsize, rotation=rotation)
+
+        if self._bbox is None:
+            # bbox_inches="tight" costs a second full draw per save; the layout is fixed, so measure it once
+            self.fig.canvas.draw()
+            self._bbox = self.fig.get_tightbbox(self.fig.canvas.get_renderer()).padded(
+                plt.rcParams["savefig.pad_inches"] + TEMPLATE_BBOX_SLACK)
+        buffer = BytesIO()
+        self.fig.savefig(buffer, format=fmt, bbox_inches=self._bbox, dpi=200)
+        return buffer.getvalue()
+
+
+class TemplatePool:
+    # Idle templates per number of traces, handed out to one render at a time
+
+    def __init__(self, size: int = TEMPLATE_POOL_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        self._idle: Dict[int, List[TelemetryTemplate]] = {}
+        self.built = 0
+        self.reused = 0
+
+    @contextmanager
+    def telemetry(self, n_traces: int) -> Iterator[TelemetryTemplate]:
+        with self._lock:
+            idle = self._idle.setdefault(n_traces, [])
+            template = idle.pop() if idle else None
+            if template is None:
+                self.built += 1
+            else:
+                self.reused += 1
+        if template is None:
+            template = TelemetryTemplate(n_traces)
+        # A render that raises skips the return below, so a half-updated template is just dropped
+        yield template
+        with self._lock:
+            if len(self._idle[n_traces]) < self.size:
+                self._idle[n_traces].append(template)
+
+
+template_pool = TemplatePool()
@@ -0,0 +1,249 @@
+import atexit
+import json
+import os
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+# F1_INSTRUMENTATION: "off" (default), "time" for timing spans only, "memory" to also sample peak memory.
+# Memory sampling runs tracemalloc, which slows allocation-heavy code down noticeably.
+INSTRUMENTATION_MODE = os.environ.get("F1_INSTRUMENTATION", "off").lower()
+# F1_METRICS_PATH: while instrumentation is on, the histograms are written there every F1_METRICS_INTERVAL
+# seconds and on exit (e.g. a .prom file in node_exporter's textfile collector directory)
+METRICS_PATH = os.environ.get("F1_METRICS_PATH")
+METRICS_INTERVAL = float(os.environ.get("F1_METRICS_INTERVAL", 60))
+
+# Upper bounds (seconds) of the histogram buckets, from cache hits up to cold session loads
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Completed spans kept per trace, so a long-running thread can't grow its trace without bound
+MAX_TRACE_SPANS = 500
+
+
+class Span:
+    __slots__ = ("name", "depth", "start", "duration", "peak_bytes", "_base_bytes")
+
+    def __init__(self, name: str, depth: int):
+        self.name = name
+        self.depth = depth
+        self.start = 0.0
+        self.duration = 0.0
+        self.peak_bytes = 0
+        self._base_bytes = 0
+
+    def as_dict(self) -> dict:
+        return {"name": self.name, "depth": self.depth, "seconds": self.duration, "peak_bytes": self.peak_bytes}
+
+
+class Histogram:
+    # Prometheus-style histogram of span durations plus the largest peak memory seen
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.max_peak_bytes = 0
+
+    def observe(self, seconds: float, peak_bytes: int):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        self.max_peak_bytes = max(self.max_peak_bytes, peak_bytes)
+
+    def cumulative(self) -> List[int]:
+        total, out = 0, []
+        for count in self.counts:
+            total += count
+            out.append(total)
+        return out
+
+
+class Instrumentation:
+    # Nested timing spans per thread (each Streamlit rerun runs in its own script thread),
+    # aggregated into one histogram per operation name
+
+    def __init__(self, mode: str = INSTRUMENTATION_MODE):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.histograms: Dict[str, Histogram] = {}
+        self.enabled = False
+        self.memory = False
+        self.configure(mode)
+
+    def configure(self, mode: str):
+        self.enabled = mode in ("time", "memory")
+        self.memory = mode == "memory"
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _state(self):
+        local = self._local
+        if not hasattr(local, "stack"):
+            local.stack = []
+            local.trace = []
+        return local
+
+    def begin_trace(self):
+        # Starts a new per-rerun trace on the calling thread
+        state = self._state()
+        state.stack.clear()
+        state.trace = []
+
+    def current_trace(self) -> List[Span]:
+        return list(self._state().trace)
+
+    def _enter(self, name: str) -> Span:
+        state = self._state()
+        span = Span(name, len(state.stack))
+        if self.memory:
+            # tracemalloc has one process-wide peak, so spans running concurrently in other threads share it
+            span._base_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        state.stack.append(span)
+        span.start = time.perf_counter()
+        return span
+
+    def _exit(self, span: Span):
+        span.duration = time.perf_counter() - span.start
+        state = self._state()
+        if state.stack and state.stack[-1] is span:
+            state.stack.pop()
+        if self.memory and tracemalloc.is_tracing():
+            span.peak_bytes = max(span.peak_bytes, tracemalloc.get_traced_memory()[1] - span._base_bytes)
+            if state.stack:
+                # The reset above hid the child's allocations from the parent, hand them up
+                parent = state.stack[-1]
+                parent.peak_bytes = max(parent.peak_bytes, span._base_bytes - parent._base_bytes + span.peak_bytes)
+
+        if len(state.trace) < MAX_TRACE_SPANS:
+            state.trace.append(span)
+        with self._lock:
+            histogram = self.histograms.get(span.name)
+            if histogram is None:
+                histogram = self.histograms[span.name] = Histogram()
+            histogram.observe(span.duration, span.peak_bytes)
+
+    def span(self, name: str):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _SpanContext(self, name)
+
+    def instrumented(self, name: Optional[str] = None) -> Callable:
+        # Decorator form of span(); the flag is checked per call so it can be toggled at runtime
+        def decorator(fn: Callable) -> Callable:
+            span_name = name or fn.__qualname__
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _SpanContext(self, span_name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+
+    def to_json(self) -> dict:
+        with self._lock:
+            return {
+                name: {
+                    "count": h.count,
+                    "sum_seconds": h.sum,
+                    "max_seconds": h.max,
+                    "max_peak_bytes": h.max_peak_bytes,
+                    "buckets": {str(bound): n for bound, n in zip(BUCKETS + ("+Inf",), h.cumulative())},
+                }
+                for name, h in sorted(self.histograms.items())
+            }
+
+    def to_prometheus(self, prefix: str = "f1_dashboard") -> str:
+        lines = [
+            f"# HELP {prefix}_span_seconds Duration of instrumented dashboard operations.",
+            f"# TYPE {prefix}_span_seconds histogram",
+        ]
+        peaks = [
+            f"# HELP {prefix}_span_peak_bytes Largest peak memory of an instrumented operation.",
+            f"# TYPE {prefix}_span_peak_bytes gauge",
+        ]
+        with self._lock:
+            for name, h in sorted(self.histograms.items()):
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                for bound, count in zip(BUCKETS + ("+Inf",), h.cumulative()):
+                    lines.append(f'{prefix}_span_seconds_bucket{{op="{label}",le="{bound}"}} {count}')
+                lines.append(f'{prefix}_span_seconds_sum{{op="{label}"}} {h.sum:.6f}')
+                lines.append(f'{prefix}_span_seconds_count{{op="{label}"}} {h.count}')
+                peaks.append(f'{prefix}_span_peak_bytes{{op="{label}"}} {h.max_peak_bytes}')
+        return "\n".join(lines + peaks) + "\n"
+
+    def write(self, path: str):
+        # .prom/.txt files get the Prometheus text format (e.g. for node_exporter's textfile collector), anything else JSON
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else json.dumps(self.to_json(), indent=2)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def start_writer(self, path: str, interval: float = METRICS_INTERVAL) -> threading.Thread:
+        # Daemon thread writing the histograms to path every interval seconds, plus once at exit
+        def write():
+            if self.enabled:
+                try:
+                    self.write(path)
+                except OSError as e:
+                    print(f"⚠️ Writing metrics to {path} failed: {e}")
+
+        def run():
+            while True:
+                time.sleep(interval)
+                write()
+
+        atexit.register(write)
+        thread = threading.Thread(target=run, name="f1-metrics-writer", daemon=True)
+        thread.start()
+        return thread
+
+
+class _SpanContext:
+    __slots__ = ("_owner", "_name", "_span")
+
+    def __init__(self, owner: Instrumentation, name: str):
+        self._owner = owner
+        self._name = name
+
+    def __enter__(self) -> Span:
+        self._span = self._owner._enter(self._name)
+        return self._span
+
+    def __exit__(self, *exc):
+        self._owner._exit(self._span)
+        return False
+
+
+class _NullSpan:
+    # Shared context manager handed out while instrumentation is off
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+instrumentation = Instrumentation()
+if METRICS_PATH and instrumentation.enabled:
+    instrumentation.start_writer(METRICS_PATH)
+span = instrumentation.span
+instrumented = instrumentation.instrumented
@@ -0,0 +1,97 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import pandas as pd
+from fastf1.core import Laps
+
+from data_importing import get_team_color
+
+PACE_FILTERS = ("all", "quick", "green")
+GREEN_FLAG_STATUS = "1"
+
+
+@dataclass(frozen=True)
+class PaceSummary:
+    # One row per `by` value (within each `group_keys` group), all lap times in seconds:
+    # Fastest/Avg/Median/P25/P75 Lap, Laps, Gap Fast/Avg Lap and Percentage Diff Fast/Avg Lap
+    by: str
+    lap_filter: str
+    stint: Optional[int]
+    group_keys: tuple
+    table: pd.DataFrame
+
+
+def filter_laps(laps: pd.DataFrame, lap_filter: str = "all", stint: Optional[int] = None,
+                group_keys: Sequence[str] = ()) -> pd.DataFrame:
+    if lap_filter not in PACE_FILTERS:
+        raise ValueError(f"Unknown lap filter '{lap_filter}', expected one of {PACE_FILTERS}")
+
+    laps = laps[laps["LapTime"].notna()]
+    if stint is not None:
+        laps = laps[laps["Stint"] == stint]
+    if lap_filter == "green":
+        laps = laps[laps["TrackStatus"] == GREEN_FLAG_STATUS]
+    elif lap_filter == "quick":
+        # 107% of the fastest lap, per session when several sessions are summarised together
+        if group_keys:
+            fastest = laps.groupby(list(group_keys), observed=True)["LapTime"].transform("min")
+        else:
+            fastest = laps["LapTime"].min()
+        laps = laps[laps["LapTime"] < fastest * Laps.QUICKLAP_THRESHOLD]
+    return laps
+
+
+def summarise_pace(laps: pd.DataFrame, by: str = "Team", lap_filter: str = "all", stint: Optional[int] = None,
+                   group_keys: Sequence[str] = ()) -> PaceSummary:
+    # Grouped pace statistics in a single pass over the laps table. Pass group_keys
+    # (e.g. ["Year", "EventName"]) to summarise several sessions at once, gaps are then per group.
+    group_keys = tuple(group_keys)
+    keys: List[str] = [*group_keys, by]
+    laps = filter_laps(laps, lap_filter, stint, group_keys)
+    lap_times = laps["LapTime"].dt.total_seconds().rename("LapTime")
+    grouped = lap_times.groupby([laps[key] for key in keys], observed=True)
+
+    table = grouped.agg(["min", "mean", "median", "count"])
+    table.columns = ["Fastest Lap", "Avg Lap", "Median Lap", "Laps"]
+    quantiles = grouped.quantile([0.25, 0.75]).unstack()
+    table["P25 Lap"] = quantiles[0.25]
+    table["P75 Lap"] = quantiles[0.75]
+    table = table.reset_index()
+
+    for column, label in (("Fastest Lap", "Fast Lap"), ("Avg Lap", "Avg Lap")):
+        if group_keys:
+            best = table.groupby(list(group_keys), observed=True)[column].transform("min")
+        else:
+            best = table[column].min()
+        table[f"Gap {label}"] = table[column] - best
+        table[f"Percentage Diff {label}"] = ((table[f"Gap {label}"] / best) * 100).round(2)
+
+    return PaceSummary(by=by, lap_filter=lap_filter, stint=stint, group_keys=group_keys, table=table)
+
+
+# Summaries already computed for a loaded session
+_session_summaries: "OrderedDict[tuple, PaceSummary]" = OrderedDict()
+_session_summaries_lock = threading.Lock()
+SESSION_SUMMARY_MEMO_SIZE = 128
+
+
+def session_pace_summary(session, by: str = "Team", lap_filter: str = "all",
+                         stint: Optional[int] = None) -> PaceSummary:
+    key = (session.event.year, session.event["EventName"], session.name, by, lap_filter, stint)
+    with _session_summaries_lock:
+        if key in _session_summaries:
+            _session_summaries.move_to_end(key)
+            return _session_summaries[key]
+
+    summary = summarise_pace(session.laps, by=by, lap_filter=lap_filter, stint=stint)
+    if by == "Team":
+        team_colors = get_team_color(session, summary.table["Team"])
+        summary.table["Team Color"] = summary.table["Team"].map(team_colors)
+
+    with _session_summaries_lock:
+        _session_summaries[key] = summary
+        while len(_session_summaries) > SESSION_SUMMARY_MEMO_SIZE:
+            _session_summaries.popitem(last=False)
+    return summary
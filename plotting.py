@@ -4,15 +4,30 @@ from matplotlib.collections import LineCollection
 from matplotlib.lines import Line2D
 import matplotlib.gridspec as gridspec
 import matplotlib.cm as cm
+import matplotlib.colors as mcolors
 import seaborn as sns
 import numpy as np
 import pandas as pd
 import streamlit as st
 import fastf1 as ff1
-from data_importing import drs_to_boolean
+from io import BytesIO
+from typing import Callable, List, Optional, Tuple
+from data_importing import get_lap_telemetry
+from figure_cache import figure_cache
+from instrumentation import span
+from schedule_cache import session_complete
+from beeswarm import swarm_offsets, marker_size_in_data
+from telemetry_index import get_telemetry_index
+from race_matrix import COMPOUNDS, get_race_matrix
+from stints import session_stint_model
+from track_map import get_circuit_geometry, lap_segments, lap_track_data
+from figure_templates import FIGURE_TEMPLATES_ENABLED, new_figure, template_pool
 
 plt.style.use('dark_background')
 
+COMPOUND_ORDER = ["SOFT", "MEDIUM", "HARD", "INTERMEDIATE", "WET"]
+SWARM_MARKER_SIZE = 4  # points
+
 #Supporting functions
 def format_lap_time(seconds: float) -> str:
     # Ensure that seconds is a float
@@ -43,6 +58,40 @@ def add_watermark(fig, watermark_text: str = "Formula Stats", alpha=0.3, fontsiz
     return fig
 
 
+def figure_to_bytes(fig: plt.Figure, fmt: str = "png") -> bytes:
+    # Same output settings as st.pyplot; the figure is closed once it's rasterized
+    buffer = BytesIO()
+    fig.savefig(buffer, format=fmt, bbox_inches="tight", dpi=200)
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def plot_cache_key(session, plot_fn: Callable[..., plt.Figure], params: tuple = (), **watermark_kwargs) -> tuple:
+    return (
+        session.event.year, session.event["EventName"], session.name,
+        plot_fn.__name__, params, tuple(sorted(watermark_kwargs.items()))
+    )
+
+
+def cached_plot(session, plot_fn: Callable[..., plt.Figure], *args, params: tuple = (),
+                fmt: str = "png", **watermark_kwargs) -> bytes:
+    # Watermarked image of plot_fn(*args), cached per session, plot function and params (e.g. driver/lap).
+    # A cache hit doesn't touch matplotlib at all. Sessions that aren't over yet only have partial data,
+    # their figures are rendered every time instead of being kept.
+    def render() -> bytes:
+        template_renderer = TEMPLATE_RENDERERS.get(plot_fn) if FIGURE_TEMPLATES_ENABLED else None
+        if template_renderer is not None:
+            with span(f"template.{plot_fn.__name__}"):
+                return template_renderer(*args, fmt=fmt, **watermark_kwargs)
+
+        with span(f"plot.{plot_fn.__name__}"):
+            fig = plot_fn(*args)
+        with span("figure_to_bytes"):
+            return figure_to_bytes(add_watermark(fig, **watermark_kwargs), fmt)
+
+    if not session_complete(session):
+        return render()
+    return figure_cache.get_or_render(plot_cache_key(session, plot_fn, params, **watermark_kwargs), render, fmt)
 
 
 # General Lap Time Distribution
@@ -51,7 +100,7 @@ def general_lap_time_dist(
         team_order: pd.Index,
         team_colours: dict, session) -> plt.Figure:
     
-    fig, ax = plt.subplots(figsize=(15, 10))
+    fig, ax = new_figure(figsize=(15, 10))
 
     sns.boxplot(
         data=quick_laps,
@@ -66,23 +115,24 @@ def general_lap_time_dist(
         capprops=dict(color="white"),
         flierprops=dict(marker='o', markerfacecolor='lightgrey', markersize=5, linestyle='none'),
         width=0.6,
-        dodge=False
+        dodge=False,
+        ax=ax
     )
 
     # Create custom tick labels (team name and average lap time)
-    avg_lap_times = quick_laps.groupby('Team')['LapTime'].median()  # You could use a different aggregation here
+    avg_lap_times = quick_laps.groupby('Team', observed=True)['LapTime'].median().reindex(team_order)  # You could use a different aggregation here
     tick_labels = [f"{team} \n {format_lap_time(avg_lap_time)}" for team, avg_lap_time in zip(team_order, avg_lap_times)]
 
     # Set custom x-ticks with rotation and labels
-    plt.xticks(
+    ax.set_xticks(
         ticks=np.arange(len(team_order)),  # Position of the ticks
         labels=tick_labels,  # The custom tick labels
         rotation=45,  # Rotate the labels for better visibility
     )
 
     # Set plot title
-    plt.title(f"Team Lap Time Distribution | {session.event.year} - {session.event.EventName} - {session.name}")
-    plt.grid(visible=False)
+    ax.set_title(f"Team Lap Time Distribution | {session.event.year} - {session.event.EventName} - {session.name}")
+    ax.grid(visible=False)
     ax.set(xlabel=None)
 
     return fig
@@ -95,7 +145,7 @@ def violin_dist_point_scorers(session) -> plt.Figure:
     finishing_order = session.results['Abbreviation'][:10]
     
     
-    fig, ax = plt.subplots(figsize=(15, 10))
+    fig, ax = new_figure(figsize=(15, 10))
 
     driver_laps["LapTime(s)"] = driver_laps["LapTime"].dt.total_seconds()
 
@@ -112,31 +162,34 @@ def violin_dist_point_scorers(session) -> plt.Figure:
                     ax=ax
                     )
 
-    sns.swarmplot(data=driver_laps,
-                x="Driver",
-                y="LapTime(s)",
-                order=finishing_order,
-                hue="Compound",
-                palette=ff1.plotting.get_compound_mapping(session=session),
-                hue_order=["SOFT", "MEDIUM", "HARD", "INTERMEDIATE", "WET"],
-                dodge=False,
-                linewidth=1,
-                edgecolor='black',
-                size=4,
-                ax=ax
-                )
+    # Beeswarm of every lap coloured by compound; the layout needs the final axes limits to size markers
+    compound_colors = ff1.plotting.get_compound_mapping(session=session)
+    positions = {driver: i for i, driver in enumerate(finishing_order)}
+    driver_laps = driver_laps[driver_laps["Driver"].isin(positions)]
+    lap_times = driver_laps["LapTime(s)"].to_numpy()
+    x = driver_laps["Driver"].map(positions).to_numpy()
+
+    ax.set_xlim(-0.5, len(finishing_order) - 0.5)
+    ax.set_ylim(*ax.get_ylim())
+    diameter_x, diameter_y = marker_size_in_data(ax, SWARM_MARKER_SIZE)
+    offsets = swarm_offsets(lap_times, x, diameter_y, diameter_x)
+
+    ax.scatter(x + offsets, lap_times,
+               c=driver_laps["Compound"].astype(object).map(compound_colors).fillna("grey").to_list(),
+               s=SWARM_MARKER_SIZE ** 2,
+               linewidths=1,
+               edgecolors='black',
+               zorder=3)
 
     ax.set_xlabel("Driver")
     ax.set_ylabel("Lap Time (s)")
-    plt.title(f"Point Scorers Lap Time Distribution | {session.event.year} - {session.event.EventName} - {session.name}")
-    sns.despine(left=True, bottom=True)
-
-    handles, labels = ax.get_legend_handles_labels()
-    unique_labels = list(set(labels))
+    ax.set_title(f"Point Scorers Lap Time Distribution | {session.event.year} - {session.event.EventName} - {session.name}")
+    sns.despine(ax=ax, left=True, bottom=True)
 
-    compound_handles = [handles[i] for i, label in enumerate(labels) if label in ["SOFT", "MEDIUM", "HARD", "INTERMEDIATE", "WET"]]
-    legend2 = ax.legend(compound_handles, ["SOFT", "MEDIUM", "HARD", "INTERMEDIATE", "WET"], title='Tire Compound', loc='lower right', bbox_to_anchor=(1, 0))
-    ax.add_artist(legend2)
+    compound_handles = [Line2D([0], [0], marker='o', linestyle='', markersize=SWARM_MARKER_SIZE * 1.5,
+                               markerfacecolor=compound_colors.get(compound, "grey"), markeredgecolor='black')
+                        for compound in COMPOUND_ORDER]
+    ax.legend(compound_handles, COMPOUND_ORDER, title='Tire Compound', loc='lower right', bbox_to_anchor=(1, 0))
 
     return fig
 
@@ -144,9 +197,9 @@ def violin_dist_point_scorers(session) -> plt.Figure:
 
 def fastest_lap_team_pace_comparison(df_pace_comparison: pd.DataFrame) -> plt.Figure:
     
-    df_pace_comparison.sort_values("Percentage Diff Fast Lap", inplace=True)
+    df_pace_comparison = df_pace_comparison.sort_values("Percentage Diff Fast Lap")
 
-    fig, ax = plt.subplots(figsize=(15, 6))
+    fig, ax = new_figure(figsize=(15, 6))
 
     ax.bar(df_pace_comparison['Team'], df_pace_comparison['Percentage Diff Fast Lap'], color=df_pace_comparison['Team Color'])
 
@@ -173,9 +226,9 @@ def fastest_lap_team_pace_comparison(df_pace_comparison: pd.DataFrame) -> plt.Fi
 
 
 def avg_lap_team_pace_comparison(df_pace_comparison: pd.DataFrame) -> plt.Figure:
-    df_pace_comparison.sort_values('Percentage Diff Avg Lap', inplace=True)
+    df_pace_comparison = df_pace_comparison.sort_values('Percentage Diff Avg Lap')
 
-    fig, ax = plt.subplots(figsize=(15, 6))
+    fig, ax = new_figure(figsize=(15, 6))
 
     ax.bar(df_pace_comparison['Team'], df_pace_comparison['Percentage Diff Avg Lap'], color=df_pace_comparison['Team Color'])
 
@@ -196,21 +249,15 @@ def avg_lap_team_pace_comparison(df_pace_comparison: pd.DataFrame) -> plt.Figure
     return fig
 
 def plot_race_lap_times(session) -> plt.Figure:
-    fig, ax = plt.subplots(figsize=(15, 10))
+    race = get_race_matrix(session)
+    fig, ax = new_figure(figsize=(15, 10))
 
-    # Loop through each driver in the session
-    for driver_number in session.drivers:
-        driver_laps = session.laps.pick_driver(driver_number)
-
-        lap_times_seconds = driver_laps['LapTime'].dt.total_seconds()
-        lap_numbers = driver_laps['LapNumber']
-        driver_abbr = driver_laps.iloc[0]['Driver']
-
-        ax.plot(lap_numbers, lap_times_seconds, label=driver_abbr)
+    # One call draws a line per driver (each row of the lap time matrix)
+    ax.plot(race.lap_numbers, race.lap_time.T, label=race.drivers)
 
     ax.set_xlabel('Lap Number')
     ax.set_ylabel('Lap Time (s)')
-    ax.set_xticks(range(1, int(max(session.laps["LapNumber"])+1)))
+    ax.set_xticks(race.lap_numbers)
     ax.set_title(f'Lap Times - {session.event["EventName"]} {session.event.year}')
     ax.legend(title='Drivers', bbox_to_anchor=(1.05, 1), loc='upper left')
     ax.grid(True, linestyle="--", color='darkgrey', linewidth=0.5)
@@ -219,16 +266,124 @@ def plot_race_lap_times(session) -> plt.Figure:
     return fig
 
 
+def _driver_colors(session, drivers: List[str]) -> List[str]:
+    return [ff1.plotting.get_driver_color(driver, session=session) for driver in drivers]
+
+
+def plot_gap_to_leader(session) -> plt.Figure:
+    race = get_race_matrix(session)
+    fig, ax = new_figure(figsize=(15, 10))
+
+    for line, color in zip(ax.plot(race.lap_numbers, race.gap_to_leader().T, label=race.drivers),
+                           _driver_colors(session, race.drivers)):
+        line.set_color(color)
+
+    ax.invert_yaxis()
+    ax.set_xlabel('Lap Number')
+    ax.set_ylabel('Gap to Leader (s)')
+    ax.set_title(f'Gap to Leader - {session.event["EventName"]} {session.event.year}')
+    ax.legend(title='Drivers', bbox_to_anchor=(1.05, 1), loc='upper left')
+    ax.grid(True, linestyle="--", color='darkgrey', linewidth=0.5)
+    fig.tight_layout()
+
+    return fig
+
+
+def plot_position_changes(session) -> plt.Figure:
+    race = get_race_matrix(session)
+    fig, ax = new_figure(figsize=(15, 10))
+
+    for line, color in zip(ax.plot(race.lap_numbers, race.position.T), _driver_colors(session, race.drivers)):
+        line.set_color(color)
+
+    # Label each line at its last lap instead of a legend, the final order reads like the classification
+    last = race.position.shape[1] - 1 - np.argmax(~np.isnan(race.position)[:, ::-1], axis=1)
+    for driver, lap, position in zip(race.drivers, race.lap_numbers[last], race.position[np.arange(len(last)), last]):
+        if not np.isnan(position):
+            ax.text(lap + 0.5, position, driver, va='center', fontsize=9)
+
+    # Pit stops, marked on the out lap in the colour of the compound fitted
+    compound_colors = ff1.plotting.get_compound_mapping(session=session)
+    rows, cols = np.nonzero(race.pit_out & (race.compound >= 0))
+    ax.scatter(race.lap_numbers[cols], race.position[rows, cols], s=40, zorder=3, edgecolors='black',
+               c=[compound_colors.get(COMPOUNDS[code], 'grey') for code in race.compound[rows, cols]])
+
+    ax.set_ylim(len(race.drivers) + 0.5, 0.5)
+    ax.set_yticks(range(1, len(race.drivers) + 1))
+    ax.set_xlabel('Lap Number')
+    ax.set_ylabel('Position')
+    ax.set_title(f'Position Changes - {session.event["EventName"]} {session.event.year}')
+    ax.grid(True, linestyle="--", color='darkgrey', linewidth=0.5)
+    fig.tight_layout()
+
+    return fig
+
+
+def plot_rolling_pace(session, window: int = 5) -> plt.Figure:
+    race = get_race_matrix(session)
+    fig, ax = new_figure(figsize=(15, 10))
+
+    for line, color in zip(ax.plot(race.lap_numbers, race.rolling_pace(window).T, label=race.drivers),
+                           _driver_colors(session, race.drivers)):
+        line.set_color(color)
+
+    ax.set_xlabel('Lap Number')
+    ax.set_ylabel(f'{window}-Lap Rolling Avg Lap Time (s)')
+    ax.set_title(f'Rolling Pace (excluding pit laps) - {session.event["EventName"]} {session.event.year}')
+    ax.legend(title='Drivers', bbox_to_anchor=(1.05, 1), loc='upper left')
+    ax.grid(True, linestyle="--", color='darkgrey', linewidth=0.5)
+    fig.tight_layout()
+
+    return fig
+
+
+def plot_stint_degradation(session) -> plt.Figure:
+    model = session_stint_model(session)
+    stints = model.stints[model.stints["Degradation (s/lap)"].notna()]
+    compound_colors = ff1.plotting.get_compound_mapping(session=session)
+    fig, ax = new_figure(figsize=(15, 8))
+
+    # Drivers in classification order, each driver's stints side by side in one bar call
+    finishing_order = [d for d in session.results["Abbreviation"] if d in set(stints["Driver"])]
+    positions = {driver: i for i, driver in enumerate(finishing_order)}
+    stints = stints[stints["Driver"].isin(positions)]
+    slot = stints.groupby("Driver").cumcount().to_numpy()
+    n_slots = stints.groupby("Driver")["Stint"].transform("size").to_numpy()
+    width = 0.8 / max(int(n_slots.max()), 1) if len(stints) else 0.8
+    x = stints["Driver"].map(positions).to_numpy() + (slot - (n_slots - 1) / 2) * width
+
+    ax.bar(x, stints["Degradation (s/lap)"], width=width * 0.9,
+           color=stints["Compound"].map(compound_colors).fillna("grey").to_list(), edgecolor='black')
+    # Stint laps above each bar
+    for xi, height, start, end in zip(x, stints["Degradation (s/lap)"], stints["Start Lap"], stints["End Lap"]):
+        ax.text(xi, max(height, 0), f" L{start}-{end}", ha='center', va='bottom', rotation=90, fontsize=7)
+
+    ax.margins(y=0.12)
+    ax.axhline(0, color='white', linewidth=0.8)
+    ax.set_xticks(range(len(finishing_order)))
+    ax.set_xticklabels(finishing_order)
+    ax.set_xlabel('Driver')
+    ax.set_ylabel('Tyre Degradation (s/lap, fuel corrected)')
+    ax.set_title(f'Stint Degradation ({model.fuel_correction:.2f} s/lap fuel correction) - '
+                 f'{session.event["EventName"]} {session.event.year}')
+    compound_handles = [Line2D([0], [0], marker='s', linestyle='', markersize=10,
+                               markerfacecolor=compound_colors.get(compound, "grey"), markeredgecolor='black')
+                        for compound in COMPOUND_ORDER]
+    ax.legend(compound_handles, COMPOUND_ORDER, title='Tire Compound', loc='upper right')
+    ax.grid(True, axis='y', linestyle="--", color='darkgrey', linewidth=0.5)
+    fig.tight_layout()
+
+    return fig
+
+
 
 def plot_telemetry(session, driver_1: str, lap: int) -> plt.Figure:
     team_color = ff1.plotting.get_driver_color(driver_1, session)
     
-    telemetry = session.laps.pick_drivers(driver_1).pick_laps(lap).get_telemetry().add_distance()
-    telemetry["DRS bool"] = telemetry["DRS"].apply(drs_to_boolean)
-    telemetry
+    telemetry = get_lap_telemetry(session, driver_1, lap)
 
 
-    fig, ax = plt.subplots(6, figsize = [10,10], gridspec_kw={'height_ratios': [3, 2, 1, 1, 2, 1]}, constrained_layout=False)
+    fig, ax = new_figure(6, figsize = [10,10], gridspec_kw={'height_ratios': [3, 2, 1, 1, 2, 1]}, constrained_layout=False)
     # Speed trace
     ax[0].plot(telemetry["Distance"], telemetry["Speed"], label=driver_1, color=team_color)
     ax[0].set_ylabel('Speed (km/h)', color='white')
@@ -277,15 +432,13 @@ def plot_telemetry_comparison(session, driver_1: str, driver_2: str, lap_driver_
     team_color_driver_1 = ff1.plotting.get_driver_color(driver_1, session)
     team_color_driver_2 = ff1.plotting.get_driver_color(driver_2, session)
     
-    telemetry_driver_1 = session.laps.pick_drivers(driver_1).pick_laps(lap_driver_1).get_telemetry().add_distance()
-    telemetry_driver_1["DRS bool"] = telemetry_driver_1["DRS"].apply(drs_to_boolean)
+    telemetry_driver_1 = get_lap_telemetry(session, driver_1, lap_driver_1)
 
-    telemetry_driver_2 = session.laps.pick_drivers(driver_2).pick_laps(lap_driver_2).get_telemetry().add_distance()
-    telemetry_driver_2["DRS bool"] = telemetry_driver_2["DRS"].apply(drs_to_boolean)
+    telemetry_driver_2 = get_lap_telemetry(session, driver_2, lap_driver_2)
     
 
 
-    fig, ax = plt.subplots(6, figsize = [10,10], gridspec_kw={'height_ratios': [3, 2, 1, 1, 2, 1]}, constrained_layout=False)
+    fig, ax = new_figure(6, figsize = [10,10], gridspec_kw={'height_ratios': [3, 2, 1, 1, 2, 1]}, constrained_layout=False)
     # Speed trace
     ax[0].plot(telemetry_driver_1["Distance"], telemetry_driver_1["Speed"], label=driver_1, color=team_color_driver_1)
     ax[0].plot(telemetry_driver_2["Distance"], telemetry_driver_2["Speed"], label=driver_2, color=team_color_driver_2, linestyle='--')
@@ -332,4 +485,117 @@ def plot_telemetry_comparison(session, driver_1: str, driver_2: str, lap_driver_
     fig.text(0.5, 0.89, f"Lap telemetry | {driver_1} ({format_lap_time(session.laps.pick_driver(driver_1).pick_lap(lap_driver_1)['LapTime'].iloc[0])}) vs {driver_2} ({format_lap_time(session.laps.pick_driver(driver_2).pick_lap(lap_driver_2)['LapTime'].iloc[0])})", ha='center', fontsize=10)
 
     
-    return fig
\ No newline at end of file
+    return fig
+
+def _lap_time_label(session, driver: str, lap: int) -> str:
+    return f"{driver} ({format_lap_time(session.laps.pick_drivers(driver).pick_laps(int(lap))['LapTime'].iloc[0])})"
+
+
+def render_telemetry(session, driver_1: str, lap: int, fmt: str = "png", **watermark_kwargs) -> bytes:
+    # Template-mode counterpart of plot_telemetry
+    telemetry = get_lap_telemetry(session, driver_1, lap)
+    with template_pool.telemetry(2) as template:
+        return template.render(
+            [(driver_1, ff1.plotting.get_driver_color(driver_1, session), telemetry)],
+            f"{session.event.year} {session.event.EventName} - {session.name}",
+            f"Lap telemetry | {_lap_time_label(session, driver_1, lap)}",
+            fmt, **watermark_kwargs
+        )
+
+
+def render_telemetry_comparison(session, driver_1: str, driver_2: str, lap_driver_1: int, lap_driver_2: int,
+                                fmt: str = "png", **watermark_kwargs) -> bytes:
+    # Template-mode counterpart of plot_telemetry_comparison
+    traces = [(driver, ff1.plotting.get_driver_color(driver, session), get_lap_telemetry(session, driver, lap))
+              for driver, lap in ((driver_1, lap_driver_1), (driver_2, lap_driver_2))]
+    with template_pool.telemetry(2) as template:
+        return template.render(
+            traces,
+            f"{session.event.year} {session.event.EventName} - {session.name}",
+            f"Lap telemetry | {_lap_time_label(session, driver_1, lap_driver_1)} vs {_lap_time_label(session, driver_2, lap_driver_2)}",
+            fmt, **watermark_kwargs
+        )
+
+
+def plot_track_map(session, driver: str, lap: int, color_by: str = "Speed",
+                   reference: Optional[Tuple[str, int]] = None) -> plt.Figure:
+    # Lap trace on the circuit outline, each segment coloured by speed, gear or time delta to a reference lap
+    geometry = get_circuit_geometry(session)
+    xy, values = lap_track_data(session, driver, lap, color_by, reference)
+
+    fig, ax = new_figure(figsize=(10, 10))
+    ax.plot(geometry.outline[:, 0], geometry.outline[:, 1], color='#3E4041', linewidth=14, solid_capstyle='round', zorder=1)
+
+    if color_by == "nGear":
+        cmap = plt.get_cmap('Paired', 8)
+        norm = mcolors.BoundaryNorm(np.arange(0.5, 9.5), cmap.N)
+        label, ticks = 'Gear', np.arange(1, 9)
+    elif color_by == "Delta":
+        cmap = cm.RdBu_r
+        limit = max(np.nanmax(np.abs(values)), 0.01)
+        norm = mcolors.TwoSlopeNorm(0, -limit, limit)
+        label, ticks = f'Delta to {reference[0]} L{int(reference[1])} (s)', None
+    else:
+        cmap = cm.plasma
+        norm = plt.Normalize(np.nanmin(values), np.nanmax(values))
+        label, ticks = 'Speed (km/h)', None
+
+    collection = LineCollection(lap_segments(xy), cmap=cmap, norm=norm, linewidth=4, capstyle='round', zorder=2)
+    collection.set_array(values)
+    ax.add_collection(collection)
+
+    ax.set_aspect('equal')
+    ax.autoscale_view()
+    ax.axis('off')
+    colorbar = fig.colorbar(collection, ax=ax, shrink=0.6, pad=0.02, ticks=ticks)
+    colorbar.set_label(label)
+
+    ax.set_title(f"{session.event.year} {session.event.EventName} - {session.name}\n"
+                 f"Track map | {_lap_time_label(session, driver, lap)}", color='white')
+    return fig
+
+
+def plot_telemetry_overlay(session, selections: List[Tuple[str, int]]) -> plt.Figure:
+    # N-way comparison of (driver, lap) pairs read from the session's distance-aligned telemetry index,
+    # the bottom panel shows the time delta of every selection to the first one
+    index = get_telemetry_index(session)
+    distance = index.distance
+    colors = [ff1.plotting.get_driver_color(driver, session) for driver, _ in selections]
+    labels = [f"{driver} L{int(lap)}" for driver, lap in selections]
+    linestyles = ['-', '--', ':', '-.']
+
+    panels = [("Speed", 'Speed (km/h)'), ("Throttle", 'Throttle (%)'), ("Brake", 'Brake'), ("nGear", 'Gear'), ("RPM", 'RPM')]
+    fig, ax = new_figure(6, figsize = [10,12], gridspec_kw={'height_ratios': [3, 2, 1, 1, 2, 2]}, constrained_layout=False)
+
+    for i, (channel, ylabel) in enumerate(panels):
+        traces = index.overlay(selections, channel)
+        for j, trace in enumerate(traces):
+            ax[i].plot(distance, trace, label=labels[j], color=colors[j], linestyle=linestyles[j % len(linestyles)])
+        ax[i].set_ylabel(ylabel, color='white')
+
+    ax[0].legend(loc="lower right")
+    ax[0].yaxis.grid(color='#3E4041', linestyle='--', linewidth=1)
+    ax[2].set_yticks([0, 1])
+    ax[2].set_yticklabels(['OFF', 'ON'])
+    ax[3].set_yticks([2, 4, 6, 8])
+    ax[3].set_ylim([1, 9])
+    ax[3].yaxis.grid(color='#3E4041', linestyle='--', linewidth=1)
+
+    # Delta time to the first selection
+    for j, selection in enumerate(selections[1:], start=1):
+        ax[5].plot(distance, index.delta_time(selections[0], selection), color=colors[j], linestyle=linestyles[j % len(linestyles)])
+    ax[5].axhline(0, color=colors[0], linewidth=1)
+    ax[5].set_ylabel(f'Delta to {labels[0]} (s)', color='white')
+    ax[5].set_xlabel('Lap distance (meters)', color='white')
+
+    fig.suptitle(f"{session.event.year} {session.event.EventName} - {session.name}", fontsize=16, color='white', y=0.93)
+    fig.text(0.5, 0.89, f"Lap telemetry | {' vs '.join(labels)}", ha='center', fontsize=10)
+
+    return fig
+
+
+# Plot functions that cached_plot renders through a reused figure template instead
+TEMPLATE_RENDERERS = {
+    plot_telemetry: render_telemetry,
+    plot_telemetry_comparison: render_telemetry_comparison,
+}
@@ -0,0 +1,118 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Hashable, List, Tuple
+
+from data_importing import get_cached_session, session_store
+from schedule_cache import get_schedule
+
+PREFETCH_WORKERS = int(os.environ.get("F1_PREFETCH_WORKERS", 2))
+# Prefetching stops while the session store is fuller than this share of its budget,
+# so warming never evicts what users are currently looking at
+PREFETCH_MEMORY_FRACTION = 0.7
+PREFETCH_PROFILE = "laps"
+# Owners whose last selection is remembered (to not queue the same prefetches on every rerun);
+# browser sessions that went away fall out of it least recently scheduled first
+PREFETCH_MAX_OWNERS = 256
+
+
+def _lower_priority():
+    # Linux lets a single thread be niced through its native id; elsewhere this is a no-op
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except (AttributeError, OSError):
+        pass
+
+
+class PrefetchScheduler:
+    # Warms the session store in the background with the sessions a user is likely to open next.
+    # Each owner (a browser session) has its own queue that is cancelled when its selection changes.
+
+    def __init__(self, max_workers: int = PREFETCH_WORKERS, memory_fraction: float = PREFETCH_MEMORY_FRACTION):
+        self.memory_fraction = memory_fraction
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="prefetch", initializer=_lower_priority)
+        self._lock = threading.Lock()
+        self._selection: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._futures: Dict[Hashable, List[Future]] = {}  # Only while an owner has prefetches queued or running
+        self.warmed = 0
+        self.skipped = 0
+
+    def candidates(self, year: int, event: str, session_type: str) -> List[Tuple[int, str, str]]:
+        # Other finished sessions of the same weekend first, then the same session at the neighbouring rounds
+        season = get_schedule(year)
+        now = datetime.utcnow()
+        targets = [(year, event, session) for session in season.available_sessions(event, now) if session != session_type]
+
+        round_number = int(season.event(event)["RoundNumber"])
+        for neighbour in (round_number - 1, round_number + 1):
+            if neighbour in season.by_round:
+                name = season.event_by_round(neighbour)["EventName"]
+                if session_type in season.available_sessions(name, now):
+                    targets.append((year, name, session_type))
+        return targets
+
+    def schedule(self, owner: Hashable, year: int, event: str, session_type: str) -> None:
+        selection = (year, event, session_type)
+        with self._lock:
+            if self._selection.get(owner) == selection:
+                self._selection.move_to_end(owner)
+                return
+            self._selection[owner] = selection
+            self._selection.move_to_end(owner)
+            stale = self._futures.pop(owner, [])
+            while len(self._selection) > PREFETCH_MAX_OWNERS:
+                stale_owner, _ = self._selection.popitem(last=False)
+                stale += self._futures.pop(stale_owner, [])
+        # Cancelling runs the futures' done callbacks, which take the lock
+        for future in stale:
+            future.cancel()  # Only cancels work that hasn't started yet
+
+        try:
+            targets = self.candidates(year, event, session_type)
+        except Exception:
+            return
+
+        futures = [self._pool.submit(self._warm, owner, selection, target) for target in targets]
+        with self._lock:
+            current = self._selection.get(owner) == selection
+            if current and futures:
+                self._futures[owner] = futures
+        for future in futures:
+            if not current:
+                future.cancel()
+            # A callback of a future that's already done runs right here
+            future.add_done_callback(lambda _, futures=futures: self._finished(owner, futures))
+
+    def cancel(self, owner: Hashable) -> None:
+        with self._lock:
+            self._selection.pop(owner, None)
+            stale = self._futures.pop(owner, [])
+        for future in stale:
+            future.cancel()
+
+    def _finished(self, owner: Hashable, futures: List[Future]) -> None:
+        # Forgets an owner's futures once all of them are done
+        with self._lock:
+            if self._futures.get(owner) is futures and all(future.done() for future in futures):
+                del self._futures[owner]
+
+    def _warm(self, owner: Hashable, selection: tuple, target: Tuple[int, str, str]) -> None:
+        with self._lock:
+            if self._selection.get(owner) != selection:
+                return  # Selection changed after this was queued
+        stats = session_store.stats()
+        if stats["bytes"] > stats["max_bytes"] * self.memory_fraction:
+            with self._lock:
+                self.skipped += 1
+            return
+        try:
+            get_cached_session(*target, PREFETCH_PROFILE)
+        except Exception:
+            return  # Prefetching is best effort, a real request will surface the error
+        with self._lock:
+            self.warmed += 1
+
+
+prefetcher = PrefetchScheduler()
@@ -0,0 +1,95 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+COMPOUNDS = ["SOFT", "MEDIUM", "HARD", "INTERMEDIATE", "WET"]
+
+@dataclass(frozen=True)
+class RaceMatrix:
+    # The laps table pivoted once into driver x lap arrays (rows follow `drivers`, column i is lap i + 1).
+    # Missing laps are NaN (-1 for compound codes, False for pit flags).
+    drivers: List[str]
+    lap_numbers: np.ndarray
+    lap_time: np.ndarray  # seconds
+    lap_end: np.ndarray  # session time (s) at the end of the lap
+    position: np.ndarray
+    compound: np.ndarray  # index into COMPOUNDS
+    pit_in: np.ndarray
+    pit_out: np.ndarray
+
+    def row(self, driver: str) -> int:
+        return self.drivers.index(driver)
+
+    def gap_to_leader(self) -> np.ndarray:
+        # Seconds behind whoever completed each lap first; fmin skips drivers without the lap
+        leader = np.fmin.reduce(self.lap_end, axis=0)
+        return self.lap_end - leader
+
+    def rolling_pace(self, window: int = 5, exclude_pit_laps: bool = True) -> np.ndarray:
+        # Mean lap time over the trailing `window` laps, ignoring missing (and pit in/out) laps
+        times = self.lap_time.copy()
+        if exclude_pit_laps:
+            times[self.pit_in | self.pit_out] = np.nan
+        valid = ~np.isnan(times)
+        sums = np.cumsum(np.where(valid, times, 0.0), axis=1)
+        counts = np.cumsum(valid, axis=1)
+        sums[:, window:] -= sums[:, :-window].copy()
+        counts[:, window:] -= counts[:, :-window].copy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    def positions_gained(self) -> np.ndarray:
+        # Positions gained (positive) or lost since the end of lap 1
+        return self.position[:, :1] - self.position
+
+
+def build_race_matrix(laps: pd.DataFrame, drivers: List[str]) -> RaceMatrix:
+    # drivers sets the row order (e.g. the classification); drivers only present in laps are appended
+    drivers = list(drivers) + [d for d in pd.unique(laps["Driver"]) if d not in set(drivers)]
+    laps = laps[laps["LapNumber"].notna()]
+    row = laps["Driver"].map({driver: i for i, driver in enumerate(drivers)}).to_numpy()
+    col = laps["LapNumber"].to_numpy(dtype=np.int64) - 1
+    n_laps = int(col.max()) + 1 if len(col) else 0
+    shape = (len(drivers), n_laps)
+
+    def pivot(values: np.ndarray, fill, dtype) -> np.ndarray:
+        matrix = np.full(shape, fill, dtype=dtype)
+        matrix[row, col] = values
+        return matrix
+
+    return RaceMatrix(
+        drivers=drivers,
+        lap_numbers=np.arange(1, n_laps + 1),
+        lap_time=pivot(laps["LapTime"].dt.total_seconds().to_numpy(), np.nan, float),
+        lap_end=pivot(laps["Time"].dt.total_seconds().to_numpy(), np.nan, float),
+        position=pivot(laps["Position"].to_numpy(dtype=float), np.nan, float),
+        compound=pivot(pd.Categorical(laps["Compound"], categories=COMPOUNDS).codes, -1, np.int8),
+        pit_in=pivot(laps["PitInTime"].notna().to_numpy(), False, bool),
+        pit_out=pivot(laps["PitOutTime"].notna().to_numpy(), False, bool),
+    )
+
+
+# Matrices already built for a loaded session
+_race_matrices: "OrderedDict[tuple, RaceMatrix]" = OrderedDict()
+_race_matrices_lock = threading.Lock()
+RACE_MATRIX_MEMO_SIZE = 32
+
+
+def get_race_matrix(session) -> RaceMatrix:
+    key = (session.event.year, session.event["EventName"], session.name)
+    with _race_matrices_lock:
+        if key in _race_matrices:
+            _race_matrices.move_to_end(key)
+            return _race_matrices[key]
+
+    matrix = build_race_matrix(session.laps, list(session.results["Abbreviation"]))
+
+    with _race_matrices_lock:
+        _race_matrices[key] = matrix
+        while len(_race_matrices) > RACE_MATRIX_MEMO_SIZE:
+            _race_matrices.popitem(last=False)
+    return matrix
@@ -0,0 +1,180 @@
+import argparse
+import os
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Tuple
+
+import fastf1 as ff1
+import pandas as pd
+
+from data_importing import LOAD_PROFILES
+from session_archive import ArchivedSession, archive_exists
+
+# Cross-season records kept as small materialized tables in SQLite. Each session is ingested
+# once (tracked in `ingested`), so updating after a race weekend only processes that weekend.
+RECORDS_DB = os.environ.get("F1_RECORDS_DB", os.path.join("Data", "records.sqlite"))
+RECORD_SESSIONS = ("Qualifying", "Race")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingested (
+    year INTEGER, event TEXT, session TEXT, ingested_at REAL,
+    PRIMARY KEY (year, event, session)
+);
+CREATE TABLE IF NOT EXISTS best_laps (
+    year INTEGER, round INTEGER, event TEXT, circuit TEXT, session TEXT,
+    driver TEXT, team TEXT, lap_time REAL,
+    PRIMARY KEY (year, event, session, driver)
+);
+CREATE TABLE IF NOT EXISTS results (
+    year INTEGER, round INTEGER, event TEXT, circuit TEXT, session TEXT,
+    driver TEXT, team TEXT, position REAL,
+    PRIMARY KEY (year, event, session, driver)
+);
+CREATE INDEX IF NOT EXISTS best_laps_circuit ON best_laps (circuit, lap_time);
+CREATE INDEX IF NOT EXISTS results_session ON results (session, position);
+"""
+
+
+def connect(path: str = RECORDS_DB) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# Race control messages are what mark laps deleted for track limits
+RECORD_LOAD_PROFILE = dict(LOAD_PROFILES["laps"], messages=True)
+RECORD_LAP_COLUMNS = ["Driver", "Team", "LapTime", "PitInTime", "PitOutTime", "Deleted"]
+
+
+def _session_frames(year: int, event: str, session_name: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    # Prefer the columnar archive, otherwise load laps and results from the FastF1 cache
+    if archive_exists(year, event, session_name):
+        archived = ArchivedSession(year, event, session_name)
+        return (archived.read_laps(RECORD_LAP_COLUMNS),
+                archived.read_results(["Abbreviation", "TeamName", "Position"]))
+
+    session = ff1.get_session(year, event, session_name)
+    session.load(**RECORD_LOAD_PROFILE)
+    return session.laps, session.results
+
+
+def record_laps(laps: pd.DataFrame) -> pd.DataFrame:
+    # Timed laps that count: no in/out laps (as Laps.pick_wo_box) and none deleted by race control
+    valid = (laps["LapTime"].notna() & laps["PitInTime"].isna() & laps["PitOutTime"].isna()
+             & (laps["Deleted"] != True))  # noqa: E712, Deleted is None where it's unknown
+    return laps[valid]
+
+
+def ingest_session(conn: sqlite3.Connection, year: int, round_number: int, event: str,
+                   circuit: str, session_name: str) -> None:
+    laps, results = _session_frames(year, event, session_name)
+    key = (year, round_number, event, circuit, session_name)
+
+    best = record_laps(laps).groupby("Driver").agg(team=("Team", "first"), lap_time=("LapTime", "min"))
+    best_rows = [(*key, driver, team, lap_time.total_seconds())
+                 for driver, team, lap_time in best.itertuples()]
+    result_rows = [(*key, driver, team, None if pd.isna(position) else float(position))
+                   for driver, team, position in results[["Abbreviation", "TeamName", "Position"]].itertuples(index=False)]
+
+    with conn:
+        # A re-ingest replaces the session's rows, drivers no longer in it included
+        for table in ("best_laps", "results"):
+            conn.execute(f"DELETE FROM {table} WHERE year = ? AND event = ? AND session = ?", (year, event, session_name))
+        conn.executemany("INSERT OR REPLACE INTO best_laps VALUES (?, ?, ?, ?, ?, ?, ?, ?)", best_rows)
+        conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)", result_rows)
+        conn.execute("INSERT OR REPLACE INTO ingested VALUES (?, ?, ?, ?)", (year, event, session_name, time.time()))
+
+
+def update_records(years: Iterable[int], sessions: Iterable[str] = RECORD_SESSIONS,
+                   path: str = RECORDS_DB, reingest: bool = False) -> int:
+    # Ingest every finished session of `years` that isn't in the store yet (all of them with reingest),
+    # returns how many were added
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    added = 0
+    with closing(connect(path)) as conn:
+        done = set() if reingest else set(conn.execute("SELECT year, event, session FROM ingested"))
+        for year in years:
+            schedule = ff1.get_event_schedule(year, include_testing=False)
+            for _, event in schedule.iterrows():
+                for session_name in sessions:
+                    if (year, event["EventName"], session_name) in done:
+                        continue
+                    try:
+                        if event.get_session_date(session_name, utc=True) > now:
+                            continue
+                    except ValueError:
+                        continue  # Session doesn't exist at this event
+                    try:
+                        ingest_session(conn, year, int(event["RoundNumber"]), event["EventName"],
+                                       event["Location"], session_name)
+                        added += 1
+                        print(f"✅ Ingested {year} {event['EventName']} {session_name}")
+                    except Exception as e:
+                        print(f"⚠️ Skipped {year} {event['EventName']} {session_name}: {e}")
+    return added
+
+
+def _query(sql: str, params: tuple = (), path: str = RECORDS_DB) -> pd.DataFrame:
+    with closing(connect(path)) as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+
+def fastest_laps_by_circuit(session: str = "Qualifying", path: str = RECORDS_DB) -> pd.DataFrame:
+    return _query("""
+        SELECT circuit AS Circuit, driver AS Driver, team AS Team, year AS Year, lap_time AS "Lap Time (s)"
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY circuit ORDER BY lap_time) AS rank
+            FROM best_laps WHERE session = ?
+        )
+        WHERE rank = 1 ORDER BY circuit
+    """, (session,), path)
+
+
+def pole_positions(year: Optional[int] = None, path: str = RECORDS_DB) -> pd.DataFrame:
+    return _query("""
+        SELECT driver AS Driver, COUNT(*) AS Poles
+        FROM results
+        WHERE session = 'Qualifying' AND position = 1 AND (? IS NULL OR year = ?)
+        GROUP BY driver ORDER BY Poles DESC, Driver
+    """, (year, year), path)
+
+
+def lap_time_progression(circuit: str, session: str = "Qualifying", path: str = RECORDS_DB) -> pd.DataFrame:
+    return _query("""
+        SELECT year AS Year, MIN(lap_time) AS "Lap Time (s)"
+        FROM best_laps WHERE circuit = ? AND session = ?
+        GROUP BY year ORDER BY year
+    """, (circuit, session), path)
+
+
+def teammate_head_to_head(year: int, session: str = "Race", path: str = RECORDS_DB) -> pd.DataFrame:
+    # Count of sessions in which each driver finished ahead of their teammate
+    return _query("""
+        SELECT a.team AS Team, a.driver AS Driver, b.driver AS Teammate,
+               SUM(a.position < b.position) AS Ahead, SUM(a.position > b.position) AS Behind
+        FROM results a JOIN results b
+          ON a.year = b.year AND a.event = b.event AND a.session = b.session
+         AND a.team = b.team AND a.driver < b.driver
+        WHERE a.year = ? AND a.session = ? AND a.position IS NOT NULL AND b.position IS NOT NULL
+        GROUP BY a.team, a.driver, b.driver ORDER BY a.team
+    """, (year, session), path)
+
+
+def circuits(path: str = RECORDS_DB) -> list:
+    return _query("SELECT DISTINCT circuit FROM best_laps ORDER BY circuit", path=path)["circuit"].to_list()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest finished sessions into the records store.")
+    parser.add_argument("--years", type=int, nargs="+", default=list(range(2018, datetime.now().year + 1)))
+    parser.add_argument("--db", default=RECORDS_DB)
+    parser.add_argument("--reingest", action="store_true", help="Rebuild the rows of already ingested sessions")
+    args = parser.parse_args()
+    print(f"Added {update_records(args.years, path=args.db, reingest=args.reingest)} sessions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import List, Tuple
+
+# Pre-renders every dashboard chart of the given sessions into the figure cache's disk tier,
+# under the same keys the dashboard uses, so first requests are served without rendering.
+# The rendered files are pinned (listed in the cache's pinned.json) so eviction never drops them.
+
+# Fallback size of one rendered chart for the disk estimate, PNGs of the charts run 100-350 KB
+ESTIMATED_CHART_BYTES = 250 * 1024
+# Charts per session besides the two per driver (telemetry and track map)
+SESSION_CHARTS = 9
+
+
+def render_session(year: int, event: str, session_type: str, fmt: str) -> List[dict]:
+    # Runs in a worker process
+    import matplotlib
+    matplotlib.use("Agg")
+
+    import plotting as fsp
+    from data_importing import load_session, get_team_order, get_team_color
+    from figure_cache import figure_cache
+    from pace_summary import session_pace_summary
+
+    # The parent pins what this worker renders once it's done; until then nothing may be evicted
+    figure_cache.max_disk_bytes = sys.maxsize
+
+    session, _, quick_laps = load_session(year, event, session_type, profile="full")
+    team_order = get_team_order(quick_laps)
+    team_colors = get_team_color(session, team_order)
+    df_pace_comparison = session_pace_summary(session).table
+
+    # (chart, plot function, args, params, watermark kwargs), matching the calls in dashboard.py
+    charts = [
+        ("Team Lap Time Distribution", fsp.general_lap_time_dist, (quick_laps, team_order, team_colors, session), (), {}),
+        ("Point Scorers Lap Time Distribution", fsp.violin_dist_point_scorers, (session,), (), {}),
+        ("Fastest Lap Team Pace Comparison", fsp.fastest_lap_team_pace_comparison, (df_pace_comparison,), (), {}),
+        ("Avg Lap Team Pace Comparison", fsp.avg_lap_team_pace_comparison, (df_pace_comparison,), (), {}),
+        ("Lap Times Over Entire Race", fsp.plot_race_lap_times, (session,), (), {"fontsize": 110}),
+        ("Gap to Leader", fsp.plot_gap_to_leader, (session,), (), {"fontsize": 110}),
+        ("Position Changes", fsp.plot_position_changes, (session,), (), {"fontsize": 110}),
+        ("Rolling Pace", fsp.plot_rolling_pace, (session,), (), {"fontsize": 110}),
+        ("Tyre Degradation per Stint", fsp.plot_stint_degradation, (session,), (), {}),
+    ]
+    for driver in session.results["Abbreviation"]:
+        fastest = session.laps.pick_drivers(driver).pick_fastest()
+        if fastest is None or fastest.empty:
+            continue
+        lap = int(fastest["LapNumber"])
+        charts.append((f"Lap Telemetry {driver}", fsp.plot_telemetry, (session, driver, lap), (driver, lap), {}))
+        charts.append((f"Track Map {driver}", fsp.plot_track_map, (session, driver, lap, "Speed", None),
+                       (driver, lap, "Speed", None), {}))
+
+    entries = []
+    for chart, plot_fn, args, params, watermark_kwargs in charts:
+        entry = {"chart": f"{year} {event} {session_type}: {chart}",
+                 "key": figure_cache.make_key(fsp.plot_cache_key(session, plot_fn, params, **watermark_kwargs), fmt)}
+        try:
+            entry["bytes"] = len(fsp.cached_plot(session, plot_fn, *args, params=params, fmt=fmt, **watermark_kwargs))
+        except Exception as e:
+            entry["error"] = str(e)
+        entries.append(entry)
+    return entries
+
+
+def estimate_bytes(n_sessions: int, n_drivers: int = 20) -> int:
+    # Disk space the batch will pin, sized from the figures already pinned when there are any
+    from figure_cache import figure_cache
+
+    pinned = figure_cache.pinned()
+    chart_bytes = sum(pinned.values()) / len(pinned) if pinned else ESTIMATED_CHART_BYTES
+    return int(n_sessions * (SESSION_CHARTS + 2 * n_drivers) * chart_bytes)
+
+
+def plan_sessions(years: List[int], events: List[str], sessions: List[str]) -> List[Tuple[int, str, str]]:
+    from schedule_cache import get_schedule
+
+    now = datetime.utcnow()
+    planned = []
+    for year in years:
+        season = get_schedule(year)
+        for event in events or season.event_names:
+            for session_type in season.available_sessions(event, now):
+                if not sessions or session_type in sessions:
+                    planned.append((year, event, session_type))
+    return planned
+
+
+def _mb(nbytes: int) -> str:
+    return f"{nbytes / 1024 ** 2:,.0f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render dashboard graphics for whole seasons or selected sessions.")
+    parser.add_argument("--years", type=int, nargs="+", default=[datetime.now().year])
+    parser.add_argument("--events", nargs="+", default=[], help="Event names, defaults to every event of the season")
+    parser.add_argument("--sessions", nargs="+", default=[], help="Session names (e.g. Qualifying Race), defaults to all")
+    parser.add_argument("--format", choices=["png", "svg"], default="png")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--clear-pins", action="store_true", help="Make earlier batch renders evictable again and exit")
+    args = parser.parse_args()
+
+    from figure_cache import figure_cache
+
+    if args.clear_pins:
+        print(f"📌 Unpinned {figure_cache.clear_pins()} figures")
+        return
+
+    planned = plan_sessions(args.years, args.events, args.sessions)
+    estimate = estimate_bytes(len(planned))
+    pinned_bytes = sum(figure_cache.pinned().values())
+    print(f"🖼️ Rendering {len(planned)} sessions, about {_mb(estimate)}")
+    if pinned_bytes + estimate > figure_cache.max_disk_bytes:
+        print(f"⚠️ Pinned figures would take about {_mb(pinned_bytes + estimate)} of the {_mb(figure_cache.max_disk_bytes)} "
+              "figure disk budget and are never evicted, leaving the dashboard's own renders no room. "
+              "Raise F1_FIGURE_CACHE_DISK_MB or render fewer sessions.")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(render_session, *target, args.format): target for target in planned}
+        for future in as_completed(futures):
+            year, event, session_type = futures[future]
+            try:
+                entries = future.result()
+                failed = [entry for entry in entries if "error" in entry]
+                figure_cache.pin({entry["key"]: entry["chart"] for entry in entries if "error" not in entry})
+                print(f"✅ {year} {event} {session_type}: {len(entries) - len(failed)} charts, {len(failed)} failed")
+                for entry in failed:
+                    print(f"   ⚠️ {entry['chart']}: {entry['error']}")
+            except Exception as e:
+                print(f"⚠️ Skipped {year} {event} {session_type}: {e}")
+
+    pinned_bytes = sum(figure_cache.pinned().values())
+    print(f"📌 {_mb(pinned_bytes)} of pinned figures, figure disk budget {_mb(figure_cache.max_disk_bytes)}")
+
+
+if __name__ == "__main__":
+    main()
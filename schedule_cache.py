@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import fastf1 as ff1
+import pandas as pd
+
+# Seasons that are over never change, the current (and any future) season is refreshed after this many seconds
+CURRENT_SEASON_TTL = 60 * 60
+
+SESSION_COLUMNS = [f"Session{i}" for i in range(1, 6)]
+
+# Scheduled length of each session (practice sessions use the default), red flags aside
+SESSION_DURATIONS = {
+    "Race": timedelta(hours=3),
+    "Sprint": timedelta(hours=1),
+    "Qualifying": timedelta(hours=1, minutes=15),
+    "Sprint Qualifying": timedelta(hours=1),
+    "Sprint Shootout": timedelta(hours=1),
+}
+DEFAULT_SESSION_DURATION = timedelta(hours=1, minutes=30)
+# How long after a session's scheduled end its timing data is complete on the F1 live timing API
+DATA_AVAILABILITY_DELAY = timedelta(minutes=float(os.environ.get("F1_DATA_DELAY_MINUTES", 60)))
+
+
+def data_available_at(event: pd.Series, session_name: str) -> Optional[datetime]:
+    # When the session's data can be loaded in full (naive UTC), None if the event has no such session
+    for column in SESSION_COLUMNS:
+        if event.get(column) == session_name and not pd.isna(event.get(f"{column}DateUtc")):
+            duration = SESSION_DURATIONS.get(session_name, DEFAULT_SESSION_DURATION)
+            return event[f"{column}DateUtc"] + duration + DATA_AVAILABILITY_DELAY
+    return None
+
+
+def session_complete(session, now: Optional[datetime] = None) -> bool:
+    # Whether a FastF1 session is over and its data final; sessions without a schedule date count as final
+    available_at = data_available_at(session.event, session.name)
+    return available_at is None or available_at <= (now or datetime.utcnow())
+
+
+class SeasonSchedule:
+    # Event schedule of one season with lookups by event name and round precomputed
+
+    def __init__(self, year: int, schedule: pd.DataFrame):
+        self.year = year
+        self.schedule = schedule
+        self.fetched_at = time.time()
+        events = [schedule.iloc[i] for i in range(len(schedule))]
+        self.by_name: Dict[str, pd.Series] = {event["EventName"]: event for event in events}
+        self.by_round: Dict[int, pd.Series] = {int(event["RoundNumber"]): event for event in events}
+        self.event_names: List[str] = schedule["EventName"].to_list()
+        # Sessions per event, most recent first (the order used by the session picker)
+        self.sessions: Dict[str, List[str]] = {
+            event["EventName"]: [session for session in event[SESSION_COLUMNS[::-1]].values if isinstance(session, str)]
+            for event in events
+        }
+        self._table = None
+
+    def event(self, name: str) -> pd.Series:
+        return self.by_name[name]
+
+    def event_by_round(self, round_number: int) -> pd.Series:
+        return self.by_round[round_number]
+
+    def session_names(self, name: str) -> List[str]:
+        return self.sessions[name]
+
+    def available_sessions(self, name: str, now: datetime) -> List[str]:
+        # Sessions of the event that are over and whose data is complete (now is naive UTC). A session
+        # that's still running only has partial data, which would end up in the caches for good.
+        # Sessions without a date (older schedules) count as available, like in session_complete.
+        event = self.by_name[name]
+        available = []
+        for session in self.sessions[name]:
+            available_at = data_available_at(event, session)
+            if available_at is None or available_at <= now:
+                available.append(session)
+        return available
+
+    def first_available_at(self, name: str) -> Optional[datetime]:
+        # When the event's first session can be loaded, None if no session has a date
+        event = self.by_name[name]
+        times = [data_available_at(event, session) for session in self.sessions[name]]
+        return min((available_at for available_at in times if available_at is not None), default=None)
+
+    def table(self) -> pd.DataFrame:
+        # Frame shown on the Schedule tab
+        if self._table is None:
+            df_schedule = self.schedule[["EventDate", "Location", "EventName", "EventFormat", "OfficialEventName"]].copy()
+            df_schedule = df_schedule.rename(columns={"EventDate":"Event Date", "EventName":"Name", "EventFormat":"Format", "OfficialEventName":"Official Name"})
+            df_schedule["Format"] = df_schedule["Format"].apply(lambda x: "Sprint" if x == "sprint_qualifying" else "Conventional")
+            self._table = df_schedule
+        return self._table
+
+
+_seasons: Dict[int, SeasonSchedule] = {}
+_seasons_lock = threading.Lock()
+
+
+def get_schedule(year: int) -> SeasonSchedule:
+    with _seasons_lock:
+        season = _seasons.get(year)
+        stale = season is None or (
+            year >= datetime.now().year and time.time() - season.fetched_at > CURRENT_SEASON_TTL
+        )
+        if stale:
+            season = _seasons[year] = SeasonSchedule(year, ff1.get_event_schedule(year, include_testing=False))
+        return season
@@ -0,0 +1,129 @@
+import json
+import os
+import re
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from fastf1.core import Laps, SessionResults
+
+# Columnar copy of loaded sessions, partitioned as
+# <root>/<year>/<event>/<session>/{meta.json, laps.parquet, results.parquet, telemetry/<kind>_<driver>.arrow}
+# Laps and results are small and stored as Parquet, telemetry is stored as uncompressed
+# Arrow IPC so it can be memory-mapped and read without copying the whole file.
+ARCHIVE_DIR = os.environ.get("F1_ARCHIVE_DIR", os.path.join("Data", "archive"))
+
+TELEMETRY_KINDS = ("car", "pos")
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", str(name)).strip("_")
+
+
+def session_dir(year: int, event: str, session_type: str, root: str = ARCHIVE_DIR) -> str:
+    return os.path.join(root, str(year), _slug(event), _slug(session_type))
+
+
+def archive_exists(year: int, event: str, session_type: str, root: str = ARCHIVE_DIR) -> bool:
+    return os.path.exists(os.path.join(session_dir(year, event, session_type, root), "meta.json"))
+
+
+def _write_parquet(df: pd.DataFrame, path: str) -> None:
+    pq.write_table(pa.Table.from_pandas(pd.DataFrame(df), preserve_index=False), path)
+
+
+def write_session_archive(session, root: str = ARCHIVE_DIR) -> str:
+    # Session must already be loaded (laps and telemetry)
+    path = session_dir(session.event.year, session.event["EventName"], session.name, root)
+    os.makedirs(os.path.join(path, "telemetry"), exist_ok=True)
+
+    _write_parquet(session.laps, os.path.join(path, "laps.parquet"))
+    _write_parquet(session.results, os.path.join(path, "results.parquet"))
+
+    for kind in TELEMETRY_KINDS:
+        try:
+            data = getattr(session, f"{kind}_data")
+        except Exception:
+            continue  # Session was loaded without telemetry
+        for driver_number, telemetry in data.items():
+            feather.write_feather(
+                pd.DataFrame(telemetry).reset_index(drop=True),
+                os.path.join(path, "telemetry", f"{kind}_{driver_number}.arrow"),
+                compression="uncompressed",
+            )
+
+    meta = {
+        "year": int(session.event.year),
+        "EventName": session.event["EventName"],
+        "RoundNumber": int(session.event["RoundNumber"]),
+        "Location": session.event["Location"],
+        "Country": session.event["Country"],
+        "EventDate": pd.Timestamp(session.event["EventDate"]).isoformat(),
+        "SessionName": session.name,
+        "api_path": session.api_path,
+        "Drivers": dict(zip(session.results["DriverNumber"], session.results["Abbreviation"])),
+    }
+    # meta.json is written last and marks the archive as complete
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    return path
+
+
+class ArchivedSession:
+    # Read-only view of an archived session. Tables are read lazily and only for the requested columns.
+    # .laps and .results stand in for a loaded FastF1 session's (the whole tables, read once), so the
+    # lap/result based pages work on it; telemetry is only available through read_telemetry.
+
+    def __init__(self, year: int, event: str, session_type: str, root: str = ARCHIVE_DIR):
+        self.path = session_dir(year, event, session_type, root)
+        with open(os.path.join(self.path, "meta.json")) as f:
+            self.meta = json.load(f)
+
+        self.name = self.meta["SessionName"]
+        # Live timing path fastf1.plotting looks the team colours up with (archives written before it was
+        # stored have none and need a FastF1 session for colours)
+        self.api_path = self.meta.get("api_path")
+        # Mirrors the attributes of fastf1's Event used by the plotting functions
+        self.event = pd.Series({
+            "year": self.meta["year"],
+            "EventName": self.meta["EventName"],
+            "RoundNumber": self.meta["RoundNumber"],
+            "Location": self.meta["Location"],
+            "Country": self.meta["Country"],
+            "EventDate": pd.Timestamp(self.meta.get("EventDate", f"{self.meta['year']}-01-01")),
+        })
+        self._driver_numbers: Dict[str, str] = {abbr: num for num, abbr in self.meta["Drivers"].items()}
+        self._laps: Optional[Laps] = None
+        self._results: Optional[SessionResults] = None
+
+    @property
+    def drivers(self) -> List[str]:
+        return list(self.meta["Drivers"].keys())
+
+    @property
+    def laps(self) -> Laps:
+        if self._laps is None:
+            self._laps = Laps(self.read_laps(), session=self)
+        return self._laps
+
+    @property
+    def results(self) -> SessionResults:
+        if self._results is None:
+            self._results = SessionResults(self.read_results())
+        return self._results
+
+    def read_laps(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        # Buffers released column by column while converting, so peak memory stays near one copy
+        table = pq.read_table(os.path.join(self.path, "laps.parquet"), columns=columns, memory_map=True)
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    def read_results(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        return pq.read_table(os.path.join(self.path, "results.parquet"), columns=columns, memory_map=True).to_pandas()
+
+    def read_telemetry(self, driver: str, kind: str = "car", columns: Optional[List[str]] = None) -> pd.DataFrame:
+        driver_number = self._driver_numbers.get(driver, driver)
+        path = os.path.join(self.path, "telemetry", f"{kind}_{driver_number}.arrow")
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
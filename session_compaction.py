@@ -0,0 +1,100 @@
+import os
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# F1_COMPACT_SESSIONS=0 keeps sessions exactly as FastF1 loads them
+COMPACT_SESSIONS = os.environ.get("F1_COMPACT_SESSIONS", "1") != "0"
+
+# Lap columns nothing in the dashboard (or FastF1's lap/telemetry slicing) reads
+UNUSED_LAP_COLUMNS = [
+    "Sector1SessionTime", "Sector2SessionTime", "Sector3SessionTime",
+    "SpeedI1", "SpeedI2", "SpeedFL", "SpeedST",
+    "DeletedReason",
+]
+CATEGORICAL_LAP_COLUMNS = ["Driver", "DriverNumber", "Team", "Compound", "TrackStatus"]
+CATEGORICAL_RESULT_COLUMNS = ["TeamName", "TeamColor", "TeamId", "CountryCode"]
+
+# Telemetry channels and the dtype they're stored in; float32 keeps ~7 significant digits,
+# far more than the sensors deliver. Time/Date/Distance stay 64 bit for FastF1's resampling.
+TELEMETRY_DTYPES = {
+    "Speed": np.float32,
+    "RPM": np.float32,
+    "Throttle": np.float32,
+    "nGear": np.int8,
+    "DRS": np.int8,
+    "X": np.float32,
+    "Y": np.float32,
+    "Z": np.float32,
+}
+# String channels repeated on every sample. FastF1 labels merged samples Source="interpolation",
+# so that category has to exist up front.
+TELEMETRY_CATEGORIES = {
+    "Source": ["car", "pos", "interpolation"],
+    "Status": ["OnTrack", "OffTrack"],
+}
+
+
+@dataclass(frozen=True)
+class CompactionReport:
+    before_bytes: int
+    after_bytes: int
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.before_bytes - self.after_bytes
+
+
+def frame_nbytes(frame: pd.DataFrame) -> int:
+    return int(frame.memory_usage(deep=True).sum())
+
+
+def _to_categorical(frame: pd.DataFrame, columns) -> None:
+    for column in columns:
+        if column in frame.columns and frame[column].dtype == object:
+            frame[column] = frame[column].astype("category")
+
+
+def compact_laps(laps: pd.DataFrame) -> None:
+    # In place, so the Laps object (and its session reference) stays the one FastF1 handed out
+    laps.drop(columns=[c for c in UNUSED_LAP_COLUMNS if c in laps.columns], inplace=True)
+    _to_categorical(laps, CATEGORICAL_LAP_COLUMNS)
+
+
+def compact_telemetry(telemetry: pd.DataFrame) -> None:
+    for column, dtype in TELEMETRY_DTYPES.items():
+        if column in telemetry.columns and telemetry[column].notna().all():
+            telemetry[column] = telemetry[column].astype(dtype)
+    for column, categories in TELEMETRY_CATEGORIES.items():
+        if column in telemetry.columns and telemetry[column].dtype == object:
+            values = telemetry[column]
+            categories = categories + [c for c in pd.unique(values.dropna()) if c not in categories]
+            telemetry[column] = pd.Categorical(values, categories=categories)
+
+
+def compact_session(session) -> CompactionReport:
+    # Shrinks a loaded FastF1 session in place; frames that weren't loaded (laps-only profiles) are skipped
+    frames: Dict[str, pd.DataFrame] = {}
+    for attr in ("laps", "results"):
+        try:
+            frames[attr] = getattr(session, attr)
+        except Exception:
+            pass
+    for attr in ("car_data", "pos_data"):
+        try:
+            frames.update({f"{attr}[{driver}]": frame for driver, frame in getattr(session, attr).items()})
+        except Exception:
+            pass
+
+    before = sum(frame_nbytes(frame) for frame in frames.values())
+    for name, frame in frames.items():
+        if name == "laps":
+            compact_laps(frame)
+        elif name == "results":
+            _to_categorical(frame, CATEGORICAL_RESULT_COLUMNS)
+        else:
+            compact_telemetry(frame)
+    after = sum(frame_nbytes(frame) for frame in frames.values())
+    return CompactionReport(before, after)
@@ -0,0 +1,126 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _InFlight:
+    # A load that is currently running; other callers for the same key wait on it
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class SessionStore:
+    # Process-wide, read-only store of loaded objects with an LRU memory budget.
+    # Concurrent requests for the same key share a single in-flight load.
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int]):
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._inflight: Dict[Hashable, _InFlight] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = self._inflight[key] = _InFlight()
+                self.misses += 1
+                owner = True
+            else:
+                self.waits += 1
+                owner = False
+
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            value = loader()
+            size = self._sizeof(value)
+        except BaseException as e:
+            # Failed loads are never cached, every waiter gets the same error
+            pending.error = e
+            with self._lock:
+                del self._inflight[key]
+            pending.done.set()
+            raise
+
+        pending.value = value
+        with self._lock:
+            self._insert(key, value, size)
+            del self._inflight[key]
+        pending.done.set()
+        return value
+
+    def peek(self, key: Hashable) -> Any:
+        # Return a stored value without loading it. A value found counts as a hit; nothing found isn't
+        # a miss yet, the caller may still find it under another key or get() it.
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            return None
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._entries:
+                del self._entries[key]
+                self._bytes -= self._sizes.pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "waits": self.waits,
+                "evictions": self.evictions,
+                "in_flight": len(self._inflight),
+            }
+
+    def _insert(self, key: Hashable, value: Any, size: int) -> None:
+        if key in self._entries:
+            self._bytes -= self._sizes[key]
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._sizes[key] = size
+        self._bytes += size
+
+        # Evict least recently used entries, but always keep the newest one
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            old_key, _ = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(old_key)
+            self.evictions += 1
+
+
+def budget_from_env(name: str, default_mb: int) -> int:
+    return int(float(os.environ.get(name, default_mb)) * 1024 * 1024)
+
+
+SESSION_STORE_MAX_BYTES = budget_from_env("F1_SESSION_STORE_MB", 2048)
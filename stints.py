@@ -0,0 +1,186 @@
+import argparse
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+import fastf1 as ff1
+import numpy as np
+import pandas as pd
+
+from data_importing import LOAD_PROFILES
+from pace_summary import GREEN_FLAG_STATUS
+from schedule_cache import get_schedule
+from session_archive import ArchivedSession, archive_exists
+
+# Seconds a lap gets faster per lap of fuel burnt (~0.035 s/kg at ~1.7 kg/lap). Lap times are
+# corrected to an empty car so degradation isn't hidden by the car getting lighter.
+FUEL_CORRECTION = float(os.environ.get("F1_FUEL_CORRECTION", 0.06))
+# Stints with fewer clean laps than this get no degradation fit
+MIN_FIT_LAPS = 4
+# Laps slower than this fraction of their stint's median (traffic, mistakes) are left out of the fit
+STINT_OUTLIER_THRESHOLD = 1.05
+
+STINT_LAP_COLUMNS = ["Driver", "Team", "LapNumber", "LapTime", "Stint", "Compound", "TyreLife",
+                     "PitInTime", "PitOutTime", "TrackStatus"]
+
+
+@dataclass(frozen=True)
+class StintModel:
+    # stints: one row per driver stint (within each `group_keys` group) with its laps, fuel corrected
+    # pace and the fitted Degradation (s/lap of tyre age). laps: the clean laps the fit used.
+    fuel_correction: float
+    group_keys: tuple
+    stints: pd.DataFrame
+    laps: pd.DataFrame
+
+
+def fuel_corrected_lap_times(laps: pd.DataFrame, fuel_correction: float = FUEL_CORRECTION,
+                             group_keys: Sequence[str] = ()) -> pd.Series:
+    # Lap time (s) with the weight of the fuel still on board taken out, race distance per session
+    if group_keys:
+        total_laps = laps.groupby(list(group_keys), observed=True)["LapNumber"].transform("max")
+    else:
+        total_laps = laps["LapNumber"].max()
+    return laps["LapTime"].dt.total_seconds() - fuel_correction * (total_laps - laps["LapNumber"])
+
+
+def fit_stints(laps: pd.DataFrame, fuel_correction: float = FUEL_CORRECTION,
+               group_keys: Sequence[str] = ()) -> StintModel:
+    # Fits corrected lap time = pace + degradation * tyre age for every stint at once. The least squares
+    # sums of all stints are bincounts over one stint id, so a season costs the same passes as a race.
+    group_keys = tuple(group_keys)
+    keys: List[str] = [*group_keys, "Driver", "Stint"]
+    laps = laps[laps["Stint"].notna() & laps["LapNumber"].notna()]
+    stint_id = laps.groupby(keys, observed=True, sort=True).ngroup().to_numpy()
+    n_stints = int(stint_id.max()) + 1 if len(stint_id) else 0
+
+    corrected = fuel_corrected_lap_times(laps, fuel_correction, group_keys).to_numpy()
+    tyre_age = laps["TyreLife"].to_numpy(dtype=float)
+
+    # Clean laps: timed, green flag, not the start or a pit lap, not far off the stint's median
+    clean = ~np.isnan(corrected) & ~np.isnan(tyre_age) & (laps["LapNumber"].to_numpy() > 1)
+    clean &= laps["PitInTime"].isna().to_numpy() & laps["PitOutTime"].isna().to_numpy()
+    if "TrackStatus" in laps.columns:
+        clean &= (laps["TrackStatus"].astype(object) == GREEN_FLAG_STATUS).to_numpy()
+    median = pd.Series(np.where(clean, corrected, np.nan)).groupby(stint_id).transform("median").to_numpy()
+    clean &= corrected < median * STINT_OUTLIER_THRESHOLD
+
+    ids, x, y = stint_id[clean], tyre_age[clean], corrected[clean]
+    n = np.bincount(ids, minlength=n_stints).astype(float)
+    sx = np.bincount(ids, x, n_stints)
+    sy = np.bincount(ids, y, n_stints)
+    sxx = np.bincount(ids, x * x, n_stints)
+    sxy = np.bincount(ids, x * y, n_stints)
+    syy = np.bincount(ids, y * y, n_stints)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var_x = n * sxx - sx ** 2
+        var_y = n * syy - sy ** 2
+        cov = n * sxy - sx * sy
+        fitted = (n >= MIN_FIT_LAPS) & (var_x > 0)
+        slope = np.where(fitted, cov / var_x, np.nan)
+        intercept = np.where(fitted, (sy - slope * sx) / n, np.nan)
+        r2 = np.where(fitted & (var_y > 0), cov ** 2 / (var_x * var_y), np.nan)
+        mean_pace = np.where(n > 0, sy / n, np.nan)
+
+    stints = laps.groupby(keys, observed=True, sort=True).agg(
+        **{"Team": ("Team", "first"), "Compound": ("Compound", "first"),
+           "Start Lap": ("LapNumber", "min"), "End Lap": ("LapNumber", "max"), "Laps": ("LapNumber", "size")}
+    ).reset_index()
+    stints["Compound"] = stints["Compound"].astype(object)
+    stints[["Stint", "Start Lap", "End Lap"]] = stints[["Stint", "Start Lap", "End Lap"]].astype(int)
+    stints["Fit Laps"] = n.astype(int)
+    stints["Avg Corrected Lap"] = mean_pace
+    stints["Fresh Tyre Pace"] = intercept
+    stints["Degradation (s/lap)"] = slope
+    stints["R2"] = r2
+
+    fit_laps = pd.DataFrame({
+        **{key: laps[key].to_numpy()[clean] for key in keys},
+        "Compound": laps["Compound"].astype(object).to_numpy()[clean],
+        "TyreLife": x,
+        "Corrected Lap Time": y,
+    })
+    return StintModel(fuel_correction=fuel_correction, group_keys=group_keys, stints=stints, laps=fit_laps)
+
+
+# Models already fitted for a loaded session
+_session_models: "OrderedDict[tuple, StintModel]" = OrderedDict()
+_session_models_lock = threading.Lock()
+STINT_MODEL_MEMO_SIZE = 32
+
+
+def session_stint_model(session, fuel_correction: float = FUEL_CORRECTION) -> StintModel:
+    key = (session.event.year, session.event["EventName"], session.name, fuel_correction)
+    with _session_models_lock:
+        if key in _session_models:
+            _session_models.move_to_end(key)
+            return _session_models[key]
+
+    model = fit_stints(session.laps, fuel_correction)
+
+    with _session_models_lock:
+        _session_models[key] = model
+        while len(_session_models) > STINT_MODEL_MEMO_SIZE:
+            _session_models.popitem(last=False)
+    return model
+
+
+def _season_laps(year: int, event: str, session_name: str) -> pd.DataFrame:
+    # Prefer the columnar archive, otherwise load the laps from the FastF1 cache
+    if archive_exists(year, event, session_name):
+        return ArchivedSession(year, event, session_name).read_laps(STINT_LAP_COLUMNS)
+
+    session = ff1.get_session(year, event, session_name)
+    session.load(**LOAD_PROFILES["laps"])
+    return pd.DataFrame(session.laps[STINT_LAP_COLUMNS])
+
+
+def season_stint_model(year: int, session_name: str = "Race", events: Optional[List[str]] = None,
+                       fuel_correction: float = FUEL_CORRECTION) -> StintModel:
+    # Every finished `session_name` of the season fitted in one pass, stints keyed by round and event
+    season = get_schedule(year)
+    now = datetime.utcnow()
+    frames = []
+    for event in events or season.event_names:
+        if session_name not in season.available_sessions(event, now):
+            continue
+        try:
+            laps = _season_laps(year, event, session_name)
+        except Exception as e:
+            print(f"⚠️ Skipped {year} {event} {session_name}: {e}")
+            continue
+        laps = laps.assign(RoundNumber=int(season.event(event)["RoundNumber"]), EventName=event)
+        for column in ("Driver", "Team", "Compound", "TrackStatus"):
+            # Each session has its own categories, concatenated they'd fall back to object anyway
+            if column in laps.columns:
+                laps[column] = laps[column].astype(object)
+        frames.append(laps)
+    laps = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=STINT_LAP_COLUMNS)
+    return fit_stints(laps, fuel_correction, group_keys=["RoundNumber", "EventName"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit tyre degradation of every stint of whole seasons.")
+    parser.add_argument("--years", type=int, nargs="+", default=[datetime.now().year])
+    parser.add_argument("--session", default="Race")
+    parser.add_argument("--fuel-correction", type=float, default=FUEL_CORRECTION, help="Seconds per lap of fuel")
+    parser.add_argument("--output", default=os.path.join("Data", "stints.csv"))
+    args = parser.parse_args()
+
+    tables = []
+    for year in args.years:
+        model = season_stint_model(year, args.session, fuel_correction=args.fuel_correction)
+        print(f"✅ {year}: {len(model.stints)} stints, {int(model.stints['Degradation (s/lap)'].notna().sum())} fitted")
+        tables.append(model.stints.assign(Year=year))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    pd.concat(tables, ignore_index=True).to_csv(args.output, index=False)
+    print(f"💾 Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
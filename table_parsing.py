@@ -0,0 +1,60 @@
+from io import BytesIO
+from typing import List, Sequence, Union
+
+import pandas as pd
+from lxml import etree
+
+# Streaming extraction of Wikipedia "wikitable" tables. The document is tokenized with lxml and
+# parsing stops as soon as the requested table is complete; earlier tables are discarded as they end.
+
+
+def _is_wikitable(element) -> bool:
+    return "wikitable" in (element.get("class") or "").split()
+
+
+def _text(element) -> str:
+    return "".join(element.itertext()).strip()
+
+
+def find_wikitable(html: Union[str, bytes], index: int = 0, encoding: str = "utf-8"):
+    if isinstance(html, str):
+        html = html.encode(encoding)
+
+    seen = 0
+    for _, table in etree.iterparse(BytesIO(html), events=("end",), tag="table", html=True, recover=True, encoding=encoding):
+        if not _is_wikitable(table):
+            continue
+        if seen == index:
+            return table
+        seen += 1
+        table.clear()
+    raise ValueError(f"Page has no wikitable with index {index}")
+
+
+def read_wikitable(html: Union[str, bytes], index: int = 0) -> pd.DataFrame:
+    # Header cells (th) become the columns, every row with data cells (td) becomes a row,
+    # padded with None or truncated to the number of columns
+    table = find_wikitable(html, index)
+    headers: List[str] = [_text(th) for th in table.iter("th")]
+    width = len(headers)
+
+    rows = []
+    for tr in table.iter("tr"):
+        cells = [_text(td) for td in tr.findall("td")]
+        if cells:
+            rows.append(cells[:width] + [None] * (width - len(cells)))
+
+    df = pd.DataFrame(rows, columns=headers)
+    # Remove duplicate columns if any
+    return df.loc[:, ~df.columns.duplicated()]
+
+
+def clean_integer_columns(df: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
+    # Strip footnote markers and any other non-digits from whole columns at once, then cast to int
+    columns = list(columns)
+    df[columns] = df[columns].replace(r"\D", "", regex=True).astype(int)
+    return df
+
+
+def first_digit(column: pd.Series) -> pd.Series:
+    return column.str.extract(r"(\d)", expand=False)
@@ -0,0 +1,86 @@
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Derived telemetry channels computed over whole frames with NumPy. Frames holding several
+# laps/drivers at once can pass `group` (e.g. "LapNumber") so distance and braking zones restart per group.
+
+DRS_OPEN_VALUES = (10, 12, 14)
+FULL_THROTTLE = 99  # Throttle (%) at or above this counts as flat out
+
+
+def drs_open(drs) -> np.ndarray:
+    return np.isin(np.asarray(drs), DRS_OPEN_VALUES)
+
+
+def _group_starts(telemetry: pd.DataFrame, group: Optional[str]) -> np.ndarray:
+    # True at the first sample of every group
+    starts = np.zeros(len(telemetry), dtype=bool)
+    if len(telemetry):
+        starts[0] = True
+    if group is not None:
+        values = telemetry[group].to_numpy()
+        starts[1:] |= values[1:] != values[:-1]
+    return starts
+
+
+def _seconds(telemetry: pd.DataFrame) -> np.ndarray:
+    column = "SessionTime" if "SessionTime" in telemetry else "Time"
+    return telemetry[column].dt.total_seconds().to_numpy()
+
+
+def enrich_telemetry(telemetry: pd.DataFrame, group: Optional[str] = None) -> pd.DataFrame:
+    # Adds Distance (if missing), DRS bool, Full Throttle, Gear Shift (+1 up, -1 down, 0),
+    # Brake Onset and Braking Zone (1-based zone number within the group, 0 when off the brakes)
+    telemetry = telemetry.copy()
+    starts = _group_starts(telemetry, group)
+    dt = np.diff(_seconds(telemetry), prepend=np.nan)
+    dt[starts] = 0
+
+    if "Distance" not in telemetry:
+        step = telemetry["Speed"].to_numpy(dtype=np.float64) / 3.6 * dt
+        cumulative = np.cumsum(step)
+        telemetry["Distance"] = cumulative - np.maximum.accumulate(np.where(starts, cumulative, 0))
+
+    telemetry["DRS bool"] = drs_open(telemetry["DRS"])
+    telemetry["Full Throttle"] = telemetry["Throttle"].to_numpy() >= FULL_THROTTLE
+
+    gear = telemetry["nGear"].to_numpy(dtype=np.int16)
+    shift = np.sign(np.diff(gear, prepend=gear[:1]))
+    shift[starts] = 0
+    telemetry["Gear Shift"] = shift.astype(np.int8)
+
+    brake = telemetry["Brake"].to_numpy(dtype=bool)
+    previous = np.concatenate([[False], brake[:-1]])
+    onset = brake & (~previous | starts)
+    telemetry["Brake Onset"] = onset
+    zone = np.cumsum(onset)
+    zone -= np.maximum.accumulate(np.where(starts, zone - onset, 0))
+    telemetry["Braking Zone"] = np.where(brake, zone, 0).astype(np.int16)
+
+    return telemetry
+
+
+
+def telemetry_summary(telemetry: pd.DataFrame, group: Optional[str] = None) -> pd.DataFrame:
+    # Per-group aggregates of an enriched frame: time-weighted full throttle fraction,
+    # braking zones, gear shifts and top speed
+    dt = np.diff(_seconds(telemetry), prepend=np.nan)
+    dt[_group_starts(telemetry, group)] = 0
+    frame = pd.DataFrame({
+        "dt": dt,
+        "full_dt": dt * telemetry["Full Throttle"].to_numpy(),
+        "Braking Zones": telemetry["Brake Onset"].to_numpy(),
+        "Gear Shifts": telemetry["Gear Shift"].to_numpy() != 0,
+        "Top Speed": telemetry["Speed"].to_numpy(),
+    })
+    keys = telemetry[group].to_numpy() if group is not None else np.zeros(len(telemetry))
+    summary = frame.groupby(keys, sort=False).agg({"dt": "sum", "full_dt": "sum", "Braking Zones": "sum",
+                                                   "Gear Shifts": "sum", "Top Speed": "max"})
+    summary["Full Throttle Fraction"] = summary.pop("full_dt") / summary.pop("dt")
+    return summary
+
+
+def lap_summary(telemetry: pd.DataFrame) -> Dict[str, float]:
+    return telemetry_summary(telemetry).iloc[0].to_dict()
@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_importing import with_telemetry
+from session_archive import session_dir
+
+# Every lap of every driver resampled onto one distance grid and stored as a
+# float32 array of shape (driver, lap, channel, sample), memory-mapped from disk
+TELEMETRY_INDEX_DIR = os.environ.get("F1_TELEMETRY_INDEX_DIR", os.path.join("Data", "telemetry_index"))
+
+CHANNELS = ("Speed", "Throttle", "Brake", "nGear", "RPM", "DRS", "Time")
+# Discrete channels take the last sample at or before each grid point instead of being interpolated
+STEP_CHANNELS = ("Brake", "nGear", "DRS")
+N_SAMPLES = 1000
+
+
+class TelemetryIndex:
+
+    def __init__(self, data: np.ndarray, drivers: List[str], distance: np.ndarray):
+        self.data = data
+        self.drivers = drivers
+        self.distance = distance
+        self._driver_pos = {driver: i for i, driver in enumerate(drivers)}
+
+    @property
+    def n_laps(self) -> int:
+        return self.data.shape[1]
+
+    def lap(self, driver: str, lap: int) -> np.ndarray:
+        # (channel, sample) view of one lap
+        return self.data[self._driver_pos[driver], int(lap) - 1]
+
+    def trace(self, driver: str, lap: int, channel: str) -> np.ndarray:
+        return self.data[self._driver_pos[driver], int(lap) - 1, CHANNELS.index(channel)]
+
+    def overlay(self, selections: Sequence[Tuple[str, int]], channel: str) -> np.ndarray:
+        # (selection, sample) array for an N-way comparison of (driver, lap) pairs
+        drivers = [self._driver_pos[driver] for driver, _ in selections]
+        laps = [int(lap) - 1 for _, lap in selections]
+        return self.data[drivers, laps, CHANNELS.index(channel)]
+
+    def delta_time(self, reference: Tuple[str, int], other: Tuple[str, int]) -> np.ndarray:
+        # Positive where `other` is behind `reference` at the same lap distance
+        return self.trace(*other, "Time") - self.trace(*reference, "Time")
+
+
+def _resample_driver(car: pd.DataFrame, laps: pd.DataFrame, grid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Resample all laps of one driver at once. Samples are placed on a single monotonic axis
+    # (lap position * offset + distance into the lap) so one np.interp call covers every lap.
+    laps = laps[laps["LapStartTime"].notna() & laps["Time"].notna()].sort_values("LapStartTime")
+    starts = laps["LapStartTime"].dt.total_seconds().to_numpy()
+    ends = laps["Time"].dt.total_seconds().to_numpy()
+    lap_numbers = laps["LapNumber"].to_numpy().astype(int)
+
+    # No timed laps or no samples within them: nothing to interpolate, the driver's rows stay NaN
+    no_laps = np.empty(0, dtype=int), np.empty((0, len(CHANNELS), len(grid)), dtype=np.float32)
+    if len(starts) == 0:
+        return no_laps
+
+    t = car["SessionTime"].dt.total_seconds().to_numpy()
+    lap_pos = np.searchsorted(starts, t, side="right") - 1
+    in_lap = (lap_pos >= 0) & (t <= ends[lap_pos.clip(0)])
+    t, lap_pos = t[in_lap], lap_pos[in_lap]
+    if len(t) == 0:
+        return no_laps
+    channels = {channel: car[channel].to_numpy(dtype=np.float64)[in_lap] for channel in CHANNELS if channel != "Time"}
+
+    step = np.zeros_like(t)
+    step[1:] = channels["Speed"][1:] / 3.6 * np.diff(t)
+    step[1:][np.diff(lap_pos) != 0] = 0  # Distance restarts at every lap
+    cumulative = np.cumsum(step)
+    first_sample = np.searchsorted(lap_pos, np.arange(len(starts)))
+    distance = cumulative - cumulative[first_sample.clip(0, len(t) - 1)][lap_pos]
+    channels["Time"] = t - starts[lap_pos]
+
+    lap_end = np.zeros(len(starts))
+    np.maximum.at(lap_end, lap_pos, distance)
+    has_data = np.bincount(lap_pos, minlength=len(starts)) > 1
+
+    offset = grid[-1] * 10 + 1
+    axis = lap_pos * offset + distance
+    queries = np.arange(len(starts))[:, None] * offset + np.minimum(grid[None, :], lap_end[:, None])
+
+    block = np.empty((len(starts), len(CHANNELS), len(grid)), dtype=np.float32)
+    for c, channel in enumerate(CHANNELS):
+        values = channels[channel]
+        if channel in STEP_CHANNELS:
+            idx = np.searchsorted(axis, queries, side="right") - 1
+            block[:, c] = values[idx.clip(0)]
+        else:
+            block[:, c] = np.interp(queries, axis, values)
+    return lap_numbers[has_data], block[has_data]
+
+
+def build_telemetry_index(session, path: str, n_samples: int = N_SAMPLES) -> TelemetryIndex:
+    # Session must be loaded with telemetry
+    results = session.results
+    drivers = list(results["Abbreviation"])
+    n_laps = int(session.laps["LapNumber"].max())
+
+    fastest = session.laps.pick_fastest().get_car_data().add_distance()
+    grid = np.linspace(0, fastest["Distance"].max(), n_samples)
+
+    os.makedirs(path, exist_ok=True)
+    tmp_path = os.path.join(path, f"telemetry.{os.getpid()}.{threading.get_ident()}.npy")
+    data = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32,
+                                     shape=(len(drivers), n_laps, len(CHANNELS), n_samples))
+    data[:] = np.nan
+
+    for d, (driver, number) in enumerate(zip(drivers, results["DriverNumber"])):
+        driver_laps = session.laps.pick_drivers(driver)
+        if number not in session.car_data or driver_laps.empty:
+            continue
+        lap_numbers, block = _resample_driver(session.car_data[number], driver_laps, grid)
+        data[d, lap_numbers - 1] = block
+
+    data.flush()
+    del data
+    os.replace(tmp_path, os.path.join(path, "telemetry.npy"))
+    # meta.json marks a complete index, so it's replaced last and never seen half-written
+    tmp_meta_path = os.path.join(path, f"meta.{os.getpid()}.{threading.get_ident()}.json")
+    with open(tmp_meta_path, "w") as f:
+        json.dump({"drivers": drivers, "channels": list(CHANNELS), "distance": grid.tolist()}, f)
+    os.replace(tmp_meta_path, os.path.join(path, "meta.json"))
+
+    return open_telemetry_index(path)
+
+
+def open_telemetry_index(path: str) -> TelemetryIndex:
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    data = np.load(os.path.join(path, "telemetry.npy"), mmap_mode="r")
+    return TelemetryIndex(data, meta["drivers"], np.asarray(meta["distance"]))
+
+
+_indexes: "OrderedDict[tuple, TelemetryIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+TELEMETRY_INDEX_MEMO_SIZE = 16
+
+
+def get_telemetry_index(session) -> TelemetryIndex:
+    # Opens the on-disk index of a session, building it the first time
+    key = (session.event.year, session.event["EventName"], session.name)
+    with _indexes_lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key]
+
+    path = session_dir(*key, root=TELEMETRY_INDEX_DIR)
+    if os.path.exists(os.path.join(path, "meta.json")):
+        index = open_telemetry_index(path)
+    else:
+        index = build_telemetry_index(with_telemetry(session), path)
+
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > TELEMETRY_INDEX_MEMO_SIZE:
+            _indexes.popitem(last=False)
+    return index
@@ -0,0 +1,38 @@
+import numpy as np
+
+from beeswarm import swarm_offsets
+
+
+def test_points_in_one_row_spread_symmetrically():
+    offsets = swarm_offsets(np.array([1.0, 1.01, 1.02]), np.zeros(3), diameter_y=0.1, diameter_x=0.05)
+    np.testing.assert_allclose(offsets, [-0.05, 0.0, 0.05])
+
+
+def test_points_in_different_rows_or_groups_stay_centred():
+    values = np.array([1.0, 2.0, 3.0, 1.0])
+    groups = np.array(["A", "A", "A", "B"])
+    np.testing.assert_array_equal(swarm_offsets(values, groups, diameter_y=0.1, diameter_x=0.05), 0)
+
+
+def test_wide_rows_are_squeezed_into_the_category():
+    offsets = swarm_offsets(np.full(101, 1.0), np.zeros(101), diameter_y=0.1, diameter_x=0.05,
+                            max_half_width=0.4, density_threshold=1000)
+    assert np.abs(offsets).max() <= 0.4 + 1e-9
+    assert len(np.unique(offsets.round(9))) == 101  # No two points on top of each other
+    np.testing.assert_allclose(offsets.sum(), 0, atol=1e-9)
+
+
+def test_dense_groups_become_density_strips():
+    rng = np.random.default_rng(0)
+    values = rng.normal(90, 1, 1000)
+    offsets = swarm_offsets(values, np.zeros(len(values)), diameter_y=0.01, diameter_x=0.05,
+                            max_half_width=0.4, density_threshold=200)
+    assert np.abs(offsets).max() <= 0.4 + 1e-9
+    # The strip is widest around the median, where most laps are
+    near_centre = np.abs(values - 90) < 0.5
+    tails = np.abs(values - 90) > 2
+    assert np.abs(offsets[near_centre]).max() > np.abs(offsets[tails]).max()
+
+
+def test_empty_input():
+    assert len(swarm_offsets(np.array([]), np.array([]), diameter_y=0.1, diameter_x=0.05)) == 0
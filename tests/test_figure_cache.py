@@ -0,0 +1,66 @@
+import itertools
+import json
+import os
+import time
+
+import figure_cache
+from figure_cache import FigureCache, PINNED_MANIFEST
+
+
+_writes = itertools.count()
+
+
+def fill(cache: FigureCache, names, size: int = 100) -> None:
+    for name in names:
+        cache.put(name, b"x" * size)
+        # Distinct mtimes so eviction order is the write order
+        stamp = time.time() - 1000 + next(_writes)
+        os.utime(os.path.join(cache.cache_dir, name), (stamp, stamp))
+
+
+def test_pinned_figures_are_never_evicted(tmp_path):
+    cache = FigureCache(10_000, str(tmp_path), max_disk_bytes=450)
+    fill(cache, ["a.png", "b.png", "c.png"])
+    cache.pin({"a.png": "oldest, pinned"})
+    fill(cache, ["d.png", "e.png"])
+
+    # Over budget on e.png: the oldest unpinned file goes, the older pinned one stays
+    assert sorted(os.listdir(tmp_path)) == ["a.png", "c.png", "d.png", "e.png", PINNED_MANIFEST]
+    assert cache.pinned() == {"a.png": 100}
+
+
+def test_pins_written_by_another_process_are_honoured(tmp_path):
+    cache = FigureCache(10_000, str(tmp_path), max_disk_bytes=450)
+    fill(cache, ["a.png", "b.png", "c.png"])
+    FigureCache(0, str(tmp_path), max_disk_bytes=450).pin({"a.png": "batch render"})
+    fill(cache, ["d.png", "e.png"])
+
+    assert "a.png" in os.listdir(tmp_path)
+
+
+def test_pins_of_another_cache_version_are_dropped(tmp_path):
+    with open(tmp_path / PINNED_MANIFEST, "w") as f:
+        json.dump({"version": figure_cache.FIGURE_CACHE_VERSION - 1, "figures": {"a.png": "stale"}}, f)
+    assert FigureCache(10_000, str(tmp_path), max_disk_bytes=450).pinned() == {}
+
+
+def test_clear_pins(tmp_path):
+    cache = FigureCache(10_000, str(tmp_path), max_disk_bytes=10_000)
+    fill(cache, ["a.png", "b.png"])
+    cache.pin({"a.png": "a", "b.png": "b"})
+    assert cache.clear_pins() == 2
+    assert FigureCache(10_000, str(tmp_path), max_disk_bytes=10_000).pinned() == {}
+
+
+def test_leftover_temporary_files_arent_counted(tmp_path):
+    (tmp_path / "a.png").write_bytes(b"x" * 100)
+    (tmp_path / "b.png.123.tmp").write_bytes(b"x" * 1000)
+    (tmp_path / "c.png.456.tmp").write_bytes(b"x" * 1000)
+    stale = time.time() - figure_cache.STALE_TMP_SECONDS - 1
+    os.utime(tmp_path / "b.png.123.tmp", (stale, stale))
+
+    cache = FigureCache(10_000, str(tmp_path), max_disk_bytes=10_000)
+
+    assert cache.stats()["disk_bytes"] == 100
+    # The stale one is removed, the recent one may belong to a write still in progress
+    assert sorted(os.listdir(tmp_path)) == ["a.png", "c.png.456.tmp"]
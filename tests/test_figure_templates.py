@@ -0,0 +1,17 @@
+import matplotlib
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+
+from figure_templates import new_figure
+
+
+def test_new_figure_stays_out_of_pyplot():
+    # Figures of concurrent renders can't be closed or drawn into through pyplot's shared registry
+    fig, axes = new_figure(2, figsize=(4, 3), gridspec_kw={"height_ratios": [2, 1]})
+    axes[0].plot([0, 1], [0, 1])
+
+    assert plt.get_fignums() == []
+    assert len(fig.axes) == 2 and tuple(fig.get_size_inches()) == (4, 3)
+    assert plt.gcf() is not fig
+    plt.close("all")
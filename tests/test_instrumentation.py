@@ -0,0 +1,35 @@
+import json
+import time
+
+from instrumentation import Instrumentation
+
+
+def test_write_picks_the_format_from_the_extension(tmp_path):
+    metrics = Instrumentation("time")
+    with metrics.span("load_session"):
+        pass
+
+    metrics.write(str(tmp_path / "metrics.json"))
+    metrics.write(str(tmp_path / "metrics.prom"))
+
+    assert json.loads((tmp_path / "metrics.json").read_text())["load_session"]["count"] == 1
+    assert 'f1_dashboard_span_seconds_count{op="load_session"} 1' in (tmp_path / "metrics.prom").read_text()
+
+
+def test_writer_rewrites_the_file_every_interval(tmp_path):
+    path = tmp_path / "metrics.json"
+    metrics = Instrumentation("time")
+    metrics.start_writer(str(path), interval=0.05)
+
+    with metrics.span("plot"):
+        pass
+    deadline = time.time() + 5
+    while time.time() < deadline and not (path.exists() and "plot" in json.loads(path.read_text())):
+        time.sleep(0.02)
+    assert json.loads(path.read_text())["plot"]["count"] == 1
+
+    with metrics.span("plot"):
+        pass
+    while time.time() < deadline and json.loads(path.read_text())["plot"]["count"] < 2:
+        time.sleep(0.02)
+    assert json.loads(path.read_text())["plot"]["count"] == 2
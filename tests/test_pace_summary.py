@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pace_summary import summarise_pace
+
+
+def laps_frame(rows) -> pd.DataFrame:
+    # rows: (event, team, stint, lap time in s, track status)
+    df = pd.DataFrame(rows, columns=["EventName", "Team", "Stint", "LapTime", "TrackStatus"])
+    df["LapTime"] = pd.to_timedelta(df["LapTime"], unit="s")
+    return df
+
+
+LAPS = laps_frame([
+    ("Bahrain", "Ferrari", 1, 90.0, "1"),
+    ("Bahrain", "Ferrari", 1, 92.0, "1"),
+    ("Bahrain", "Ferrari", 2, 130.0, "4"),  # Safety car lap
+    ("Bahrain", "McLaren", 1, 91.0, "1"),
+    ("Bahrain", "McLaren", 2, 91.5, "1"),
+    ("Bahrain", "McLaren", 2, None, "1"),  # Untimed
+    ("Jeddah", "Ferrari", 1, 80.0, "1"),
+    ("Jeddah", "McLaren", 1, 79.0, "1"),
+])
+
+
+def test_statistics_and_gaps():
+    table = summarise_pace(LAPS[LAPS["EventName"] == "Bahrain"]).table.set_index("Team")
+
+    assert table.loc["Ferrari", "Laps"] == 3 and table.loc["McLaren", "Laps"] == 2
+    assert table.loc["Ferrari", "Fastest Lap"] == 90.0
+    assert table.loc["Ferrari", "Median Lap"] == 92.0
+    assert table.loc["McLaren", "Avg Lap"] == pytest.approx(91.25)
+    assert table.loc["McLaren", "P25 Lap"] == pytest.approx(91.125)
+    assert table.loc["Ferrari", "Gap Fast Lap"] == 0
+    assert table.loc["McLaren", "Gap Fast Lap"] == pytest.approx(1.0)
+    assert table.loc["McLaren", "Percentage Diff Fast Lap"] == round(100 / 90, 2)
+    assert table.loc["McLaren", "Gap Avg Lap"] == 0
+    assert table.loc["Ferrari", "Gap Avg Lap"] == pytest.approx(104 - 91.25)
+
+
+@pytest.mark.parametrize("lap_filter, stint, expected", [
+    ("quick", None, {"Ferrari": 2, "McLaren": 2}),  # 130 s is past 107% of 90 s
+    ("green", None, {"Ferrari": 2, "McLaren": 2}),
+    ("all", 2, {"Ferrari": 1, "McLaren": 1}),
+])
+def test_lap_filters(lap_filter, stint, expected):
+    table = summarise_pace(LAPS[LAPS["EventName"] == "Bahrain"], lap_filter=lap_filter, stint=stint).table
+    assert dict(zip(table["Team"], table["Laps"])) == expected
+
+
+def test_unknown_filter():
+    with pytest.raises(ValueError):
+        summarise_pace(LAPS, lap_filter="fast")
+
+
+def test_gaps_are_per_group():
+    table = summarise_pace(LAPS, lap_filter="quick", group_keys=["EventName"]).table
+    gaps = table.set_index(["EventName", "Team"])["Gap Fast Lap"]
+
+    assert gaps[("Bahrain", "Ferrari")] == 0 and gaps[("Jeddah", "McLaren")] == 0
+    assert gaps[("Jeddah", "Ferrari")] == pytest.approx(1.0)
+    assert not np.isnan(gaps).any()
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from race_matrix import COMPOUNDS, build_race_matrix
+
+
+def laps() -> pd.DataFrame:
+    # VER pits on lap 2, HAM has no lap 3 and an unknown compound on lap 2
+    return pd.DataFrame({
+        "Driver": ["VER", "VER", "VER", "HAM", "HAM"],
+        "LapNumber": [1, 2, 3, 1, 2],
+        "LapTime": pd.to_timedelta([91.0, 95.0, 90.0, 92.0, 91.5], unit="s"),
+        "Time": pd.to_timedelta([91.0, 186.0, 276.0, 92.0, 183.5], unit="s"),
+        "Position": [1, 1, 1, 2, 2],
+        "Compound": ["MEDIUM", "MEDIUM", "HARD", "SOFT", "UNKNOWN"],
+        "PitInTime": pd.to_timedelta([np.nan, 180.0, np.nan, np.nan, np.nan], unit="s"),
+        "PitOutTime": pd.to_timedelta([np.nan, np.nan, 190.0, np.nan, np.nan], unit="s"),
+    })
+
+
+def test_compound_codes_index_into_compounds():
+    race = build_race_matrix(laps(), ["HAM", "VER"])
+    medium, hard, soft = (COMPOUNDS.index(c) for c in ("MEDIUM", "HARD", "SOFT"))
+    assert race.compound.tolist() == [[soft, -1, -1], [medium, medium, hard]]
+    assert race.compound.dtype == np.int8
+
+
+def test_missing_laps_are_nan_and_pit_flags_false():
+    race = build_race_matrix(laps(), ["VER"])
+    assert race.drivers == ["VER", "HAM"]
+    assert np.isnan(race.lap_time[1, 2])
+    assert race.pit_in.tolist() == [[False, True, False], [False, False, False]]
+    assert race.pit_out.tolist() == [[False, False, True], [False, False, False]]
+    assert race.gap_to_leader()[1, :2].tolist() == [1.0, 0.0]
+    assert race.gap_to_leader()[0, :2].tolist() == [0.0, 2.5]
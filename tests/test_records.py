@@ -0,0 +1,119 @@
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import records
+
+def session_frames(laps_rows, result_rows):
+    # laps_rows: (driver, team, lap time in s, in lap, out lap, deleted)
+    laps = pd.DataFrame(laps_rows, columns=["Driver", "Team", "LapTime", "In", "Out", "Deleted"])
+    laps["LapTime"] = pd.to_timedelta(laps["LapTime"], unit="s")
+    laps["PitInTime"] = pd.to_timedelta(np.where(laps.pop("In"), 1.0, np.nan), unit="s")
+    laps["PitOutTime"] = pd.to_timedelta(np.where(laps.pop("Out"), 1.0, np.nan), unit="s")
+    results = pd.DataFrame(result_rows, columns=["Abbreviation", "TeamName", "Position"])
+    return laps, results
+
+
+BAHRAIN_2023_Q = session_frames([
+    ("VER", "Red Bull", 89.7, False, False, False),
+    ("VER", "Red Bull", 89.1, False, False, True),  # Track limits, doesn't count
+    ("PER", "Red Bull", 90.0, False, False, False),
+    ("PER", "Red Bull", 80.0, False, True, False),  # Out lap (timing glitch)
+    ("LEC", "Ferrari", 89.9, False, False, None),
+    ("LEC", "Ferrari", np.nan, True, False, False),
+], [("VER", "Red Bull", 1.0), ("LEC", "Ferrari", 2.0), ("PER", "Red Bull", 3.0)])
+
+BAHRAIN_2024_Q = session_frames([
+    ("VER", "Red Bull", 89.2, False, False, False),
+    ("PER", "Red Bull", 89.6, False, False, False),
+    ("LEC", "Ferrari", 89.4, False, False, False),
+], [("VER", "Red Bull", 1.0), ("LEC", "Ferrari", 2.0), ("PER", "Red Bull", 3.0)])
+
+JEDDAH_2024_Q = session_frames([
+    ("VER", "Red Bull", 87.5, False, False, False),
+    ("LEC", "Ferrari", 87.3, False, False, False),
+], [("LEC", "Ferrari", 1.0), ("VER", "Red Bull", 2.0)])
+
+BAHRAIN_2024_R = session_frames([
+    ("VER", "Red Bull", 92.0, False, False, False),
+    ("PER", "Red Bull", 93.0, False, False, False),
+], [("PER", "Red Bull", 1.0), ("VER", "Red Bull", 2.0), ("LEC", "Ferrari", np.nan)])
+
+JEDDAH_2024_R = session_frames([
+    ("VER", "Red Bull", 91.0, False, False, False),
+], [("VER", "Red Bull", 1.0), ("PER", "Red Bull", 2.0)])
+
+
+def ingest(db, monkeypatch, frames, year, round_number, event, circuit, session_name):
+    monkeypatch.setattr(records, "_session_frames", lambda *args: frames)
+    with closing(records.connect(db)) as conn:
+        records.ingest_session(conn, year, round_number, event, circuit, session_name)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    path = str(tmp_path / "records.sqlite")
+    ingest(path, monkeypatch, BAHRAIN_2023_Q, 2023, 1, "Bahrain Grand Prix", "Sakhir", "Qualifying")
+    ingest(path, monkeypatch, BAHRAIN_2024_Q, 2024, 1, "Bahrain Grand Prix", "Sakhir", "Qualifying")
+    ingest(path, monkeypatch, JEDDAH_2024_Q, 2024, 2, "Saudi Arabian Grand Prix", "Jeddah", "Qualifying")
+    ingest(path, monkeypatch, BAHRAIN_2024_R, 2024, 1, "Bahrain Grand Prix", "Sakhir", "Race")
+    ingest(path, monkeypatch, JEDDAH_2024_R, 2024, 2, "Saudi Arabian Grand Prix", "Jeddah", "Race")
+    return path
+
+
+def best_laps(path, year=2023):
+    with closing(sqlite3.connect(path)) as conn:
+        return dict(conn.execute("SELECT driver, lap_time FROM best_laps WHERE year = ? AND session = 'Qualifying'",
+                                 (year,)))
+
+
+def test_deleted_and_pit_laps_dont_count(db):
+    assert best_laps(db) == pytest.approx({"VER": 89.7, "PER": 90.0, "LEC": 89.9})
+
+
+def test_ingest_is_idempotent(db, monkeypatch):
+    with closing(sqlite3.connect(db)) as conn:
+        before = [conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2, 3, 4, 5, 6").fetchall()
+                  for table in ("best_laps", "results")]
+    ingest(db, monkeypatch, BAHRAIN_2023_Q, 2023, 1, "Bahrain Grand Prix", "Sakhir", "Qualifying")
+    with closing(sqlite3.connect(db)) as conn:
+        after = [conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2, 3, 4, 5, 6").fetchall()
+                 for table in ("best_laps", "results")]
+        assert conn.execute("SELECT COUNT(*) FROM ingested").fetchone()[0] == 5
+    assert after == before
+
+
+def test_reingest_drops_drivers_no_longer_in_the_session(db, monkeypatch):
+    laps, results = BAHRAIN_2023_Q
+    ingest(db, monkeypatch, (laps[laps["Driver"] != "PER"], results[results["Abbreviation"] != "PER"]),
+           2023, 1, "Bahrain Grand Prix", "Sakhir", "Qualifying")
+    assert set(best_laps(db)) == {"VER", "LEC"}
+
+
+def test_fastest_laps_by_circuit(db):
+    fastest = records.fastest_laps_by_circuit(path=db)
+    assert fastest[["Circuit", "Driver", "Year"]].values.tolist() == [["Jeddah", "LEC", 2024], ["Sakhir", "VER", 2024]]
+    assert fastest["Lap Time (s)"].tolist() == pytest.approx([87.3, 89.2])
+
+
+def test_pole_positions(db):
+    assert records.pole_positions(path=db).values.tolist() == [["VER", 2], ["LEC", 1]]
+    assert records.pole_positions(2023, path=db).values.tolist() == [["VER", 1]]
+
+
+def test_lap_time_progression(db):
+    progression = records.lap_time_progression("Sakhir", path=db)
+    assert progression["Year"].tolist() == [2023, 2024]
+    assert progression["Lap Time (s)"].tolist() == pytest.approx([89.7, 89.2])
+
+
+def test_teammate_head_to_head_skips_unclassified(db):
+    head_to_head = records.teammate_head_to_head(2024, path=db)
+    assert head_to_head.values.tolist() == [["Red Bull", "PER", "VER", 1, 1]]
+
+
+def test_circuits(db):
+    assert records.circuits(path=db) == ["Jeddah", "Sakhir"]
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from schedule_cache import DATA_AVAILABILITY_DELAY, SESSION_DURATIONS, SeasonSchedule
+
+RACE_START = datetime(2024, 3, 2, 15)
+
+
+def schedule(race_date=RACE_START, qualifying_date=RACE_START - timedelta(days=1)) -> SeasonSchedule:
+    event = {"RoundNumber": 1, "EventName": "Bahrain Grand Prix", "EventDate": RACE_START}
+    for i, (name, date) in enumerate([("Qualifying", qualifying_date), ("Race", race_date)], start=1):
+        event[f"Session{i}"] = name
+        event[f"Session{i}DateUtc"] = pd.Timestamp(date) if date is not None else pd.NaT
+    for i in range(3, 6):
+        event[f"Session{i}"] = None
+        event[f"Session{i}DateUtc"] = pd.NaT
+    return SeasonSchedule(2024, pd.DataFrame([event]))
+
+
+def test_sessions_are_offered_once_their_data_is_available():
+    season = schedule()
+    race_data = RACE_START + SESSION_DURATIONS["Race"] + DATA_AVAILABILITY_DELAY
+
+    assert season.available_sessions("Bahrain Grand Prix", RACE_START - timedelta(days=2)) == []
+    assert season.available_sessions("Bahrain Grand Prix", RACE_START + timedelta(minutes=30)) == ["Qualifying"]
+    assert season.available_sessions("Bahrain Grand Prix", race_data - timedelta(seconds=1)) == ["Qualifying"]
+    assert season.available_sessions("Bahrain Grand Prix", race_data) == ["Race", "Qualifying"]
+
+
+def test_undated_sessions_count_as_available():
+    season = schedule(race_date=None)
+    assert season.available_sessions("Bahrain Grand Prix", RACE_START - timedelta(days=2)) == ["Race"]
+    assert season.first_available_at("Bahrain Grand Prix") == (
+        RACE_START - timedelta(days=1) + SESSION_DURATIONS["Qualifying"] + DATA_AVAILABILITY_DELAY)
+
+
+def test_first_available_at_without_any_dates():
+    assert schedule(race_date=None, qualifying_date=None).first_available_at("Bahrain Grand Prix") is None
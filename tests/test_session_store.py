@@ -0,0 +1,118 @@
+import threading
+import time
+
+import pytest
+
+from session_store import SessionStore
+
+
+def sized_store(max_bytes: int) -> SessionStore:
+    # Values are their own size
+    return SessionStore(max_bytes=max_bytes, sizeof=lambda value: value)
+
+
+def wait_for(condition, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_least_recently_used_entries_are_evicted():
+    store = sized_store(10)
+    store.get("a", lambda: 4)
+    store.get("b", lambda: 4)
+    store.get("a", lambda: pytest.fail("a is stored"))  # a is now the most recently used
+    store.get("c", lambda: 4)
+
+    assert store.peek("b") is None
+    assert store.peek("a") == 4 and store.peek("c") == 4
+    stats = store.stats()
+    assert (stats["bytes"], stats["entries"], stats["evictions"]) == (8, 2, 1)
+
+
+def test_newest_entry_is_kept_even_over_budget():
+    store = sized_store(10)
+    store.get("a", lambda: 4)
+    assert store.get("huge", lambda: 50) == 50
+
+    assert store.peek("a") is None and store.peek("huge") == 50
+    assert store.stats()["bytes"] == 50
+
+
+def test_discard_and_clear_release_bytes():
+    store = sized_store(10)
+    store.get("a", lambda: 4)
+    store.get("b", lambda: 3)
+    store.discard("a")
+    assert store.stats()["bytes"] == 3
+    store.clear()
+    assert store.stats()["bytes"] == 0 and store.peek("b") is None
+
+
+def test_concurrent_requests_share_one_load():
+    store = sized_store(100)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(threading.get_ident())
+        started.set()
+        release.wait(5)
+        return 1
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.get("race", loader))) for _ in range(8)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    wait_for(lambda: store.stats()["waits"] == 7)  # Every other caller found the load in flight
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1 and results == [1] * 8
+    stats = store.stats()
+    assert (stats["misses"], stats["waits"], stats["in_flight"]) == (1, 7, 0)
+
+
+def test_failed_load_is_shared_and_not_cached():
+    store = sized_store(100)
+    started, release = threading.Event(), threading.Event()
+
+    def failing_loader():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("no data")
+
+    errors = []
+
+    def request():
+        try:
+            store.get("race", failing_loader)
+        except RuntimeError as e:
+            errors.append(e)
+
+    owner = threading.Thread(target=request)
+    owner.start()
+    started.wait(5)
+    waiter = threading.Thread(target=request)
+    waiter.start()
+    wait_for(lambda: store.stats()["waits"] == 1)
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert len(errors) == 2 and errors[0] is errors[1]
+    assert store.get("race", lambda: 2) == 2  # The next request loads again
+
+
+def test_peek_counts_hits_but_not_misses():
+    store = sized_store(100)
+    store.get("race", lambda: 1)
+
+    assert store.peek("race") == 1
+    assert store.peek("qualifying") is None
+    stats = store.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
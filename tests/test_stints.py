@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stints import MIN_FIT_LAPS, fit_stints, fuel_corrected_lap_times
+
+FUEL = 0.06
+N_LAPS = 30
+
+
+def race_laps(driver: str = "VER", pit_lap: int = 15, pace=(90.0, 89.5), degradation=(0.10, 0.05)) -> pd.DataFrame:
+    # One pit stop; corrected lap times follow pace + degradation * tyre age exactly
+    laps = pd.DataFrame({"Driver": driver, "Team": "Red Bull", "LapNumber": np.arange(1, N_LAPS + 1)})
+    laps["Stint"] = np.where(laps["LapNumber"] <= pit_lap, 1, 2)
+    laps["Compound"] = np.where(laps["Stint"] == 1, "MEDIUM", "HARD")
+    laps["TyreLife"] = np.where(laps["Stint"] == 1, laps["LapNumber"], laps["LapNumber"] - pit_lap).astype(float)
+    corrected = np.where(laps["Stint"] == 1, pace[0] + degradation[0] * laps["TyreLife"],
+                         pace[1] + degradation[1] * laps["TyreLife"])
+    laps["LapTime"] = pd.to_timedelta(corrected + FUEL * (N_LAPS - laps["LapNumber"]), unit="s")
+    laps["PitInTime"] = pd.to_timedelta(np.where(laps["LapNumber"] == pit_lap, 1.0, np.nan), unit="s")
+    laps["PitOutTime"] = pd.to_timedelta(np.where(laps["LapNumber"] == pit_lap + 1, 1.0, np.nan), unit="s")
+    laps["TrackStatus"] = "1"
+    return laps
+
+
+def test_fuel_correction_takes_out_the_remaining_fuel():
+    laps = race_laps()
+    corrected = fuel_corrected_lap_times(laps, FUEL)
+    assert corrected.iloc[0] == pytest.approx(laps["LapTime"].iloc[0].total_seconds() - FUEL * (N_LAPS - 1))
+    assert corrected.iloc[-1] == pytest.approx(laps["LapTime"].iloc[-1].total_seconds())
+
+
+def test_exact_degradation_is_recovered():
+    stints = fit_stints(race_laps(), FUEL).stints.set_index("Stint")
+
+    assert stints.loc[1, "Degradation (s/lap)"] == pytest.approx(0.10)
+    assert stints.loc[2, "Degradation (s/lap)"] == pytest.approx(0.05)
+    assert stints.loc[1, "Fresh Tyre Pace"] == pytest.approx(90.0)
+    assert stints.loc[2, "Fresh Tyre Pace"] == pytest.approx(89.5)
+    assert stints.loc[1, "R2"] == pytest.approx(1.0)
+    # Lap 1 and the in/out laps are left out of the fit
+    assert list(stints["Fit Laps"]) == [13, 14]
+    assert list(stints["Start Lap"]) == [1, 16] and list(stints["End Lap"]) == [15, 30]
+
+
+def test_matches_ordinary_least_squares_with_noise_and_outliers():
+    laps = race_laps()
+    rng = np.random.default_rng(1)
+    laps["LapTime"] += pd.to_timedelta(rng.normal(0, 0.2, len(laps)), unit="s")
+    laps.loc[laps["LapNumber"] == 8, "LapTime"] += pd.Timedelta(seconds=20)  # Traffic
+    laps.loc[laps["LapNumber"] == 22, "TrackStatus"] = "4"  # Safety car
+
+    model = fit_stints(laps, FUEL)
+    assert not ((model.laps["Stint"] == 1) & (model.laps["TyreLife"] == 8)).any()
+    for stint, fit_laps in model.laps.groupby("Stint"):
+        slope, intercept = np.polyfit(fit_laps["TyreLife"], fit_laps["Corrected Lap Time"], 1)
+        row = model.stints.set_index("Stint").loc[stint]
+        assert row["Degradation (s/lap)"] == pytest.approx(slope)
+        assert row["Fresh Tyre Pace"] == pytest.approx(intercept)
+    assert model.stints.set_index("Stint").loc[1, "Fit Laps"] == 12
+    assert model.stints.set_index("Stint").loc[2, "Fit Laps"] == 13
+
+
+def test_short_stints_get_no_fit():
+    stints = fit_stints(race_laps(pit_lap=N_LAPS - MIN_FIT_LAPS), FUEL).stints.set_index("Stint")
+    assert not np.isnan(stints.loc[1, "Degradation (s/lap)"])
+    assert np.isnan(stints.loc[2, "Degradation (s/lap)"])  # Out lap excluded, one clean lap short
+
+
+def test_groups_are_fitted_independently():
+    first = race_laps().assign(RoundNumber=1)
+    second = race_laps(degradation=(0.2, 0.3)).assign(RoundNumber=2)
+    stints = fit_stints(pd.concat([first, second], ignore_index=True), FUEL, group_keys=["RoundNumber"]).stints
+
+    degradation = stints.set_index(["RoundNumber", "Stint"])["Degradation (s/lap)"]
+    assert degradation.to_dict() == pytest.approx({(1, 1): 0.1, (1, 2): 0.05, (2, 1): 0.2, (2, 2): 0.3})
+
+
+def test_empty_laps():
+    assert fit_stints(race_laps().iloc[:0], FUEL).stints.empty
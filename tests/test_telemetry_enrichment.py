@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from telemetry_enrichment import enrich_telemetry, lap_summary, telemetry_summary
+
+
+def lap_telemetry(brake, gear, throttle=None, lap: int = 1) -> pd.DataFrame:
+    # One sample per second at a constant 36 km/h (10 m per sample)
+    n = len(brake)
+    return pd.DataFrame({
+        "SessionTime": pd.to_timedelta(np.arange(n), unit="s"),
+        "Speed": np.full(n, 36.0),
+        "Throttle": throttle if throttle is not None else np.where(brake, 0, 100),
+        "Brake": brake,
+        "nGear": gear,
+        "DRS": np.where(np.arange(n) < 2, 12, 0),
+        "LapNumber": lap,
+    })
+
+
+def test_braking_zones_are_numbered_from_each_brake_onset():
+    brake = [False, True, True, False, False, True, False, True, True]
+    telemetry = enrich_telemetry(lap_telemetry(brake, gear=[5] * len(brake)))
+    assert telemetry["Brake Onset"].tolist() == [False, True, False, False, False, True, False, True, False]
+    assert telemetry["Braking Zone"].tolist() == [0, 1, 1, 0, 0, 2, 0, 3, 3]
+
+
+def test_gear_shifts_are_signed_and_ignore_the_first_sample():
+    gear = [3, 4, 4, 5, 4, 3, 3, 4]
+    telemetry = enrich_telemetry(lap_telemetry([False] * len(gear), gear))
+    assert telemetry["Gear Shift"].tolist() == [0, 1, 0, 1, -1, -1, 0, 1]
+
+
+def test_grouped_laps_restart_distance_zones_and_shifts():
+    first = lap_telemetry([True, True, False, True], gear=[3, 4, 5, 6], lap=1)
+    second = lap_telemetry([True, False, True, True], gear=[2, 3, 3, 4], lap=2)
+    second["SessionTime"] += pd.Timedelta(seconds=len(first))
+    telemetry = enrich_telemetry(pd.concat([first, second], ignore_index=True), group="LapNumber")
+
+    assert telemetry["Distance"].tolist() == [0, 10, 20, 30] * 2
+    assert telemetry["Braking Zone"].tolist() == [1, 1, 0, 2, 1, 0, 2, 2]
+    # Shift from the last gear of lap 1 into the first of lap 2 isn't counted
+    assert telemetry["Gear Shift"].tolist() == [0, 1, 1, 1, 0, 1, 0, 1]
+    assert telemetry["DRS bool"].tolist() == [True, True, False, False] * 2
+
+
+def test_lap_summary_weights_full_throttle_by_time():
+    throttle = [100, 100, 100, 50, 100]
+    telemetry = lap_telemetry([False, False, False, True, False], gear=[4, 5, 5, 4, 5], throttle=throttle)
+    # The part-throttle sample closes a 3 s interval, the others 1 s each
+    telemetry["SessionTime"] = pd.to_timedelta([0, 1, 2, 5, 6], unit="s")
+    summary = lap_summary(enrich_telemetry(telemetry))
+
+    assert summary["Full Throttle Fraction"] == pytest.approx(3 / 6)
+    assert summary["Braking Zones"] == 1
+    assert summary["Gear Shifts"] == 3
+    assert summary["Top Speed"] == 36.0
+
+
+def test_telemetry_summary_has_one_row_per_group_in_order():
+    first = lap_telemetry([False, True, False], gear=[3, 3, 3], lap=7)
+    second = lap_telemetry([True, False, True], gear=[3, 4, 5], lap=3)
+    second["SessionTime"] += pd.Timedelta(seconds=len(first))
+    telemetry = enrich_telemetry(pd.concat([first, second], ignore_index=True), group="LapNumber")
+    summary = telemetry_summary(telemetry, group="LapNumber")
+
+    assert summary.index.tolist() == [7, 3]
+    assert summary["Braking Zones"].tolist() == [1, 2]
+    assert summary["Gear Shifts"].tolist() == [0, 2]
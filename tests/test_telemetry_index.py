@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from telemetry_index import CHANNELS, _resample_driver
+
+GRID = np.linspace(0, 100, 11)
+
+
+def car_data(times) -> pd.DataFrame:
+    n = len(times)
+    return pd.DataFrame({
+        "SessionTime": pd.to_timedelta(times, unit="s"),
+        **{channel: np.full(n, 36.0) for channel in CHANNELS if channel != "Time"},
+    })
+
+
+def laps(starts, ends) -> pd.DataFrame:
+    return pd.DataFrame({
+        "LapNumber": np.arange(1, len(starts) + 1),
+        "LapStartTime": pd.to_timedelta(starts, unit="s"),
+        "Time": pd.to_timedelta(ends, unit="s"),
+    })
+
+
+def test_resample_driver_onto_grid():
+    # 10 m/s for 10 s per lap, so 100 m laps
+    lap_numbers, block = _resample_driver(car_data(np.arange(0, 20.5, 0.5)), laps([0, 10], [10, 20]), GRID)
+
+    assert list(lap_numbers) == [1, 2]
+    assert block.shape == (2, len(CHANNELS), len(GRID))
+    time = block[:, CHANNELS.index("Time")]
+    np.testing.assert_allclose(time[:, -1] - time[:, 0], [10, 9.5], atol=0.6)
+
+
+def test_resample_driver_without_samples_or_laps():
+    for car, driver_laps in [
+        (car_data([]), laps([0], [10])),  # No telemetry at all
+        (car_data([50, 60]), laps([0], [10])),  # Telemetry only outside the laps
+        (car_data([1, 2]), laps([], [])),  # No timed laps
+    ]:
+        lap_numbers, block = _resample_driver(car, driver_laps, GRID)
+        assert len(lap_numbers) == 0 and block.shape == (0, len(CHANNELS), len(GRID))
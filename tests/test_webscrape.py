@@ -0,0 +1,138 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+import requests
+
+import webscrape
+
+DRIVERS_HTML = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures",
+                            "list_of_f1_drivers.html")
+TTL = 3600
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, text: str = "", headers: dict = None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+
+@pytest.fixture
+def html() -> str:
+    with open(DRIVERS_HTML, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture(autouse=True)
+def empty_memo(monkeypatch):
+    monkeypatch.setattr(webscrape, "_drivers_memo", {"checked_at": 0.0, "df": None})
+
+
+def fake_get(monkeypatch, response):
+    # Replaces the request with one returning (or raising) `response`, and records the headers sent
+    calls = []
+
+    def get(url, headers=None, timeout=None):
+        calls.append(headers or {})
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(webscrape.requests, "get", get)
+    return calls
+
+
+def stale_snapshot(cache_dir: str, html: str) -> pd.DataFrame:
+    df = webscrape.parse_f1_drivers(html)
+    meta = {"checked_at": time.time() - 2 * TTL, "etag": '"v1"', "last_modified": None}
+    webscrape._write_snapshot(df, meta, cache_dir)
+    return df
+
+
+def test_parse_f1_drivers(html):
+    df = webscrape.parse_f1_drivers(html)
+
+    assert len(df) == 7
+    assert "Points[a]" not in df.columns
+    assert df.set_index("Driver name").loc["Lewis Hamilton", "Race wins"] == 105
+    assert df.set_index("Driver name").loc["Ayrton Senna", "Drivers' Championships"] == "3"
+    for column in webscrape.INTEGER_COLUMNS:
+        assert pd.api.types.is_integer_dtype(df[column])
+    assert not df["Driver name"].str.endswith(("^", "~", "*")).any()
+
+
+def test_html_path_parses_saved_page(html):
+    pd.testing.assert_frame_equal(webscrape.get_f1_drivers(html_path=DRIVERS_HTML), webscrape.parse_f1_drivers(html))
+
+
+def test_fetch_writes_snapshot_and_serves_it_within_ttl(monkeypatch, tmp_path, html):
+    calls = fake_get(monkeypatch, FakeResponse(200, html, {"ETag": '"v2"'}))
+
+    df = webscrape.get_f1_drivers(cache_dir=str(tmp_path), ttl=TTL)
+    assert len(df) == 7 and len(calls) == 1
+    _, meta = webscrape._read_snapshot(str(tmp_path))
+    assert meta["etag"] == '"v2"'
+
+    # Within the TTL neither memory nor a fresh process (empty memo, snapshot on disk) fetches again
+    assert webscrape.get_f1_drivers(cache_dir=str(tmp_path), ttl=TTL) is df
+    monkeypatch.setattr(webscrape, "_drivers_memo", {"checked_at": 0.0, "df": None})
+    pd.testing.assert_frame_equal(webscrape.get_f1_drivers(cache_dir=str(tmp_path), ttl=TTL), df)
+    assert len(calls) == 1
+
+
+def test_not_modified_revalidates_snapshot(monkeypatch, tmp_path, html):
+    snapshot = stale_snapshot(str(tmp_path), html)
+    calls = fake_get(monkeypatch, FakeResponse(304))
+
+    df = webscrape.get_f1_drivers(cache_dir=str(tmp_path), ttl=TTL)
+
+    pd.testing.assert_frame_equal(df, snapshot)
+    assert calls[0]["If-None-Match"] == '"v1"'
+    _, meta = webscrape._read_snapshot(str(tmp_path))
+    assert time.time() - meta["checked_at"] < TTL
+
+
+@pytest.mark.parametrize("response", [
+    requests.ConnectionError("offline"),
+    FakeResponse(503),
+    FakeResponse(200, "<html><body><p>Page moved</p></body></html>"),
+    FakeResponse(200, ""),
+], ids=["network error", "server error", "layout changed", "empty page"])
+def test_failed_refresh_serves_snapshot_and_retries_later(monkeypatch, tmp_path, html, response):
+    snapshot = stale_snapshot(str(tmp_path), html)
+    calls = fake_get(monkeypatch, response)
+
+    df = webscrape.get_f1_drivers(cache_dir=str(tmp_path), ttl=TTL)
+    pd.testing.assert_frame_equal(df, snapshot)
+
+    # The snapshot isn't overwritten, and the next attempt is OFFLINE_RETRY away rather than a full TTL
+    _, meta = webscrape._read_snapshot(str(tmp_path))
+    assert time.time() - meta["checked_at"] > TTL
+    retry_in = webscrape._drivers_memo["checked_at"] + TTL - time.time()
+    assert 0 < retry_in <= webscrape.OFFLINE_RETRY
+    webscrape.get_f1_drivers(cache_dir=str(tmp_path), ttl=TTL)
+    assert len(calls) == 1
+
+
+def test_failed_fetch_without_snapshot_returns_empty_table(monkeypatch, tmp_path):
+    fake_get(monkeypatch, requests.ConnectionError("offline"))
+    assert webscrape.get_f1_drivers(cache_dir=str(tmp_path), ttl=TTL).empty
+
+
+def test_interrupted_snapshot_write_keeps_the_previous_snapshot(monkeypatch, tmp_path, html):
+    snapshot = stale_snapshot(str(tmp_path), html)
+
+    def broken_to_parquet(self, *args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", broken_to_parquet)
+    with pytest.raises(OSError):
+        webscrape._write_snapshot(snapshot.head(1), {"checked_at": time.time(), "etag": '"v2"'}, str(tmp_path))
+    monkeypatch.undo()
+
+    df, meta = webscrape._read_snapshot(str(tmp_path))
+    pd.testing.assert_frame_equal(df, snapshot)
+    assert meta["etag"] == '"v1"'
+    assert sorted(os.listdir(tmp_path)) == ["drivers.json", "drivers.parquet"]
@@ -0,0 +1,127 @@
+import os
+import re
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from data_importing import get_lap_telemetry
+
+# Circuit outlines are stored per circuit (event location), so every session and season at a circuit shares one
+TRACK_MAP_DIR = os.environ.get("F1_TRACK_MAP_DIR", os.path.join("Data", "circuits"))
+TRACK_MAP_CACHE_VERSION = 1
+
+COLOR_CHANNELS = ("Speed", "nGear", "Delta")
+
+
+@dataclass(frozen=True)
+class CircuitGeometry:
+    location: str
+    rotation: float  # degrees, applied to FastF1 X/Y so the layout matches the usual circuit maps
+    outline: np.ndarray  # (n, 2) rotated X/Y of a reference lap
+
+
+def rotate(xy: np.ndarray, degrees: float) -> np.ndarray:
+    angle = np.deg2rad(degrees)
+    rotation = np.array([[np.cos(angle), np.sin(angle)], [-np.sin(angle), np.cos(angle)]])
+    return xy @ rotation
+
+
+def lap_segments(xy: np.ndarray) -> np.ndarray:
+    # (n - 1, 2, 2) array of consecutive point pairs, the input LineCollection expects
+    return np.stack([xy[:-1], xy[1:]], axis=1)
+
+
+def _principal_rotation(xy: np.ndarray) -> float:
+    # Fallback when the circuit info isn't available: lay the track's longest extent horizontally
+    centered = xy - xy.mean(axis=0)
+    _, vectors = np.linalg.eigh(np.cov(centered.T))
+    major = vectors[:, -1]
+    # The axis has no direction, keep the smaller of the two equivalent rotations
+    return -float((np.degrees(np.arctan2(major[1], major[0])) + 90) % 180 - 90)
+
+
+def _circuit_rotation(session, xy: np.ndarray) -> float:
+    try:
+        return float(session.get_circuit_info().rotation)
+    except Exception:
+        return _principal_rotation(xy)
+
+
+def _geometry_path(location: str) -> str:
+    return os.path.join(TRACK_MAP_DIR, f"{re.sub(r'[^A-Za-z0-9]+', '_', location).strip('_')}.npz")
+
+
+def _read_geometry(location: str) -> Optional[CircuitGeometry]:
+    path = _geometry_path(location)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as stored:
+            if int(stored["version"]) != TRACK_MAP_CACHE_VERSION:
+                return None
+            return CircuitGeometry(location, float(stored["rotation"]), stored["outline"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_geometry(geometry: CircuitGeometry) -> None:
+    os.makedirs(TRACK_MAP_DIR, exist_ok=True)
+    path = _geometry_path(geometry.location)
+    # Unique temporary name, so processes saving the same circuit at once don't write into one file
+    with tempfile.NamedTemporaryFile(dir=TRACK_MAP_DIR, suffix=".tmp.npz", delete=False) as f:
+        np.savez(f, version=TRACK_MAP_CACHE_VERSION, rotation=geometry.rotation, outline=geometry.outline)
+    os.replace(f.name, path)
+
+
+_geometries: Dict[str, CircuitGeometry] = {}
+_geometries_lock = threading.Lock()
+
+
+def get_circuit_geometry(session) -> CircuitGeometry:
+    location = str(session.event["Location"])
+    with _geometries_lock:
+        geometry = _geometries.get(location)
+    if geometry is not None:
+        return geometry
+
+    geometry = _read_geometry(location)
+    if geometry is None:
+        fastest = session.laps.pick_fastest()
+        telemetry = get_lap_telemetry(session, fastest["Driver"], fastest["LapNumber"])
+        xy = telemetry[["X", "Y"]].to_numpy(dtype=np.float64)
+        rotation = _circuit_rotation(session, xy)
+        geometry = CircuitGeometry(location, rotation, rotate(xy, rotation).astype(np.float32))
+        _write_geometry(geometry)
+
+    with _geometries_lock:
+        _geometries[location] = geometry
+    return geometry
+
+
+def lap_track_data(session, driver: str, lap: int, color_by: str = "Speed",
+                   reference: Optional[Tuple[str, int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    # Rotated (n, 2) positions of a lap and the value to colour each of its n - 1 segments by.
+    # Delta is the time lost (positive) or gained against the reference lap at the same distance.
+    if color_by not in COLOR_CHANNELS:
+        raise ValueError(f"Unknown track map channel '{color_by}', expected one of {COLOR_CHANNELS}")
+    geometry = get_circuit_geometry(session)
+    telemetry = get_lap_telemetry(session, driver, lap)
+    xy = rotate(telemetry[["X", "Y"]].to_numpy(dtype=np.float64), geometry.rotation)
+
+    if color_by == "Delta":
+        if reference is None:
+            raise ValueError("A reference (driver, lap) is needed to colour by delta")
+        ref = get_lap_telemetry(session, *reference)
+        distance = telemetry["Distance"].to_numpy(dtype=np.float64)
+        elapsed = telemetry["Time"].dt.total_seconds().to_numpy()
+        ref_elapsed = np.interp(distance, ref["Distance"].to_numpy(dtype=np.float64),
+                                ref["Time"].dt.total_seconds().to_numpy())
+        values = elapsed - ref_elapsed
+    else:
+        values = telemetry[color_by].to_numpy(dtype=np.float64)
+
+    # A segment takes the value at its start point
+    return xy, values[:-1]
@@ -1,73 +1,159 @@
+import json
+import os
+import tempfile
+import time
+import threading
+from typing import Optional
+
 import requests
 import pandas as pd
-from bs4 import BeautifulSoup
-import regex as re
-
-def get_f1_drivers() -> pd.DataFrame:
-    url = "https://en.wikipedia.org/wiki/List_of_Formula_One_drivers"
-    
-    # Fetch the webpage content
-    response = requests.get(url)
-    
-    # Check if the request was successful
-    if response.status_code != 200:
-        print(f"Failed to fetch data. HTTP Status code: {response.status_code}")
-        return pd.DataFrame()  # Return an empty DataFrame in case of failure
-    
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    # Find all tables with the class 'wikitable'
-    tables = soup.find_all('table', {'class': 'wikitable'})
-
-    # Select the second table (index 1)
-    table = tables[1]
-
-    # Extract headers (table column names)
-    headers = [header.text.strip() for header in table.find_all('th')]
-
-    # Extract data rows
-    rows = []
-    for row in table.find_all('tr')[1:]:  # Skip the header row
-        cols = row.find_all('td')
-        if len(cols) > 0:
-            data = [col.text.strip() for col in cols]
-            if len(data) < len(headers):
-                data.extend([None] * (len(headers) - len(data)))
-            elif len(data) > len(headers):
-                data = data[:len(headers)]
-            rows.append(data)
-
-    # Create the DataFrame
-    df_wiki_drivers = pd.DataFrame(rows, columns=headers)
-
-    # Remove duplicate columns if any
-    df_wiki_drivers = df_wiki_drivers.loc[:, ~df_wiki_drivers.columns.duplicated()]
-    # if "Points[a]" in df_wiki_drivers.columns:
-    df_wiki_drivers = df_wiki_drivers.drop(columns=["Points[a]"])
-    df_wiki_drivers["Drivers' Championships"] = df_wiki_drivers["Drivers' Championships"].apply(
-    lambda x: re.search(r'\d', x).group() if isinstance(x, str) and re.search(r'\d', x) else None
-    )
 
-    df_wiki_drivers["Race entries"] = df_wiki_drivers["Race entries"].str.replace(r'\D', '', regex=True)
-    df_wiki_drivers["Race starts"] = df_wiki_drivers["Race starts"].str.replace(r'\D', '', regex=True)
-    df_wiki_drivers["Race wins"] = df_wiki_drivers["Race wins"].str.replace(r'\D', '', regex=True)
-    df_wiki_drivers["Podiums"] = df_wiki_drivers["Podiums"].str.replace(r'\D', '', regex=True)
-    df_wiki_drivers["Fastest laps"] = df_wiki_drivers["Fastest laps"].str.replace(r'\D', '', regex=True)
+from table_parsing import read_wikitable, clean_integer_columns, first_digit
+
+DRIVERS_URL = "https://en.wikipedia.org/wiki/List_of_Formula_One_drivers"
+DRIVERS_CACHE_DIR = os.environ.get("F1_DRIVERS_CACHE_DIR", os.path.join("Data", "drivers"))
+DRIVERS_TTL = float(os.environ.get("F1_DRIVERS_TTL_HOURS", 24)) * 3600
+REQUEST_TIMEOUT = 10
+OFFLINE_RETRY = 15 * 60  # Seconds to serve the last snapshot before retrying a failed fetch
+
+# Parsed table kept in memory between reruns, together with the time it was (re)validated
+_drivers_memo = {"checked_at": 0.0, "df": None}
+_drivers_lock = threading.Lock()
+_drivers_refresh_lock = threading.Lock()
+
+
+INTEGER_COLUMNS = ["Race entries", "Race starts", "Pole positions", "Race wins", "Podiums", "Fastest laps"]
+
+
+def parse_f1_drivers(html: str) -> pd.DataFrame:
+    # The drivers list is the second wikitable on the page
+    df_wiki_drivers = read_wikitable(html, index=1)
 
+    df_wiki_drivers = df_wiki_drivers.drop(columns=["Points[a]"])
+    df_wiki_drivers["Drivers' Championships"] = first_digit(df_wiki_drivers["Drivers' Championships"])
+    df_wiki_drivers = clean_integer_columns(df_wiki_drivers, INTEGER_COLUMNS)
     df_wiki_drivers["Driver name"] = df_wiki_drivers["Driver name"].str.rstrip("^~*")
-    df_wiki_drivers = df_wiki_drivers.astype({
-        "Race entries":int,
-        "Race starts":int,
-        "Pole positions":int,
-        "Race wins":int,
-        "Podiums":int,
-        "Fastest laps":int
-    })
 
     return df_wiki_drivers
 
 
+def _cache_paths(cache_dir: str):
+    return os.path.join(cache_dir, "drivers.parquet"), os.path.join(cache_dir, "drivers.json")
+
+
+def _read_snapshot(cache_dir: str):
+    table_path, meta_path = _cache_paths(cache_dir)
+    if not (os.path.exists(table_path) and os.path.exists(meta_path)):
+        return None, {}
+    with open(meta_path) as f:
+        meta = json.load(f)
+    return pd.read_parquet(table_path), meta
+
+
+def _replace(path: str, write) -> None:
+    # write(file) fills a temporary file next to path, which then replaces path in one step,
+    # so readers (other reruns, other processes) never see a half-written file
+    with tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+        try:
+            write(f)
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+    os.replace(f.name, path)
+
+
+def _write_meta(meta: dict, cache_dir: str) -> None:
+    _, meta_path = _cache_paths(cache_dir)
+    _replace(meta_path, lambda f: f.write(json.dumps(meta).encode()))
+
+
+def _write_snapshot(df: pd.DataFrame, meta: dict, cache_dir: str) -> None:
+    # Meta goes last, its checked_at is what marks the table on disk as fresh
+    os.makedirs(cache_dir, exist_ok=True)
+    table_path, _ = _cache_paths(cache_dir)
+    _replace(table_path, lambda f: df.to_parquet(f, index=False))
+    _write_meta(meta, cache_dir)
+
+
+def _fresh_drivers(cache_dir: str, ttl: float) -> Optional[pd.DataFrame]:
+    # Table still within the TTL, from memory or the snapshot on disk (callers hold _drivers_lock)
+    if _drivers_memo["df"] is not None and time.time() - _drivers_memo["checked_at"] < ttl:
+        return _drivers_memo["df"]
+
+    df, meta = _read_snapshot(cache_dir)
+    if df is not None and time.time() - meta.get("checked_at", 0) < ttl:
+        _drivers_memo.update(checked_at=meta["checked_at"], df=df)
+        return df
+    return None
+
+
+def get_f1_drivers(html_path: Optional[str] = None, cache_dir: str = DRIVERS_CACHE_DIR,
+                   ttl: float = DRIVERS_TTL) -> pd.DataFrame:
+    # Driver statistics from Wikipedia, cached on disk as Parquet. Within the TTL nothing is fetched,
+    # after it the page is revalidated with ETag/Last-Modified, and without network (or when the page
+    # can't be parsed) the last good snapshot is served. html_path parses a saved copy of the page instead.
+    if html_path is not None:
+        with open(html_path, encoding="utf-8") as f:
+            return parse_f1_drivers(f.read())
+
+    with _drivers_lock:
+        df = _fresh_drivers(cache_dir, ttl)
+    if df is not None:
+        return df
+
+    # One refresh at a time, without holding _drivers_lock during the request. While it runs,
+    # other callers get the table already in memory instead of waiting for it.
+    if not _drivers_refresh_lock.acquire(blocking=_drivers_memo["df"] is None):
+        return _drivers_memo["df"]
+    try:
+        with _drivers_lock:
+            df = _fresh_drivers(cache_dir, ttl)  # Refreshed while this call waited for the lock
+            if df is not None:
+                return df
+            df, meta = _read_snapshot(cache_dir)
+
+        headers = {}
+        if df is not None and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if df is not None and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        # Until the next check, a failed fetch keeps serving the previous snapshot
+        checked_at = time.time() - ttl + OFFLINE_RETRY
+        try:
+            response = requests.get(DRIVERS_URL, headers=headers, timeout=REQUEST_TIMEOUT)
+            if response.status_code == 304 and df is not None:
+                checked_at = meta["checked_at"] = time.time()
+                _write_meta(meta, cache_dir)
+            elif response.status_code == 200:
+                parsed = parse_f1_drivers(response.text)
+                meta = {
+                    "checked_at": time.time(),
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+                df, checked_at = parsed, meta["checked_at"]
+                _write_snapshot(df, meta, cache_dir)
+            else:
+                print(f"Failed to fetch data. HTTP Status code: {response.status_code}")
+        except requests.RequestException as e:
+            print(f"Failed to fetch data: {e}")
+        except (ValueError, KeyError, SyntaxError) as e:
+            # The page layout changed (or the response is garbage): keep the last good table
+            print(f"Failed to parse data: {e!r}")
+
+        if df is None:
+            return pd.DataFrame()  # No snapshot to fall back to
+
+        with _drivers_lock:
+            _drivers_memo.update(checked_at=checked_at, df=df)
+        return df
+    finally:
+        _drivers_refresh_lock.release()
+
+
 if __name__ == "__main__":
     # Example usage
     df = get_f1_drivers()
-    print(df.dtypes)  # Display the first few rows
\ No newline at end of file
+    print(df.dtypes)  # Display the first few rows